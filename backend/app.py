@@ -1,35 +1,133 @@
 """Main Flask application with WebSocket support."""
 
-from flask import Flask, render_template, jsonify
+import functools
+import secrets
+import threading
+
+from flask import Flask, Response, request, render_template, jsonify, url_for
 from flask_cors import CORS
 from flask_socketio import SocketIO
 
 from config import Config
 from features.websocket_events import WebSocketEventHandler
 from features.game_state import game_state_manager
+from features.metrics import metrics
+from features.static_assets import StaticAssets
+from features import aoe, dice, movement, tile_window
+from features.memory_debug import MemoryInspector
 
 # Initialize Flask app
 app = Flask(__name__, template_folder="../player_web/templates", static_folder="../player_web/static")
 app.config.from_object(Config)
 
+# Fingerprinted, precompressed static files for the player page
+static_assets = StaticAssets(app.static_folder) if Config.STATIC_FINGERPRINTING else None
+
+@app.context_processor
+def inject_asset_url():
+    """Expose asset_url() to templates."""
+    if static_assets:
+        return {"asset_url": static_assets.url}
+    return {"asset_url": lambda filename: url_for("static", filename=filename)}
+
 # Enable CORS
 CORS(app, origins=Config.CORS_ORIGINS)
 
 # Initialize SocketIO for WebSocket support
-sio = SocketIO(app, cors_allowed_origins=Config.CORS_ORIGINS)
+sio = SocketIO(app, cors_allowed_origins=Config.CORS_ORIGINS, serializer=Config.SOCKETIO_SERIALIZER)
+
+# The live WebSocket event handler. Importing this module builds none:
+# get_event_handler() builds the threaded one on first use, unless asgi.py has
+# installed its async handler here first.
+event_handler = None
+_event_handler_lock = threading.Lock()
+
+def get_event_handler():
+    """The live event handler, building and registering the threaded one if none is installed."""
+    global event_handler
+    if event_handler is None:
+        with _event_handler_lock:
+            if event_handler is None:
+                event_handler = WebSocketEventHandler(sio)
+    return event_handler
+
+@sio.on("connect")
+def connect_first_client(auth=None):
+    """Build the handler when a server other than app.py (flask run, gunicorn) gets its first client.
 
-# Initialize WebSocket event handlers
-event_handler = WebSocketEventHandler(sio)
+    Building it registers the real handlers, which replace this one.
+    """
+    return get_event_handler().dispatchers["connect"](auth)
+
+def of_handler(getter):
+    """Memory getter reading part of the live event handler."""
+    return lambda: getter(get_event_handler())
+
+# Objects whose size /api/debug/memory reports, by subsystem. Getters look the
+# handler up at call time.
+memory_inspector = MemoryInspector()
+memory_inspector.track("boards", "gameboard", lambda: game_state_manager.gameboard)
+memory_inspector.track("boards", "npcs", lambda: game_state_manager.npcs)
+memory_inspector.track("boards", "lighting", lambda: game_state_manager.lighting)
+memory_inspector.track("sessions", "players", lambda: game_state_manager.players)
+memory_inspector.track("sessions", "connected_sids", of_handler(lambda h: h.connected_sids))
+memory_inspector.track("sessions", "resume_tokens", of_handler(lambda h: h.resume and h.resume.tokens))
+memory_inspector.track("combat", "combat", lambda: game_state_manager.combat)
+memory_inspector.track("combat", "dice_log", lambda: game_state_manager.dice.history)
+memory_inspector.track("caches", "resume_journal", of_handler(lambda h: h.resume and h.resume.journal.entries))
+memory_inspector.track("caches", "interest", of_handler(lambda h: h.interest))
+memory_inspector.track("caches", "rate_limiter", of_handler(lambda h: h.rate_limiter))
+memory_inspector.track("caches", "reach", of_handler(lambda h: h.reach_cache.entries))
+memory_inspector.track("caches", "aoe_templates", lambda: aoe.get_template)
+memory_inspector.track("caches", "dice_plans", dice.plan_cache)
+memory_inspector.track("caches", "cost_grids", movement.cached_cost_grids)
+memory_inspector.track("caches", "visions", lambda: game_state_manager.lighting and game_state_manager.lighting.visions)
+memory_inspector.track("caches", "static_assets", lambda: static_assets)
+memory_inspector.track("caches", "metrics", lambda: metrics)
+memory_inspector.track("caches", "profiler", of_handler(lambda h: (h.profiler.timings, h.profiler.slow_calls)))
+memory_inspector.track("queues", "outbound", of_handler(lambda h: h.outbound and h.outbound.queues))
+memory_inspector.track("queues", "broadcast_tick", of_handler(lambda h: h.move_coalescer and h.move_coalescer.pending))
+memory_inspector.track("queues", "map_stream", of_handler(lambda h: h.map_streamer and h.map_streamer.streams))
 
 # ============================================================================
 # ROUTES
 # ============================================================================
 
+def is_gm_request():
+    """Whether the request comes from a connected GM.
+
+    The caller names their player in `X-Player-Id` and proves it with the
+    `gm_token` issued in their `player_joined` confirmation, sent in
+    `X-GM-Token`.
+    """
+    player_id = request.headers.get("X-Player-Id")
+    player = game_state_manager.get_player(player_id) if player_id else None
+    token = request.headers.get("X-GM-Token", "")
+    return bool(player and player.is_gm and player.gm_token
+                and secrets.compare_digest(player.gm_token.encode(), token.encode()))
+
+def gm_only(view):
+    """Restrict a route to a connected GM (see is_gm_request)."""
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        if not is_gm_request():
+            return jsonify({"error": "GM only"}), 403
+        return view(*args, **kwargs)
+    return wrapper
+
 @app.route("/")
 def index():
     """Serve player web interface."""
     return render_template("index.html")
 
+@app.route("/assets/<path:filename>")
+def fingerprinted_asset(filename):
+    """Serve a content-hashed static file with immutable caching."""
+    response = static_assets.response(filename, request) if static_assets else None
+    if response is None:
+        return jsonify({"error": "Not found"}), 404
+    return response
+
 @app.route("/api/health", methods=["GET"])
 def health():
     """Health check endpoint."""
@@ -46,9 +144,115 @@ def get_config():
 @app.route("/api/stats", methods=["GET"])
 def get_stats():
     """Get server statistics."""
-    stats = event_handler.get_event_stats()
+    stats = get_event_handler().get_event_stats()
     return jsonify(stats), 200
 
+@app.route("/api/maps/<name>/tiles", methods=["GET"])
+def get_map_tiles(name):
+    """Get a rectangular window of the loaded map.
+
+    Query: x0, y0 (inclusive), x1, y1 (exclusive); clamped to the board.
+    Under fog of war only GMs may read the map; players get the terrain they
+    see in `fog_update`.
+    """
+    gameboard = game_state_manager.get_gameboard()
+    board = gameboard.board if gameboard and gameboard.map_name == name else None
+    if board is None:
+        return jsonify({"error": "Map not loaded"}), 404
+    if gameboard.fog_of_war and not is_gm_request():
+        return jsonify({"error": "GM only under fog of war"}), 403
+    try:
+        x0 = int(request.args.get("x0", 0))
+        y0 = int(request.args.get("y0", 0))
+        x1 = int(request.args.get("x1", board.width))
+        y1 = int(request.args.get("y1", board.height))
+    except ValueError:
+        return jsonify({"error": "Window bounds must be integers"}), 400
+    window = tile_window.clamp_window(board, x0, y0, x1, y1)
+    if window is None:
+        return jsonify({"error": "Window is outside the map"}), 400
+    if (window[2] - window[0]) * (window[3] - window[1]) > Config.TILE_WINDOW_MAX_TILES:
+        return jsonify({"error": "Window too large"}), 400
+
+    etag = tile_window.window_etag(board, window)
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+    else:
+        response = jsonify(tile_window.encode_window(board, window))
+    response.set_etag(etag)
+    response.headers["Cache-Control"] = "no-cache"
+    return response
+
+@app.route("/api/debug/memory", methods=["GET"])
+@gm_only
+def get_memory():
+    """Get approximate memory use per subsystem and tracemalloc status."""
+    return jsonify({
+        "subsystems": memory_inspector.sizes(),
+        "tracemalloc": memory_inspector.tracing_status()
+    }), 200
+
+@app.route("/api/debug/memory", methods=["POST"])
+@gm_only
+def control_memory():
+    """Drive tracemalloc.
+
+    Body: {"action": "start", "frames": 25} | {"action": "snapshot", "label": "..."}
+        | {"action": "diff", "from": id, "to": id, "limit": 20} | {"action": "stop"}
+    """
+    data = request.get_json(silent=True) or {}
+    action = data.get("action")
+    try:
+        if action == "start":
+            memory_inspector.start_tracing(int(data.get("frames", 25)))
+            return jsonify(memory_inspector.tracing_status()), 200
+        if action == "snapshot":
+            return jsonify(memory_inspector.take_snapshot(str(data.get("label", "")))), 200
+        if action == "diff":
+            stats = memory_inspector.diff(int(data["from"]), int(data["to"]), int(data.get("limit", 20)))
+            return jsonify({"from": int(data["from"]), "to": int(data["to"]), "top": stats}), 200
+        if action == "stop":
+            memory_inspector.stop_tracing()
+            return jsonify(memory_inspector.tracing_status()), 200
+    except RuntimeError as e:
+        return jsonify({"error": str(e)}), 409
+    except (KeyError, TypeError, ValueError):
+        return jsonify({"error": "Invalid snapshot ids"}), 400
+    return jsonify({"error": "Unknown action"}), 400
+
+@app.route("/api/metrics", methods=["GET"])
+def get_metrics():
+    """Prometheus metrics in text exposition format."""
+    if not Config.METRICS_ENABLED:
+        return jsonify({"error": "Metrics disabled"}), 404
+    return Response(metrics.render(), mimetype="text/plain; version=0.0.4")
+
+@app.route("/api/debug/profiling", methods=["GET"])
+@gm_only
+def get_profiling():
+    """Get handler profiling settings, timings and slow calls."""
+    return jsonify(get_event_handler().profiler.get_stats()), 200
+
+@app.route("/api/debug/profiling", methods=["POST"])
+@gm_only
+def set_profiling():
+    """Toggle handler profiling.
+
+    Body: {"sample_rate": 0-1, "slow_ms": ms, "capture_seconds": N, "reset": bool}
+    """
+    data = request.get_json(silent=True) or {}
+    profiler = get_event_handler().profiler
+    try:
+        profiler.configure(sample_rate=data.get("sample_rate"), slow_ms=data.get("slow_ms"))
+        capture_seconds = float(data.get("capture_seconds") or 0)
+    except (TypeError, ValueError):
+        return jsonify({"error": "Invalid profiling settings"}), 400
+    if data.get("reset"):
+        profiler.reset()
+    if capture_seconds > 0 and not profiler.start_capture(min(capture_seconds, 300)):
+        return jsonify({"error": "Capture already running"}), 409
+    return jsonify(profiler.get_stats()), 200
+
 
 # ============================================================================
 # ERROR HANDLERS
@@ -69,6 +273,7 @@ def server_error(e):
 # ============================================================================
 
 if __name__ == "__main__":
+    get_event_handler()
     print(f"Starting RPG server on {Config.HOST}:{Config.PORT}")
     print(f"Data directory: {Config.DATA_DIR}")
     sio.run(app, host=Config.HOST, port=Config.PORT, debug=Config.DEBUG)
@@ -0,0 +1,43 @@
+"""ASGI entry point: native asyncio Socket.IO server.
+
+Alternative to `python app.py` (threading mode on the Werkzeug dev server).
+Socket.IO traffic is served by python-socketio's AsyncServer using the same
+WebSocketEventHandler logic; REST routes and the player web UI are the Flask
+app mounted through an ASGI adapter.
+
+Run with:
+    uvicorn asgi:app --host 127.0.0.1 --port 5000
+or:
+    python asgi.py
+"""
+
+import socketio
+from asgiref.wsgi import WsgiToAsgi
+
+import app as flask_server
+from config import Config
+from features.async_events import AsyncServerFacade, AsyncWebSocketEventHandler
+
+# always_connect sends the CONNECT ack before on_connect runs, so the
+# "response" emitted from the handler is never ahead of the handshake
+sio = socketio.AsyncServer(
+    async_mode="asgi",
+    cors_allowed_origins=Config.CORS_ORIGINS,
+    serializer=Config.SOCKETIO_SERIALIZER,
+    always_connect=True
+)
+
+event_handler = AsyncWebSocketEventHandler(AsyncServerFacade(sio))
+
+# REST routes report on this handler; app.py builds no threaded one on import
+flask_server.event_handler = event_handler
+
+app = socketio.ASGIApp(sio, other_asgi_app=WsgiToAsgi(flask_server.app))
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    print(f"Starting RPG server (ASGI) on {Config.HOST}:{Config.PORT}")
+    print(f"Data directory: {Config.DATA_DIR}")
+    uvicorn.run(app, host=Config.HOST, port=Config.PORT, log_level="warning")
@@ -0,0 +1,230 @@
+"""
+Hot Path Benchmarks - Parametrized microbenchmarks with regression checks
+
+Times the functions that dominate server cost, each over a range of sizes:
+
+- Gameboard.to_dict / Gameboard.from_dict (board side)
+- GameboardManager.load_gameboard (board side, from a temp maps dir)
+- CharacterManager.get_all_characters (saved characters)
+- GameStateManager.get_public_state (players)
+- GameStateManager.next_turn (combat participants)
+- WebSocketEventHandler.broadcast_event (connected clients; real Socket.IO
+  manager fan-out with the transport write stubbed)
+
+Each case is auto-calibrated to run for at least --min-time per repeat and
+reports the best and median time per call. Results can be saved as a
+baseline and later runs compared against it; the run fails (exit 1) when any
+case's best time regresses by more than --threshold percent.
+
+Usage (from backend/):
+    python -m benchmarks.hot_paths --save-baseline benchmarks/baseline.json
+    python -m benchmarks.hot_paths --baseline benchmarks/baseline.json --threshold 15
+    python -m benchmarks.hot_paths --only board_to_dict --quick
+"""
+
+import argparse
+import json
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from typing import Dict, Any, Callable, List, Tuple
+
+from flask import Flask
+from flask_socketio import SocketIO
+
+from config import Config
+from features.characters import Character, CharacterManager
+from features.gameboard import Gameboard, GameboardManager
+from features.game_state import GameStateManager
+
+
+BOARD_SIDES = (20, 50, 100, 200)
+CHARACTER_COUNTS = (10, 100, 500)
+PLAYER_COUNTS = (10, 100, 1000)
+PARTICIPANT_COUNTS = (4, 20, 100)
+CLIENT_COUNTS = (10, 100, 1000)
+
+# name -> (parameter name, parameter values, setup(value) -> callable)
+Case = Tuple[str, Tuple[int, ...], Callable[[int], Callable[[], Any]]]
+
+_temp_dirs: List[str] = []
+
+
+def temp_dir(prefix: str) -> str:
+    path = tempfile.mkdtemp(prefix=prefix)
+    _temp_dirs.append(path)
+    return path
+
+
+def make_board(side: int) -> Gameboard:
+    board = Gameboard(f"bench_{side}", width=side, height=side)
+    for i in range(side):
+        board.set_tile(i, side // 2, "wall", True)
+        board.set_tile(side // 3, i, "water")
+    return board
+
+
+def setup_board_to_dict(side: int):
+    board = make_board(side)
+    return board.to_dict
+
+
+def setup_board_from_dict(side: int):
+    data = make_board(side).to_dict()
+    return lambda: Gameboard.from_dict(data)
+
+
+def setup_load_gameboard(side: int):
+    Config.MAPS_DIR = temp_dir("bench_maps_")
+    board = make_board(side)
+    GameboardManager.save_gameboard(board)
+    return lambda: GameboardManager.load_gameboard(board.name)
+
+
+def setup_get_all_characters(count: int):
+    Config.CHARACTERS_DIR = temp_dir("bench_chars_")
+    for i in range(count):
+        CharacterManager.save_character(Character(f"char_{i}", f"player_{i}", f"Hero {i}"))
+    return CharacterManager.get_all_characters
+
+
+def setup_get_public_state(players: int):
+    manager = GameStateManager()
+    for i in range(players):
+        manager.add_player(f"p{i}", f"c{i}", f"Hero {i}")
+    manager.initialize_gameboard("bench", 50, 50)
+    return manager.get_public_state
+
+
+def setup_next_turn(participants: int):
+    manager = GameStateManager()
+    manager.start_combat("bench", [{"id": f"p{i}", "name": f"Hero {i}"} for i in range(participants)])
+    return manager.next_turn
+
+
+def setup_broadcast_event(clients: int):
+    # Imported here: building the handler registers events on a fresh server
+    from features.websocket_events import WebSocketEventHandler
+
+    sio = SocketIO(Flask(__name__))
+    server = sio.server
+    server._send_eio_packet = lambda eio_sid, pkt: None
+    handler = WebSocketEventHandler(sio)
+    for i in range(clients):
+        handler.connected_sids.add(server.manager.connect(f"eio_{i}", "/"))
+    data = {"player_id": "p0", "character_name": "Hero",
+            "old_position": {"x": 1, "y": 1}, "new_position": {"x": 2, "y": 1},
+            "timestamp": time.time()}
+    return lambda: handler.broadcast_event("character_moved", data)
+
+
+CASES: Dict[str, Case] = {
+    "board_to_dict": ("side", BOARD_SIDES, setup_board_to_dict),
+    "board_from_dict": ("side", BOARD_SIDES, setup_board_from_dict),
+    "load_gameboard": ("side", BOARD_SIDES, setup_load_gameboard),
+    "get_all_characters": ("characters", CHARACTER_COUNTS, setup_get_all_characters),
+    "get_public_state": ("players", PLAYER_COUNTS, setup_get_public_state),
+    "next_turn": ("participants", PARTICIPANT_COUNTS, setup_next_turn),
+    "broadcast_event": ("clients", CLIENT_COUNTS, setup_broadcast_event),
+}
+
+
+def measure(func: Callable[[], Any], min_time: float, repeat: int) -> Dict[str, Any]:
+    """Calibrate a loop count, then time `repeat` runs; seconds per call"""
+    loops = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(loops):
+            func()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            break
+        loops *= 2 if elapsed == 0 else max(2, min(10, int(min_time / elapsed) + 1))
+
+    per_call = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(loops):
+            func()
+        per_call.append((time.perf_counter() - start) / loops)
+    return {"loops": loops, "best": min(per_call), "median": statistics.median(per_call)}
+
+
+def run_cases(names: List[str], min_time: float, repeat: int) -> Dict[str, Dict[str, Any]]:
+    """Run the named cases over all their parameter values"""
+    saved_dirs = (Config.MAPS_DIR, Config.CHARACTERS_DIR)
+    results = {}
+    try:
+        for name in names:
+            param, values, setup = CASES[name]
+            for value in values:
+                key = f"{name}[{param}={value}]"
+                results[key] = measure(setup(value), min_time, repeat)
+                print(f"{key:45s} best {results[key]['best'] * 1e6:12.2f} us", file=sys.stderr)
+    finally:
+        Config.MAPS_DIR, Config.CHARACTERS_DIR = saved_dirs
+        while _temp_dirs:
+            shutil.rmtree(_temp_dirs.pop(), ignore_errors=True)
+    return results
+
+
+def compare(results: Dict[str, Dict[str, Any]], baseline: Dict[str, Dict[str, Any]],
+            threshold: float) -> List[Dict[str, Any]]:
+    """Cases whose best time is more than threshold percent slower than baseline"""
+    regressions = []
+    for key, result in results.items():
+        base = baseline.get(key)
+        if not base or not base["best"]:
+            continue
+        change = (result["best"] - base["best"]) / base["best"] * 100
+        result["change_pct"] = round(change, 1)
+        if change > threshold:
+            regressions.append({"case": key, "baseline": base["best"], "current": result["best"],
+                                "change_pct": round(change, 1)})
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--only", nargs="+", choices=list(CASES), default=list(CASES))
+    parser.add_argument("--min-time", type=float, default=0.1, help="seconds per timed repeat")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--quick", action="store_true", help="short runs for a smoke check")
+    parser.add_argument("--baseline", help="compare against this results file")
+    parser.add_argument("--threshold", type=float,
+                        default=float(os.getenv("BENCH_REGRESSION_PCT", 15)),
+                        help="allowed slowdown in percent before failing")
+    parser.add_argument("--save-baseline", help="write results as a new baseline")
+    parser.add_argument("--output", help="write JSON report to this file")
+    args = parser.parse_args()
+
+    if args.quick:
+        args.min_time, args.repeat = 0.01, 3
+    results = run_cases(args.only, args.min_time, args.repeat)
+
+    report: Dict[str, Any] = {"timestamp": time.time(), "python": sys.version.split()[0],
+                              "results": results}
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)["results"]
+        report["threshold_pct"] = args.threshold
+        report["regressions"] = compare(results, baseline, args.threshold)
+
+    text = json.dumps(report, indent=2)
+    for path in (args.output, args.save_baseline):
+        if path:
+            with open(path, "w") as f:
+                f.write(text)
+    print(text)
+
+    if report.get("regressions"):
+        for r in report["regressions"]:
+            print(f"REGRESSION {r['case']}: {r['change_pct']:+.1f}%", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,340 @@
+"""
+Load Test - Simulated players with scripted behaviour mixes
+
+Connects hundreds to thousands of headless Socket.IO players to a local
+server (started here, or an already running one via --url) and runs them
+for a fixed duration:
+
+- wanderer: walks to an adjacent tile every --move-interval seconds
+- chatter: sends a chat line every --chat-interval seconds
+- idle: joins and only listens
+- gm (--gms): runs combat among the players, advancing turns
+
+Every client listens to the broadcasts, so end-to-end latency is measured
+from the sender's emit to each receiver's handler for `character_moved` /
+`positions_update`, `chat_message` and `turn_advanced`, plus the
+sender-only `move_ack` round trip. Reports p50/p95/p99, throughput and
+error/throttle counts as JSON for comparing builds.
+
+Usage (from backend/):
+    python -m benchmarks.load_test --players 500 --mix wanderer=60,chatter=20,idle=20 --duration 30
+    python -m benchmarks.load_test --url http://127.0.0.1:5000 --players 200 --output report.json
+
+A started server inherits this environment, so limits can be raised for big
+runs, e.g. `GAME_RATE_LIMITS=move_character=5000/5000 python -m ...`;
+otherwise throttled events are reported under `throttled`.
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+from collections import defaultdict
+from typing import Dict, Any, List, Optional
+
+import socketio
+
+from benchmarks.server_modes import MODES, percentile, start_server, wait_for_server
+
+
+BEHAVIOURS = ("wanderer", "chatter", "idle")
+
+
+def parse_mix(spec: str) -> Dict[str, float]:
+    """Parse `behaviour=weight,...` into normalized fractions"""
+    weights = {}
+    for part in spec.split(","):
+        name, _, weight = part.strip().partition("=")
+        if not name:
+            continue
+        if name not in BEHAVIOURS:
+            raise ValueError(f"Unknown behaviour: {name}")
+        weights[name] = float(weight or 1)
+    total = sum(weights.values())
+    return {name: w / total for name, w in weights.items()}
+
+
+def assign_behaviours(players: int, mix: Dict[str, float]) -> List[str]:
+    """Deterministic behaviour per player index matching the mix"""
+    assigned = []
+    for name, fraction in mix.items():
+        assigned += [name] * int(round(players * fraction))
+    assigned = (assigned + ["idle"] * players)[:players]
+    return assigned
+
+
+class LoadStats:
+    """Counters and latency samples shared by every simulated client"""
+
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.sent: Dict[str, int] = defaultdict(int)
+        self.received: Dict[str, int] = defaultdict(int)
+        self.errors: Dict[str, int] = defaultdict(int)
+        self.throttled: Dict[str, int] = defaultdict(int)
+        # send time keyed by what receivers can see in the broadcast
+        self.move_sent: Dict[tuple, float] = {}
+        self.chat_sent: Dict[str, float] = {}
+        self.turn_sent: Optional[float] = None
+        self.ack_sent: Dict[tuple, float] = {}
+
+    def record(self, kind: str, started: Optional[float]):
+        if started is not None:
+            self.latencies[kind].append(time.perf_counter() - started)
+
+    def report(self, window: float) -> Dict[str, Any]:
+        return {
+            "duration_s": round(window, 3),
+            "sent": dict(self.sent),
+            "received": dict(self.received),
+            "throughput": {
+                "sent_per_s": round(sum(self.sent.values()) / window, 1) if window else 0.0,
+                "received_per_s": round(sum(self.received.values()) / window, 1) if window else 0.0
+            },
+            "errors": dict(self.errors),
+            "throttled": dict(self.throttled),
+            "error_rate": (sum(self.errors.values()) / max(1, sum(self.sent.values()))),
+            "latency_ms": {
+                kind: {
+                    "count": len(samples),
+                    "p50": round(percentile(samples, 50) * 1000, 3),
+                    "p95": round(percentile(samples, 95) * 1000, 3),
+                    "p99": round(percentile(samples, 99) * 1000, 3),
+                    "max": round(max(samples) * 1000, 3)
+                }
+                for kind, samples in self.latencies.items() if samples
+            }
+        }
+
+
+async def pause(seconds: float, until: float):
+    """Sleep, but not past the end of the load window"""
+    await asyncio.sleep(max(0.0, min(seconds, until - time.perf_counter())))
+
+
+class SimulatedPlayer:
+    """One headless client running a behaviour script"""
+
+    def __init__(self, index: int, behaviour: str, stats: LoadStats, args, is_gm: bool = False):
+        self.index = index
+        self.behaviour = behaviour
+        self.stats = stats
+        self.args = args
+        self.is_gm = is_gm
+        self.player_id = f"load_gm_{index}" if is_gm else f"load_{index}"
+        self.position = {"x": random.randrange(args.board), "y": random.randrange(args.board)}
+        self.seq = 0
+        self.in_combat = False
+        self.turns = 0
+        self.client = socketio.AsyncClient(reconnection=False)
+        self._register()
+
+    def _register(self):
+        stats = self.stats
+
+        @self.client.on("character_moved")
+        async def on_moved(data):
+            stats.received["character_moved"] += 1
+            pos = data["new_position"]
+            stats.record("broadcast_move", stats.move_sent.get((data["player_id"], pos["x"], pos["y"])))
+
+        @self.client.on("positions_update")
+        async def on_positions(data):
+            stats.received["positions_update"] += 1
+            for entry in data["positions"]:
+                pos = entry["position"]
+                stats.record("broadcast_move", stats.move_sent.get((entry["player_id"], pos["x"], pos["y"])))
+
+        @self.client.on("chat_message")
+        async def on_chat(data):
+            stats.received["chat_message"] += 1
+            stats.record("broadcast_chat", stats.chat_sent.get(data["text"]))
+
+        @self.client.on("turn_advanced")
+        async def on_turn(data):
+            stats.received["turn_advanced"] += 1
+            stats.record("broadcast_turn", stats.turn_sent)
+
+        @self.client.on("move_ack")
+        async def on_ack(data):
+            stats.received["move_ack"] += 1
+            if not data.get("accepted"):
+                stats.errors["move_rejected"] += 1
+            stats.record("move_ack_rtt", stats.ack_sent.pop((self.player_id, data.get("seq")), None))
+
+        @self.client.on("rate_limited")
+        async def on_limited(data):
+            stats.throttled[data.get("event", "unknown")] += 1
+
+        @self.client.on("error")
+        async def on_error(data):
+            stats.errors["server_error"] += 1
+
+        @self.client.on("*")
+        async def on_other(event, *data):
+            stats.received[event] += 1
+
+    async def connect(self, url: str) -> bool:
+        try:
+            await self.client.connect(url, wait_timeout=10)
+            await self.client.emit("player_join", {
+                "player_id": self.player_id,
+                "character_name": f"Load {self.index}",
+                "is_gm": self.is_gm
+            })
+            self.stats.sent["player_join"] += 1
+            return True
+        except Exception:
+            self.stats.errors["connect"] += 1
+            return False
+
+    async def emit(self, event_name: str, data: Dict[str, Any]):
+        try:
+            await self.client.emit(event_name, data)
+            self.stats.sent[event_name] += 1
+        except Exception:
+            self.stats.errors[f"emit_{event_name}"] += 1
+
+    async def run(self, until: float, players: List["SimulatedPlayer"]):
+        # Stagger start so periodic actions do not all land on the same tick
+        await pause(random.random() * self.args.move_interval, until)
+        while time.perf_counter() < until and self.client.connected:
+            if self.is_gm:
+                await self.gm_step(players)
+                await pause(self.args.turn_interval, until)
+            elif self.behaviour == "wanderer":
+                await self.wander_step()
+                await pause(self.args.move_interval * random.uniform(0.8, 1.2), until)
+            elif self.behaviour == "chatter":
+                await self.chat_step()
+                await pause(self.args.chat_interval * random.uniform(0.8, 1.2), until)
+            else:
+                await pause(1.0, until)
+
+    async def wander_step(self):
+        board = self.args.board
+        self.position = {
+            "x": min(board - 1, max(0, self.position["x"] + random.choice((-1, 0, 1)))),
+            "y": min(board - 1, max(0, self.position["y"] + random.choice((-1, 0, 1))))
+        }
+        self.seq += 1
+        now = time.perf_counter()
+        self.stats.move_sent[(self.player_id, self.position["x"], self.position["y"])] = now
+        self.stats.ack_sent[(self.player_id, self.seq)] = now
+        await self.emit("move_character", {"player_id": self.player_id, "seq": self.seq, **self.position})
+
+    async def chat_step(self):
+        text = f"load {self.index} {time.perf_counter():.6f}"
+        self.stats.chat_sent[text] = time.perf_counter()
+        await self.emit("chat_message", {"player_id": self.player_id, "text": text})
+
+    async def gm_step(self, players: List["SimulatedPlayer"]):
+        if not self.in_combat:
+            sample = random.sample(players, min(len(players), self.args.combatants))
+            participants = [{"id": p.player_id, "name": f"Load {p.index}"} for p in sample]
+            await self.emit("request_combat", {"player_id": self.player_id, "participants": participants})
+            self.in_combat = True
+            self.turns = 0
+            return
+        self.turns += 1
+        if self.turns > self.args.turns_per_combat:
+            await self.emit("end_combat", {"player_id": self.player_id})
+            self.in_combat = False
+            return
+        self.stats.turn_sent = time.perf_counter()
+        await self.emit("next_turn", {"player_id": self.player_id})
+
+
+async def run_load(args) -> Dict[str, Any]:
+    """Connect, run the behaviour mix for the duration, and report"""
+    proc = None
+    url = args.url
+    if not url:
+        url = f"http://127.0.0.1:{args.port}"
+        proc = start_server(args.mode, args.port)
+    stats = LoadStats()
+    players: List[SimulatedPlayer] = []
+    try:
+        await wait_for_server(url)
+
+        behaviours = assign_behaviours(args.players, parse_mix(args.mix))
+        candidates = [SimulatedPlayer(i, b, stats, args) for i, b in enumerate(behaviours)]
+        candidates += [SimulatedPlayer(i, "gm", stats, args, is_gm=True) for i in range(args.gms)]
+
+        connect_started = time.perf_counter()
+        for start in range(0, len(candidates), args.batch):
+            batch = candidates[start:start + args.batch]
+            results = await asyncio.gather(*(p.connect(url) for p in batch))
+            players += [p for p, ok in zip(batch, results) if ok]
+        connect_seconds = time.perf_counter() - connect_started
+
+        await asyncio.sleep(1.0)
+        for kind in list(stats.latencies):
+            stats.latencies[kind].clear()
+        stats.received.clear()
+
+        run_started = time.perf_counter()
+        until = run_started + args.duration
+        regular = [p for p in players if not p.is_gm]
+        await asyncio.gather(*(p.run(until, regular) for p in players))
+        await asyncio.sleep(args.drain)
+        elapsed = time.perf_counter() - run_started
+
+        # Rates cover the configured window; late deliveries during the
+        # drain still count towards it
+        report = stats.report(args.duration)
+        report.update({
+            "elapsed_s": round(elapsed, 3),
+            "target": url,
+            "mode": None if args.url else args.mode,
+            "players_requested": args.players + args.gms,
+            "players_connected": len(players),
+            "connect_seconds": round(connect_seconds, 3),
+            "mix": parse_mix(args.mix),
+            "gms": args.gms
+        })
+        return report
+    finally:
+        await asyncio.gather(*(p.client.disconnect() for p in players), return_exceptions=True)
+        if proc:
+            proc.terminate()
+            proc.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--url", help="existing server to target (otherwise one is started)")
+    parser.add_argument("--mode", default="threaded", choices=list(MODES))
+    parser.add_argument("--port", type=int, default=5200)
+    parser.add_argument("--players", type=int, default=200)
+    parser.add_argument("--mix", default="wanderer=60,chatter=20,idle=20")
+    parser.add_argument("--gms", type=int, default=1, help="GM clients running combat")
+    parser.add_argument("--duration", type=float, default=20.0, help="seconds of load")
+    parser.add_argument("--drain", type=float, default=2.0, help="seconds to wait for late deliveries")
+    parser.add_argument("--move-interval", type=float, default=1.0)
+    parser.add_argument("--chat-interval", type=float, default=10.0)
+    parser.add_argument("--turn-interval", type=float, default=2.0)
+    parser.add_argument("--combatants", type=int, default=6)
+    parser.add_argument("--turns-per-combat", type=int, default=10)
+    parser.add_argument("--board", type=int, default=50, help="wander area side in tiles")
+    parser.add_argument("--batch", type=int, default=50, help="clients connected per ramp step")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="write JSON report to this file")
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    report = asyncio.run(run_load(args))
+    report["timestamp"] = time.time()
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text)
+    print(text)
+    if report["players_connected"] < report["players_requested"]:
+        print("warning: not every player connected", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
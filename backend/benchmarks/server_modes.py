@@ -0,0 +1,173 @@
+"""
+Server Mode Benchmark - Threaded Flask runner vs. native asyncio (ASGI)
+
+Starts each server mode as a subprocess, ramps up Socket.IO clients until
+connections start failing (or the target is reached), then measures
+broadcast latency of `character_moved` from one mover to every other client.
+
+Usage (from backend/):
+    python -m benchmarks.server_modes --clients 500 --moves 50
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+from typing import Dict, Any, List
+
+import socketio
+
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# app.py refuses to run Werkzeug outside DEBUG, and DEBUG adds the reloader,
+# so the threaded mode is launched the same way minus that guard
+MODES = {
+    "threaded": [sys.executable, "-c",
+                 "from app import app, sio, get_event_handler; from config import Config; "
+                 "get_event_handler(); "
+                 "sio.run(app, host=Config.HOST, port=Config.PORT, allow_unsafe_werkzeug=True)"],
+    "asgi": [sys.executable, "asgi.py"],
+}
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    """Nearest-rank percentile of a list of samples"""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    k = max(0, min(len(ordered) - 1, int(round(pct / 100.0 * len(ordered))) - 1))
+    return ordered[k]
+
+
+def start_server(mode: str, port: int) -> subprocess.Popen:
+    """Launch a server mode on the given port"""
+    env = dict(os.environ, PORT=str(port), HOST="127.0.0.1")
+    return subprocess.Popen(
+        MODES[mode], cwd=BACKEND_DIR, env=env,
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+
+
+async def wait_for_server(url: str, timeout: float = 15.0):
+    """Poll until the server accepts a Socket.IO connection"""
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        probe = socketio.AsyncClient()
+        try:
+            await probe.connect(url, wait_timeout=2)
+            await probe.disconnect()
+            return
+        except Exception:
+            await asyncio.sleep(0.3)
+    raise RuntimeError(f"Server at {url} did not come up")
+
+
+async def run_mode(mode: str, port: int, clients: int, moves: int,
+                   connect_batch: int) -> Dict[str, Any]:
+    """Benchmark one server mode"""
+    url = f"http://127.0.0.1:{port}"
+    proc = start_server(mode, port)
+    connected: List[socketio.AsyncClient] = []
+    sent_at: Dict[int, float] = {}
+    latencies: List[float] = []
+    failures = 0
+
+    try:
+        await wait_for_server(url)
+
+        def make_client(index: int) -> socketio.AsyncClient:
+            client = socketio.AsyncClient(reconnection=False)
+
+            @client.on("character_moved")
+            async def on_moved(data):
+                started = sent_at.get(data["new_position"]["x"])
+                if started is not None:
+                    latencies.append(time.perf_counter() - started)
+            return client
+
+        async def connect_one(index: int) -> bool:
+            client = make_client(index)
+            try:
+                await client.connect(url, wait_timeout=10)
+                await client.emit("player_join", {
+                    "player_id": f"bench_{index}",
+                    "character_name": f"Bench {index}"
+                })
+                connected.append(client)
+                return True
+            except Exception:
+                return False
+
+        # Ramp up in batches until the target or the first failing batch
+        for start in range(0, clients, connect_batch):
+            batch = range(start, min(clients, start + connect_batch))
+            results = await asyncio.gather(*(connect_one(i) for i in batch))
+            failures += results.count(False)
+            if not all(results):
+                break
+
+        # Broadcast latency: one mover, every client (mover included) listens
+        if len(connected) >= 2:
+            mover = connected[0]
+            await asyncio.sleep(1.0)
+            for step in range(moves):
+                sent_at[step] = time.perf_counter()
+                await mover.emit("move_character", {"player_id": "bench_0", "x": step, "y": 0})
+                await asyncio.sleep(0.05)
+            await asyncio.sleep(2.0)
+
+        expected = len(connected) * moves
+        return {
+            "mode": mode,
+            "target_clients": clients,
+            "max_concurrent_connections": len(connected),
+            "connect_failures": failures,
+            "moves": moves,
+            "deliveries": len(latencies),
+            "delivery_ratio": len(latencies) / expected if expected else 0.0,
+            "latency_ms": {
+                "p50": percentile(latencies, 50) * 1000,
+                "p95": percentile(latencies, 95) * 1000,
+                "p99": percentile(latencies, 99) * 1000,
+            }
+        }
+    finally:
+        await asyncio.gather(*(c.disconnect() for c in connected), return_exceptions=True)
+        proc.terminate()
+        proc.wait()
+
+
+async def main_async(args) -> List[Dict[str, Any]]:
+    """Run every requested mode in sequence"""
+    results = []
+    for i, mode in enumerate(args.modes):
+        result = await run_mode(mode, args.port + i, args.clients, args.moves, args.batch)
+        print(json.dumps(result), file=sys.stderr)
+        results.append(result)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--modes", nargs="+", default=list(MODES), choices=list(MODES))
+    parser.add_argument("--clients", type=int, default=200)
+    parser.add_argument("--moves", type=int, default=50)
+    parser.add_argument("--batch", type=int, default=50, help="clients connected per ramp step")
+    parser.add_argument("--port", type=int, default=5100)
+    parser.add_argument("--output", help="write JSON report to this file")
+    args = parser.parse_args()
+
+    results = asyncio.run(main_async(args))
+    report = json.dumps({"timestamp": time.time(), "results": results}, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(report)
+    print(report)
+
+
+if __name__ == "__main__":
+    main()
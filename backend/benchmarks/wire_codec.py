@@ -0,0 +1,101 @@
+"""
+Wire Codec Benchmark - JSON vs. compact MessagePack payloads
+
+Measures, per event, the bytes a client receives (full Socket.IO packet
+including the binary attachment header) and the server-side CPU time to
+build that packet, for the default JSON encoding and the negotiated
+msgpack schema.
+
+Usage (from backend/):
+    python -m benchmarks.wire_codec --iterations 20000
+"""
+
+import argparse
+import json
+import time
+import timeit
+from typing import Dict, Any
+
+from socketio import packet
+
+from features import wire_codec
+
+
+def sample_events(batch_size: int) -> Dict[str, Dict[str, Any]]:
+    """Representative payloads as the handlers build them"""
+    now = time.time()
+    return {
+        "character_moved": {
+            "player_id": "player_1718200000000_k3j9x2m1a",
+            "character_name": "Aragorn",
+            "old_position": {"x": 14, "y": 22},
+            "new_position": {"x": 15, "y": 22},
+            "timestamp": now
+        },
+        "positions_update": {
+            "positions": [
+                {"player_id": f"player_{i}", "character_name": f"Hero {i}",
+                 "position": {"x": i, "y": i * 2}}
+                for i in range(batch_size)
+            ],
+            "tick": 1200,
+            "timestamp": now
+        },
+        "map_delta": {
+            "map_name": "dungeon_level_1",
+            "tiles": [
+                {"x": i, "y": 7, "type": "wall", "obstacle": True}
+                for i in range(batch_size)
+            ],
+            "timestamp": now
+        },
+    }
+
+
+def wire_size(encoded) -> int:
+    """Bytes on the wire for an encoded Socket.IO packet (text or text + attachments)"""
+    parts = encoded if isinstance(encoded, list) else [encoded]
+    return sum(len(p.encode("utf-8")) if isinstance(p, str) else len(p) for p in parts)
+
+
+def build_json(event_name: str, data: Dict[str, Any]):
+    return packet.Packet(packet.EVENT, data=[event_name, data]).encode()
+
+
+def build_msgpack(event_name: str, data: Dict[str, Any]):
+    return packet.Packet(packet.EVENT, data=[event_name, wire_codec.encode(event_name, data)]).encode()
+
+
+def run(iterations: int, batch_size: int) -> Dict[str, Any]:
+    """Benchmark every schema'd event"""
+    results = {}
+    for event_name, data in sample_events(batch_size).items():
+        json_bytes = wire_size(build_json(event_name, data))
+        msgpack_bytes = wire_size(build_msgpack(event_name, data))
+        json_us = timeit.timeit(lambda: build_json(event_name, data), number=iterations) / iterations * 1e6
+        msgpack_us = timeit.timeit(lambda: build_msgpack(event_name, data), number=iterations) / iterations * 1e6
+        results[event_name] = {
+            "json_bytes": json_bytes,
+            "msgpack_bytes": msgpack_bytes,
+            "bytes_saved_pct": 100.0 * (json_bytes - msgpack_bytes) / json_bytes,
+            "json_encode_us": json_us,
+            "msgpack_encode_us": msgpack_us,
+            "cpu_saved_pct": 100.0 * (json_us - msgpack_us) / json_us,
+        }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=20000)
+    parser.add_argument("--batch-size", type=int, default=10,
+                        help="entries per positions_update / map_delta")
+    args = parser.parse_args()
+
+    if not wire_codec.available():
+        raise SystemExit("msgpack is not installed")
+    print(json.dumps(run(args.iterations, args.batch_size), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -3,6 +3,8 @@
 import os
 from dotenv import load_dotenv
 
+from features.rate_limit import parse_limits
+
 load_dotenv()
 
 class Config:
@@ -21,7 +23,101 @@ class Config:
     
     # WebSocket
     CORS_ORIGINS = "*"  # Allow all origins for development
+    # Socket.IO packet serializer for every client ("default" JSON or "msgpack");
+    # per-client opt-in to compact payloads is negotiated separately at connect
+    SOCKETIO_SERIALIZER = os.getenv("SOCKETIO_SERIALIZER", "default")
+    
+    # Serve player_web static files content-hashed and precompressed under /assets
+    STATIC_FINGERPRINTING = os.getenv("STATIC_FINGERPRINTING", "True") == "True"
+    
+    # Broadcast tick: coalesce moves into one positions_update per tick (0 = off)
+    BROADCAST_TICK_HZ = float(os.getenv("BROADCAST_TICK_HZ", 0))
+    
+    # Area of interest: only send positional events to nearby sessions
+    AOI_ENABLED = os.getenv("AOI_ENABLED", "False") == "True"
+    AOI_CELL_SIZE = int(os.getenv("AOI_CELL_SIZE", 8))
+    AOI_RADIUS_CELLS = int(os.getenv("AOI_RADIUS_CELLS", 2))
+    # Clients may subscribe to a visible rectangle with set_viewport
+    VIEWPORTS_ENABLED = os.getenv("VIEWPORTS_ENABLED", "True") == "True"
+    
+    # Per-connection outbound queues: hold messages while a client's transport
+    # backlog exceeds the window, disconnect once the queue passes the watermark
+    OUTBOUND_QUEUES_ENABLED = os.getenv("OUTBOUND_QUEUES_ENABLED", "False") == "True"
+    OUTBOUND_QUEUE_MAX = int(os.getenv("OUTBOUND_QUEUE_MAX", 256))
+    OUTBOUND_TRANSPORT_WINDOW = int(os.getenv("OUTBOUND_TRANSPORT_WINDOW", 16))
+    
+    # Token-bucket limits as "event=rate/burst,..." per player (per sid before joining) and per game
+    RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "True") == "True"
+    RATE_LIMITS = os.getenv(
+        "RATE_LIMITS",
+        "move_character=20/40,chat_message=2/5,echo=5/10,request_game_state=2/5,set_viewport=10/20,"
+        "roll_dice=5/10,preview_aoe=30/60,request_reach=10/20,generate_map=0.2/2,place_light=10/20,"
+        "modify_map=5/10,request_dice_log=1/5"
+    )
+    GAME_RATE_LIMITS = os.getenv("GAME_RATE_LIMITS", "move_character=200/400,chat_message=20/40")
+    
+    # Session resume: keep disconnected sessions this long for a token reconnect (0 = off)
+    SESSION_GRACE_SECONDS = float(os.getenv("SESSION_GRACE_SECONDS", 30))
+    RESUME_JOURNAL_SIZE = int(os.getenv("RESUME_JOURNAL_SIZE", 500))
+    
+    # Logging (queued, written by a background thread)
+    LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+    LOG_FORMAT = os.getenv("LOG_FORMAT", "json")  # "json" lines or "text"
+    EVENT_LOG_LEVELS = os.getenv("EVENT_LOG_LEVELS", "echo=DEBUG")
+    LOG_SAMPLE_PER_SECOND = os.getenv("LOG_SAMPLE_PER_SECOND", "move_character=5")
+    
+    # Prometheus metrics at /api/metrics
+    METRICS_ENABLED = os.getenv("METRICS_ENABLED", "True") == "True"
+    
+    # Handler profiling (also switchable at runtime via /api/debug/profiling)
+    PROFILE_DIR = os.path.join(DATA_DIR, "profiles")
+    PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", 0))  # fraction of calls timed
+    PROFILE_SLOW_MS = float(os.getenv("PROFILE_SLOW_MS", 0))  # log handlers slower than this (0 = off)
+    
+    # Stream loaded maps to clients as map_chunk events, token area first
+    MAP_STREAM_ENABLED = os.getenv("MAP_STREAM_ENABLED", "True") == "True"
+    MAP_STREAM_CHUNKS_PER_TICK = int(os.getenv("MAP_STREAM_CHUNKS_PER_TICK", 4))  # per client
+    MAP_STREAM_TICK_SECONDS = float(os.getenv("MAP_STREAM_TICK_SECONDS", 0.05))
+    
+    # Largest tile window served by /api/maps/<name>/tiles
+    TILE_WINDOW_MAX_TILES = int(os.getenv("TILE_WINDOW_MAX_TILES", 65536))
+    
+    # Dice: per-game generator seed (0 = random) and length of the roll log
+    DICE_SEED = int(os.getenv("DICE_SEED", 0))
+    DICE_HISTORY = int(os.getenv("DICE_HISTORY", 500))
+    DICE_MAX_BATCH = int(os.getenv("DICE_MAX_BATCH", 100))  # results per roll_dice
+    
+    # Largest area-of-effect template (radius/length/side) in feet
+    AOE_MAX_FEET = float(os.getenv("AOE_MAX_FEET", 120))
+    
+    # Movement range (request_reach): default and largest speed in feet
+    DEFAULT_SPEED_FEET = float(os.getenv("DEFAULT_SPEED_FEET", 30))
+    MAX_SPEED_FEET = float(os.getenv("MAX_SPEED_FEET", 120))
+    
+    # NPC simulation steps per second (0 = NPCs stay put) and NPC cap per map
+    NPC_TICK_HZ = float(os.getenv("NPC_TICK_HZ", 5))
+    NPC_MAX = int(os.getenv("NPC_MAX", 500))
+    
+    # Tokens may not move onto a tile another token or blocking object holds;
+    # OCCUPANCY_CHECKS verifies the occupancy grid after every change (default: DEBUG)
+    OCCUPANCY_BLOCKING = os.getenv("OCCUPANCY_BLOCKING", "True") == "True"
+    OCCUPANCY_CHECKS = os.getenv("OCCUPANCY_CHECKS", str(DEBUG)) == "True"
+    
+    # Lighting: ambient level of a newly loaded map (dark, dim, bright), largest
+    # light radius, how far tokens see under fog of war, tiles per modify_map
+    LIGHT_AMBIENT = os.getenv("LIGHT_AMBIENT", "bright")
+    LIGHT_MAX_FEET = float(os.getenv("LIGHT_MAX_FEET", 120))
+    VISION_FEET = float(os.getenv("VISION_FEET", 120))
+    MAP_EDIT_MAX_TILES = int(os.getenv("MAP_EDIT_MAX_TILES", 1024))
+    
+    # Procedural maps (generate_map): worker processes and largest side in tiles
+    MAPGEN_WORKERS = int(os.getenv("MAPGEN_WORKERS", 2))
+    MAPGEN_MAX_SIDE = int(os.getenv("MAPGEN_MAX_SIDE", 512))
     
     # Game defaults
     DEFAULT_GRID_SIZE = 50
     MAX_PLAYERS_PER_GAME = 10
+
+# Fail at startup on malformed limits, not when the event handler is first built
+parse_limits(Config.RATE_LIMITS)
+parse_limits(Config.GAME_RATE_LIMITS)
@@ -0,0 +1,109 @@
+"""Shared pytest fixtures."""
+
+import threading
+
+import pytest
+from flask import Flask, request
+from flask_socketio import SocketIO
+
+from config import Config
+from features.websocket_events import WebSocketEventHandler
+
+
+# Optional subsystems start off; a test turns on what it exercises
+HANDLER_CONFIG = {
+    "BROADCAST_TICK_HZ": 0,
+    "AOI_ENABLED": False,
+    "VIEWPORTS_ENABLED": False,
+    "OUTBOUND_QUEUES_ENABLED": False,
+    "RATE_LIMIT_ENABLED": False,
+    "SESSION_GRACE_SECONDS": 0,
+    "METRICS_ENABLED": False,
+    "MAP_STREAM_ENABLED": False,
+    "NPC_TICK_HZ": 0,
+}
+
+
+class FakeSocketIO:
+    """Socket.IO stand-in for the subsystems that only start background tasks
+
+    Tasks are recorded in `tasks` without running and sleep returns at once,
+    so tests drive ticks by hand. With `threaded`, tasks also run on threads
+    (kept in `threads`) and sleep waits for real.
+    """
+
+    def __init__(self, threaded: bool = False):
+        self.threaded = threaded
+        self.tasks, self.threads = [], []
+
+    def start_background_task(self, target, *args, **kwargs):
+        self.tasks.append(target)
+        if self.threaded:
+            thread = threading.Thread(target=target, args=args, kwargs=kwargs)
+            thread.start()
+            self.threads.append(thread)
+
+    def sleep(self, seconds):
+        if self.threaded:
+            threading.Event().wait(seconds)
+
+
+@pytest.fixture
+def fake_sio():
+    """A FakeSocketIO whose background tasks never run"""
+    return FakeSocketIO()
+
+
+@pytest.fixture
+def threaded_sio():
+    """A FakeSocketIO running background tasks on threads, joined after the test"""
+    sio = FakeSocketIO(threaded=True)
+    yield sio
+    for thread in sio.threads:
+        thread.join()
+
+
+@pytest.fixture
+def make_handler(monkeypatch):
+    """Build WebSocketEventHandlers through the real constructor, recording what they send
+
+    Keyword arguments override Config before construction. Only the sending
+    side is patched: `handler.replies` holds (event, data), `handler.emits`
+    (event, data, to), `handler.broadcasts` (event, data, skip_sid) for emits
+    addressed to everyone and `handler.rooms` (sid, room) joins. Events are
+    handled as `request.sid`, initially "sid_1".
+    """
+    app = Flask(__name__)
+    context = app.test_request_context()
+    context.push()
+    request.sid, request.namespace = "sid_1", "/"
+    handlers = []
+
+    def make(**config):
+        for key, value in {**HANDLER_CONFIG, **config}.items():
+            monkeypatch.setattr(Config, key, value)
+        sio = SocketIO(app, async_mode="threading")
+        handler = WebSocketEventHandler(sio)
+        handler.replies, handler.emits, handler.broadcasts, handler.rooms = [], [], [], []
+
+        def emit(event_name, data, to=None, skip_sid=None, **kwargs):
+            handler.emits.append((event_name, data, to))
+            if to is None:
+                handler.broadcasts.append((event_name, data, skip_sid))
+
+        monkeypatch.setattr(sio, "emit", emit)
+        monkeypatch.setattr(handler, "reply", lambda event_name, data: handler.replies.append((event_name, data)))
+        monkeypatch.setattr(handler, "join_player_room", lambda room: handler.rooms.append((request.sid, room)))
+        handlers.append(handler)
+        return handler
+
+    yield make
+    for handler in handlers:
+        handler.map_generator.shutdown()
+    context.pop()
+
+
+@pytest.fixture
+def handler(make_handler):
+    """An event handler with every optional subsystem off"""
+    return make_handler()
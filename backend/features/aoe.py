@@ -0,0 +1,172 @@
+"""
+Area of Effect - Sphere, cone, line and cube templates on the board grid
+
+A template's tiles are precomputed once per (shape, size, orientation) as
+offset arrays relative to its origin, together with the tiles between the
+origin and each offset. Resolving a template at a position is then a few
+array operations: offsets are shifted and clipped to the board, any offset
+whose path crosses an obstacle (or that is an obstacle itself) is covered,
+and token positions are matched against the remaining tiles.
+
+Sizes are in feet (FEET_PER_TILE per tile). Directions are degrees with
+0 = +x (east) and 90 = +y (down the map), snapped to ORIENTATION_STEP so
+dragging a template reuses a small set of cached masks.
+
+- sphere: tiles whose centre lies within the radius of the origin tile
+- cone:   length = size, width at any distance equal to that distance
+- line:   size long, one tile wide, starting next to the origin
+- cube:   size x size tiles centred on the origin, axis-aligned
+"""
+
+import math
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, Any, List, Optional, Tuple
+
+import numpy as np
+
+
+SHAPES = ("sphere", "cone", "line", "cube")
+FEET_PER_TILE = 5
+ORIENTATION_STEP = 15  # degrees
+_EPSILON = 1e-9
+
+
+@dataclass(frozen=True)
+class Template:
+    """Cached offsets of one template, plus the tiles between origin and each offset"""
+    dx: np.ndarray          # (n,)
+    dy: np.ndarray          # (n,)
+    path_dx: np.ndarray     # (n, max_path)
+    path_dy: np.ndarray     # (n, max_path)
+    path_valid: np.ndarray  # (n, max_path) bool
+
+
+def _between(dx: int, dy: int) -> List[Tuple[int, int]]:
+    """Tiles strictly between (0, 0) and (dx, dy) on a Bresenham line"""
+    cells = []
+    x = y = 0
+    step_x, step_y = (dx > 0) - (dx < 0), (dy > 0) - (dy < 0)
+    ax, ay = abs(dx), abs(dy)
+    error = ax - ay
+    while (x, y) != (dx, dy):
+        doubled = 2 * error
+        if doubled > -ay:
+            error -= ay
+            x += step_x
+        if doubled < ax:
+            error += ax
+            y += step_y
+        cells.append((x, y))
+    return cells[:-1]
+
+
+def _offsets(shape: str, size: float, orientation: int) -> List[Tuple[int, int]]:
+    reach = int(math.ceil(size))
+    angle = math.radians(orientation * ORIENTATION_STEP)
+    ux, uy = math.cos(angle), math.sin(angle)
+    offsets = []
+    for dy in range(-reach, reach + 1):
+        for dx in range(-reach, reach + 1):
+            if shape == "sphere":
+                inside = dx * dx + dy * dy <= size * size + _EPSILON
+            elif shape == "cube":
+                side = max(1, int(round(size)))
+                inside = -(side - 1) // 2 <= dx <= side // 2 and -(side - 1) // 2 <= dy <= side // 2
+            else:
+                along = dx * ux + dy * uy
+                if along <= _EPSILON or along > size + _EPSILON:
+                    inside = False
+                elif shape == "line":
+                    inside = abs(dy * ux - dx * uy) <= 0.5 + _EPSILON
+                else:
+                    inside = abs(dy * ux - dx * uy) <= along * 0.5 + _EPSILON
+            if inside:
+                offsets.append((dx, dy))
+    return offsets
+
+
+@lru_cache(maxsize=256)
+def get_template(shape: str, size: float, orientation: int = 0) -> Template:
+    """Offsets of a template `size` tiles big at orientation index `orientation`"""
+    if shape not in SHAPES:
+        raise ValueError(f"Unknown template shape: {shape}")
+    offsets = _offsets(shape, size, orientation)
+    paths = [_between(dx, dy) for dx, dy in offsets]
+    longest = max((len(p) for p in paths), default=0)
+    path_dx = np.zeros((len(offsets), longest), dtype=np.int32)
+    path_dy = np.zeros((len(offsets), longest), dtype=np.int32)
+    path_valid = np.zeros((len(offsets), longest), dtype=bool)
+    for i, path in enumerate(paths):
+        for j, (px, py) in enumerate(path):
+            path_dx[i, j], path_dy[i, j], path_valid[i, j] = px, py, True
+    template = Template(
+        dx=np.array([o[0] for o in offsets], dtype=np.int32),
+        dy=np.array([o[1] for o in offsets], dtype=np.int32),
+        path_dx=path_dx, path_dy=path_dy, path_valid=path_valid
+    )
+    for array in (template.dx, template.dy, path_dx, path_dy, path_valid):
+        array.flags.writeable = False
+    return template
+
+
+def template_key(shape: str, size_feet: float, direction: float = 0) -> Tuple[str, float, int]:
+    """Cache key for a request: size in tiles and snapped orientation index"""
+    size = round(float(size_feet) / FEET_PER_TILE, 2)
+    if shape in ("sphere", "cube"):
+        return shape, size, 0
+    steps = 360 // ORIENTATION_STEP
+    return shape, size, int(round(float(direction) / ORIENTATION_STEP)) % steps
+
+
+def resolve(obstacles: np.ndarray, shape: str, size_feet: float, origin: Dict[str, int],
+            direction: float = 0,
+            tokens: Optional[Dict[str, Dict[str, int]]] = None) -> Dict[str, Any]:
+    """Tiles and tokens affected by a template placed at origin
+
+    Args:
+        obstacles: Bool array [y, x] of obstacle tiles (Gameboard.obstacle_grid())
+        shape: One of SHAPES
+        size_feet: Radius (sphere), length (cone, line) or side (cube)
+        origin: {"x", "y"} tile the template is anchored to
+        direction: Degrees, for cones and lines
+        tokens: {token_id: {"x", "y"}} to match against affected tiles
+
+    Returns:
+        {"tiles": [[x, y], ...], "covered": [[x, y], ...], "targets": [token_id, ...]}
+    """
+    template = get_template(*template_key(shape, size_feet, direction))
+    height, width = obstacles.shape
+    ox, oy = int(origin["x"]), int(origin["y"])
+
+    xs, ys = template.dx + ox, template.dy + oy
+    on_board = (xs >= 0) & (xs < width) & (ys >= 0) & (ys < height)
+    xs, ys = xs[on_board], ys[on_board]
+
+    px, py = template.path_dx[on_board] + ox, template.path_dy[on_board] + oy
+    path_on_board = template.path_valid[on_board] & (px >= 0) & (px < width) & (py >= 0) & (py < height)
+    blocked = obstacles[np.clip(py, 0, height - 1), np.clip(px, 0, width - 1)] & path_on_board
+    covered = blocked.any(axis=1) | obstacles[ys, xs]
+
+    hit_x, hit_y = xs[~covered], ys[~covered]
+    targets = []
+    if tokens:
+        ids = list(tokens)
+        token_cells = np.array([
+            t["y"] * width + t["x"] if 0 <= t["x"] < width and 0 <= t["y"] < height else -1
+            for t in (tokens[i] for i in ids)
+        ], dtype=np.int64)
+        hits = np.isin(token_cells, hit_y.astype(np.int64) * width + hit_x)
+        targets = [ids[i] for i in np.flatnonzero(hits)]
+
+    return {
+        "tiles": np.column_stack((hit_x, hit_y)).tolist(),
+        "covered": np.column_stack((xs[covered], ys[covered])).tolist(),
+        "targets": targets
+    }
+
+
+def get_cache_stats() -> Dict[str, int]:
+    """Template cache usage"""
+    cache = get_template.cache_info()
+    return {"templates": cache.currsize, "hits": cache.hits, "misses": cache.misses}
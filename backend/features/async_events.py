@@ -0,0 +1,114 @@
+"""
+Async Event Bridge - Run the shared event handlers on python-socketio's AsyncServer
+
+WebSocketEventHandler is written against a small synchronous Socket.IO surface
+(`on`, `emit`, `start_background_task`, `sleep`) plus a few transport hooks
+(`current_sid`, `reply`, `join_player_room`, ...). This module provides that surface
+on top of an `AsyncServer` so the ASGI entry point reuses the exact same game
+logic: handlers run inline on the event loop and their emits are scheduled as
+tasks in call order, so no thread is held per connection.
+"""
+
+import asyncio
+import contextvars
+import threading
+import time
+from typing import Dict, Any, Callable, Optional
+
+from features.websocket_events import WebSocketEventHandler
+
+
+_current_sid: contextvars.ContextVar = contextvars.ContextVar("current_sid", default=None)
+
+
+class AsyncServerFacade:
+    """Synchronous view of an AsyncServer for the shared handler logic"""
+
+    def __init__(self, server):
+        """Wrap a python-socketio AsyncServer"""
+        self.server = server
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self._tasks = set()
+
+    def on(self, event_name: str):
+        """Register a sync handler as an async Socket.IO handler"""
+        def decorator(handler: Callable):
+            self.server.on(event_name, self._wrap(event_name, handler))
+            return handler
+        return decorator
+
+    def emit(self, event_name: str, data: Optional[Dict[str, Any]] = None,
+             to: Optional[str] = None, skip_sid: Optional[str] = None):
+        """Schedule an emit on the event loop"""
+        self._schedule(self.server.emit(event_name, data, to=to, skip_sid=skip_sid))
+
+    def enter_room(self, sid: str, room: str):
+        """Schedule adding a client to a room"""
+        self._schedule(self.server.enter_room(sid, room))
+
+    def disconnect(self, sid: str):
+        """Schedule a forced disconnect"""
+        self._schedule(self.server.disconnect(sid))
+
+    def start_background_task(self, target: Callable, *args, **kwargs):
+        """Run blocking background loops on a daemon thread, off the event loop"""
+        thread = threading.Thread(target=target, args=args, kwargs=kwargs, daemon=True)
+        thread.start()
+        return thread
+
+    def sleep(self, seconds: float):
+        """Sleep for background loops (always called off the event loop)"""
+        time.sleep(seconds)
+
+    def _wrap(self, event_name: str, handler: Callable):
+        """Adapt AsyncServer's (sid, *args) calling convention to the sync handler"""
+        async def wrapper(sid, *args):
+            self.loop = asyncio.get_running_loop()
+            token = _current_sid.set(sid)
+            try:
+                if event_name == "connect":
+                    # AsyncServer passes (environ, auth)
+                    return handler(args[1] if len(args) > 1 else None)
+                if event_name == "disconnect":
+                    return handler()
+                return handler(*args)
+            finally:
+                _current_sid.reset(token)
+        return wrapper
+
+    def _schedule(self, coro):
+        """Run a coroutine on the server loop from either the loop or a worker thread"""
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+
+        if running is not None:
+            task = running.create_task(coro)
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+        elif self.loop is not None:
+            asyncio.run_coroutine_threadsafe(coro, self.loop)
+        else:
+            # Nothing connected yet, so there is nobody to send to
+            coro.close()
+
+
+class AsyncWebSocketEventHandler(WebSocketEventHandler):
+    """WebSocketEventHandler bound to an AsyncServerFacade"""
+
+    def current_sid(self) -> str:
+        """Socket.IO sid of the client whose event is being handled"""
+        return _current_sid.get()
+
+    def reply(self, event_name: str, data: Dict[str, Any]):
+        """Emit event back to the client whose event is being handled"""
+        self.sio.emit(event_name, data, to=self.current_sid())
+
+    def join_player_room(self, room: str):
+        """Add the current client to a room"""
+        self.sio.enter_room(self.current_sid(), room)
+
+    def disconnect_client(self, sid: str):
+        """Forcibly disconnect a client"""
+        self.sio.disconnect(sid)
@@ -0,0 +1,127 @@
+"""
+Broadcast Tick - Fixed-rate coalescing of high-frequency broadcasts
+
+Instead of fanning out one `character_moved` per step, movement is buffered
+and flushed once per tick as a single `positions_update` carrying only the
+final position of every token that moved during that tick. A mover that
+already has its position (a sequenced move, acked directly) is named in the
+payload's `exclude` ({player_id: sid}) so the flush can leave its own entry
+out of what that session is sent.
+"""
+
+import time
+import threading
+from typing import Dict, Any, List, Callable, Optional, Tuple
+
+from features.structured_log import get_logger
+
+
+log = get_logger("broadcast_tick")
+
+
+class MovementCoalescer:
+    """Buffers token moves and flushes them on a fixed-rate tick"""
+
+    def __init__(self, sio, tick_hz: float, flush: Callable[[Dict[str, Any]], None]):
+        """
+        Args:
+            sio: Socket.IO instance used to run the background tick task
+            tick_hz: Broadcast rate in ticks per second
+            flush: Callback receiving each batched `positions_update` payload
+                (plus `exclude` when some movers should not get their own entry)
+        """
+        self.sio = sio
+        self.interval = 1.0 / tick_hz
+        self.flush = flush
+        self.pending: Dict[str, Dict[str, Any]] = {}
+        self.exclude: Dict[str, str] = {}
+        self.lock = threading.Lock()
+        self.running = False
+        self.tick_count = 0
+        self.moves_queued = 0
+        self.batches_sent = 0
+
+    def start(self):
+        """Start the background tick task (idempotent)"""
+        with self.lock:
+            if self.running:
+                return
+            self.running = True
+        self.sio.start_background_task(self._run)
+
+    def stop(self):
+        """Stop the tick loop after its current sleep"""
+        self.running = False
+
+    def queue_move(self, player_id: str, character_name: str, position: Dict[str, int],
+                   exclude_sid: Optional[str] = None):
+        """Record a move; later moves in the same tick replace earlier ones
+
+        `exclude_sid` is the mover's session when it should not be sent this entry.
+        """
+        with self.lock:
+            self.pending[player_id] = {
+                "player_id": player_id,
+                "character_name": character_name,
+                "position": position
+            }
+            if exclude_sid:
+                self.exclude[player_id] = exclude_sid
+            else:
+                self.exclude.pop(player_id, None)
+            self.moves_queued += 1
+        if not self.running:
+            self.start()
+
+    def drain(self) -> Tuple[List[Dict[str, Any]], Dict[str, str]]:
+        """Take all pending final positions and mover exclusions, leaving the buffer empty"""
+        with self.lock:
+            if not self.pending:
+                return [], {}
+            batch, exclude = list(self.pending.values()), self.exclude
+            self.pending, self.exclude = {}, {}
+        return batch, exclude
+
+    def tick(self) -> Optional[Dict[str, Any]]:
+        """Flush one tick's worth of moves; returns the payload sent, if any"""
+        self.tick_count += 1
+        batch, exclude = self.drain()
+        if not batch:
+            return None
+
+        payload = {
+            "positions": batch,
+            "tick": self.tick_count,
+            "timestamp": time.time()
+        }
+        if exclude:
+            payload["exclude"] = exclude
+        self.flush(payload)
+        self.batches_sent += 1
+        return payload
+
+    def _run(self):
+        """Tick loop scheduled against absolute deadlines to avoid drift"""
+        next_tick = time.monotonic()
+        while self.running:
+            next_tick += self.interval
+            delay = next_tick - time.monotonic()
+            if delay > 0:
+                self.sio.sleep(delay)
+            else:
+                # Fell behind (e.g. slow flush); resync instead of bursting
+                next_tick = time.monotonic()
+            try:
+                self.tick()
+            except Exception as e:
+                log.error("broadcast_tick", "Broadcast tick failed", error=str(e))
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get coalescing statistics"""
+        return {
+            "tick_hz": 1.0 / self.interval,
+            "ticks": self.tick_count,
+            "moves_queued": self.moves_queued,
+            "batches_sent": self.batches_sent,
+            "pending": len(self.pending)
+        }
@@ -3,6 +3,7 @@
 import json
 import os
 from config import Config
+from features.metrics import timed_persistence
 
 class Character:
     """Represents a player or NPC character."""
@@ -63,6 +64,7 @@ class CharacterManager:
     """Manages character creation, loading, and saving."""
     
     @staticmethod
+    @timed_persistence("save_character")
     def save_character(character):
         """Save character to JSON file."""
         os.makedirs(Config.CHARACTERS_DIR, exist_ok=True)
@@ -71,6 +73,7 @@ class CharacterManager:
             json.dump(character.to_dict(), f, indent=2)
     
     @staticmethod
+    @timed_persistence("load_character")
     def load_character(char_id):
         """Load character from JSON file."""
         filepath = os.path.join(Config.CHARACTERS_DIR, f"{char_id}.json")
@@ -81,6 +84,7 @@ class CharacterManager:
         return Character.from_dict(data)
     
     @staticmethod
+    @timed_persistence("get_all_characters")
     def get_all_characters():
         """Get all saved characters."""
         characters = []
@@ -0,0 +1,231 @@
+"""
+Dice - Compiled dice expressions rolled in vectorized batches
+
+An expression like `4d6kh3+2` or `8d6 fire` is parsed once into a DicePlan
+(cached by its normalized text). A plan rolls any number of independent
+results in one NumPy call per dice term, so fireball damage for 30 targets
+is a single (30, 8) draw rather than 240 calls into `random`.
+
+Every game owns a DiceRoller with its own seeded generator. Rolls are
+numbered and logged with the expression and batch size; replaying the log
+against the same seed reproduces every result, which makes disputed rolls
+auditable. The seed is logged whenever the generator is (re)seeded, and the
+GM can fetch it with the roll log.
+
+Supported syntax (case-insensitive, whitespace ignored):
+    NdS      N dice with S sides (N defaults to 1, `d%` is d100)
+    kh/kl K  keep the K highest / lowest of those dice (`k` = `kh`)
+    dh/dl K  drop the K highest / lowest
+    + / -    combine dice terms and integer constants
+    trailing word: damage type label, e.g. `2d8+3 radiant`
+"""
+
+import re
+import secrets
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from features.structured_log import get_logger
+
+
+MAX_TERMS = 10
+MAX_DICE = 1000  # total dice per roll across all terms
+MAX_SIDES = 1000
+
+log = get_logger("dice")
+
+_TERM = re.compile(r"([+-])(?:(\d*)d(\d+|%)(?:(kh|kl|k|dh|dl)(\d+))?|(\d+))")
+_LABEL = re.compile(r"^(.*?[\d%])(?:\s+([a-z][a-z ]*))?$")
+
+
+class DiceError(ValueError):
+    """Invalid or oversized dice expression"""
+
+
+@dataclass(frozen=True)
+class DiceTerm:
+    """`count` dice with `sides` sides, optionally keeping only some of them"""
+    count: int
+    sides: int
+    sign: int = 1
+    keep: Optional[int] = None
+    keep_highest: bool = True
+
+    def notation(self) -> str:
+        text = f"{self.count}d{self.sides}"
+        if self.keep is not None:
+            text += f"{'kh' if self.keep_highest else 'kl'}{self.keep}"
+        return text
+
+
+@dataclass(frozen=True)
+class DicePlan:
+    """A parsed expression: dice terms plus a constant"""
+    expression: str
+    terms: Tuple[DiceTerm, ...]
+    constant: int = 0
+    damage_type: Optional[str] = None
+
+    @property
+    def minimum(self) -> int:
+        return self.constant + sum(t.sign * (t.keep if t.keep is not None else t.count)
+                                   * (1 if t.sign > 0 else t.sides) for t in self.terms)
+
+    @property
+    def maximum(self) -> int:
+        return self.constant + sum(t.sign * (t.keep if t.keep is not None else t.count)
+                                   * (t.sides if t.sign > 0 else 1) for t in self.terms)
+
+    def evaluate(self, rng: np.random.Generator, count: int = 1) -> Tuple[np.ndarray, List[np.ndarray]]:
+        """Roll `count` independent results
+
+        Returns totals (shape (count,)) and the raw dice of each term
+        (shape (count, term.count)), before keep/drop.
+        """
+        totals = np.full(count, self.constant, dtype=np.int64)
+        rolls = []
+        for term in self.terms:
+            dice = rng.integers(1, term.sides + 1, size=(count, term.count))
+            kept = dice
+            if term.keep is not None:
+                ordered = np.sort(dice, axis=1)
+                kept = ordered[:, term.count - term.keep:] if term.keep_highest else ordered[:, :term.keep]
+            totals += term.sign * kept.sum(axis=1)
+            rolls.append(dice)
+        return totals, rolls
+
+
+def normalize(expression: str) -> str:
+    """Canonical text used as the plan cache key"""
+    return " ".join(str(expression).lower().split())
+
+
+def compile_expression(expression: str) -> DicePlan:
+    """Parse an expression into a (cached) DicePlan; raises DiceError"""
+    return _compile(normalize(expression))
+
+
+@lru_cache(maxsize=512)
+def _compile(expression: str) -> DicePlan:
+    match = _LABEL.match(expression)
+    if not match:
+        raise DiceError(f"Invalid dice expression: {expression!r}")
+    body, label = match.group(1).replace(" ", ""), match.group(2)
+    if not body.startswith(("+", "-")):
+        body = "+" + body
+
+    terms = []
+    constant = 0
+    position = 0
+    for token in _TERM.finditer(body):
+        if token.start() != position:
+            break
+        position = token.end()
+        sign = 1 if token.group(1) == "+" else -1
+        if token.group(6) is not None:
+            constant += sign * int(token.group(6))
+            continue
+        count = int(token.group(2) or 1)
+        sides = 100 if token.group(3) == "%" else int(token.group(3))
+        if count < 1 or not 2 <= sides <= MAX_SIDES:
+            raise DiceError(f"Invalid dice term in {expression!r}")
+        keep, keep_highest = None, True
+        if token.group(4):
+            modifier, amount = token.group(4), int(token.group(5))
+            if amount > count or (modifier.startswith("k") and amount < 1):
+                raise DiceError(f"Cannot {modifier} {amount} of {count} dice")
+            if modifier in ("k", "kh", "kl"):
+                keep, keep_highest = amount, modifier != "kl"
+            else:
+                keep, keep_highest = count - amount, modifier == "dl"
+            if keep == count:
+                keep = None
+        terms.append(DiceTerm(count, sides, sign, keep, keep_highest))
+    if position != len(body):
+        raise DiceError(f"Invalid dice expression: {expression!r}")
+    if len(terms) > MAX_TERMS or sum(t.count for t in terms) > MAX_DICE:
+        raise DiceError(f"Too many dice in {expression!r}")
+
+    canonical = "".join(("-" if t.sign < 0 else "+") + t.notation() for t in terms)
+    if constant:
+        canonical += f"{constant:+d}"
+    canonical = canonical.lstrip("+") or "0"
+    if label:
+        canonical += f" {label.strip()}"
+    return DicePlan(canonical, tuple(terms), constant, label.strip() if label else None)
+
+
+class DiceRoller:
+    """Per-game seeded generator with a numbered roll log"""
+
+    def __init__(self, seed: Optional[int] = None, history: int = 500):
+        self.history = deque(maxlen=history)
+        self.lock = threading.Lock()
+        self.reset(seed)
+
+    def roll(self, expression: str, count: int = 1) -> Dict[str, Any]:
+        """Roll an expression `count` times; raises DiceError"""
+        plan = compile_expression(expression)
+        with self.lock:
+            self.sequence += 1
+            sequence = self.sequence
+            totals, rolls = plan.evaluate(self.rng, count)
+            self.history.append({"seq": sequence, "expression": plan.expression,
+                                 "count": count, "timestamp": time.time()})
+        return {
+            "seq": sequence,
+            "expression": plan.expression,
+            "damage_type": plan.damage_type,
+            "min": plan.minimum,
+            "max": plan.maximum,
+            "results": [
+                {"total": total, "rolls": [term_rolls[i].tolist() for term_rolls in rolls]}
+                for i, total in enumerate(totals.tolist())
+            ]
+        }
+
+    def reset(self, seed: Optional[int] = None):
+        """Start a new sequence (e.g. for a new game) and log its seed"""
+        with self.lock:
+            self.seed = seed if seed is not None else secrets.randbits(64)
+            self.rng = np.random.default_rng(self.seed)
+            self.history.clear()
+            self.sequence = 0
+        log.event("dice_seeded", "Dice generator seeded", seed=self.seed)
+
+    def audit_log(self) -> Dict[str, Any]:
+        """Seed and kept roll log for the GM; `complete` if it starts at roll 1"""
+        with self.lock:
+            rolls = list(self.history)
+            return {"seed": self.seed, "rolls": rolls, "sequence": self.sequence,
+                    "complete": not rolls or rolls[0]["seq"] == 1}
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Roll count and plan cache usage (the seed is not exposed)"""
+        cache = _compile.cache_info()
+        return {
+            "rolls": self.sequence,
+            "plan_cache_hits": cache.hits,
+            "plan_cache_misses": cache.misses,
+            "plan_cache_size": cache.currsize
+        }
+
+
+def plan_cache() -> Callable[[str], DicePlan]:
+    """The lru_cache of compiled plans, for memory reports"""
+    return _compile
+
+
+def replay(seed: int, history: List[Dict[str, Any]]) -> List[List[int]]:
+    """Re-roll a complete log from its seed; returns each entry's totals"""
+    rng = np.random.default_rng(seed)
+    return [
+        compile_expression(entry["expression"]).evaluate(rng, entry["count"])[0].tolist()
+        for entry in history
+    ]
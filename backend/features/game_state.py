@@ -6,12 +6,21 @@ Maintains:
 - Connected players and their characters
 - Current map/gameboard state
 - Turn order and combat state
+- Seeded dice roller for the game
+- Simulated NPC state (struct-of-arrays pool)
+- Tile occupancy of players, NPCs and objects on the loaded map
+- Light sources and the light map of the loaded map
 """
 
 import time
 from typing import Dict, List, Optional, Any
 from dataclasses import dataclass, field
 from enum import Enum
+from config import Config
+from features.dice import DiceRoller
+from features.npc_sim import NPCPool
+from features.occupancy import OccupancyGrid
+from features.lighting import LightMap, LEVELS
 
 
 class GameState(Enum):
@@ -34,6 +43,13 @@ class PlayerSession:
     last_activity: float = field(default_factory=time.time)
     position: Dict[str, int] = field(default_factory=lambda: {"x": 0, "y": 0})
     is_gm: bool = False
+    is_spectator: bool = False
+    sid: Optional[str] = None
+    last_move_seq: Optional[int] = None
+    disconnected_at: Optional[float] = None
+    resume_from: int = 0
+    darkvision: int = 0  # feet
+    gm_token: Optional[str] = None  # secret for GM-only HTTP routes
     
     def update_activity(self):
         """Update last activity timestamp"""
@@ -47,9 +63,10 @@ class GameboardState:
     width: int
     height: int
     tiles: Dict[str, Any] = field(default_factory=dict)
-    npcs: List[Dict[str, Any]] = field(default_factory=list)
+    npcs: List[Dict[str, Any]] = field(default_factory=list)  # as spawned; positions live in the NPC pool
     objects: List[Dict[str, Any]] = field(default_factory=list)
     fog_of_war: bool = False
+    board: Optional[Any] = None  # loaded features.gameboard.Gameboard, tiles in memory
 
 
 @dataclass
@@ -66,32 +83,49 @@ class GameStateManager:
     """Centralized game state tracking"""
     
     def __init__(self):
+        self.dice = DiceRoller(Config.DICE_SEED or None, Config.DICE_HISTORY)
+        self.clear()
+    
+    def clear(self):
+        """Drop players, map, combat and NPCs"""
         self.game_state = GameState.IDLE
         self.players: Dict[str, PlayerSession] = {}
         self.gameboard: Optional[GameboardState] = None
         self.combat: Optional[CombatState] = None
         self.message_queue: List[Dict[str, Any]] = []
+        self.npcs = NPCPool()
+        self.occupancy: Optional[OccupancyGrid] = None
+        self.lighting: Optional[LightMap] = None
         self.created_at = time.time()
     
     # ========== Player Management ==========
     
     def add_player(self, player_id: str, character_id: str, 
-                   character_name: str, is_gm: bool = False) -> PlayerSession:
+                   character_name: str, is_gm: bool = False,
+                   sid: Optional[str] = None) -> PlayerSession:
         """Add connected player to game"""
         player = PlayerSession(
             player_id=player_id,
             character_id=character_id,
             character_name=character_name,
             connected_at=time.time(),
-            is_gm=is_gm
+            is_gm=is_gm,
+            sid=sid
         )
         self.players[player_id] = player
+        if self.occupancy:
+            if is_gm:
+                self.occupancy.remove(player_id)
+            else:
+                self.occupancy.place(player_id, player.position["x"], player.position["y"])
         return player
     
     def remove_player(self, player_id: str) -> bool:
         """Remove disconnected player from game"""
         if player_id in self.players:
             del self.players[player_id]
+            if self.occupancy:
+                self.occupancy.remove(player_id)
             return True
         return False
     
@@ -99,21 +133,54 @@ class GameStateManager:
         """Get player session"""
         return self.players.get(player_id)
     
+    def get_player_by_sid(self, sid: str) -> Optional[PlayerSession]:
+        """Get player session bound to a Socket.IO sid"""
+        return next((p for p in self.players.values() if p.sid == sid), None)
+    
     def get_all_players(self) -> List[PlayerSession]:
         """Get all connected players"""
         return list(self.players.values())
     
-    def update_player_position(self, player_id: str, x: int, y: int):
-        """Update player character position"""
-        if player_id in self.players:
-            self.players[player_id].position = {"x": x, "y": y}
-            self.players[player_id].update_activity()
+    def update_player_position(self, player_id: str, x: int, y: int) -> bool:
+        """Update player character position; False if another token holds the tile"""
+        player = self.players.get(player_id)
+        if not player:
+            return False
+        occupancy = self.occupancy
+        if occupancy and not player.is_gm:
+            with occupancy.lock:
+                if Config.OCCUPANCY_BLOCKING:
+                    if not occupancy.move(player_id, x, y):
+                        return False
+                else:
+                    occupancy.place(player_id, x, y)
+                player.position = {"x": x, "y": y}
+        else:
+            player.position = {"x": x, "y": y}
+        player.update_activity()
+        return True
     
     def get_player_position(self, player_id: str) -> Optional[Dict[str, int]]:
         """Get player character position"""
         player = self.get_player(player_id)
         return player.position if player else None
     
+    def get_token_positions(self) -> Dict[str, Dict[str, int]]:
+        """Positions of every token on the map: player characters and placed NPCs"""
+        tokens = {p.player_id: p.position for p in self.players.values() if not p.is_gm}
+        tokens.update(self.npcs.positions())
+        return tokens
+    
+    def check_occupancy(self) -> List[str]:
+        """Differences between the occupancy grid and token/object positions"""
+        if not self.occupancy:
+            return []
+        expected = self.get_token_positions()
+        for obj in self.gameboard.objects:
+            if self._blocking_object(obj):
+                expected[obj["id"]] = {"x": obj["x"], "y": obj["y"]}
+        return self.occupancy.check(expected)
+    
     # ========== Game State Management ==========
     
     def set_game_state(self, state: GameState):
@@ -126,13 +193,20 @@ class GameStateManager:
     
     # ========== Gameboard Management ==========
     
-    def initialize_gameboard(self, map_name: str, width: int, height: int):
+    def initialize_gameboard(self, map_name: str, width: int, height: int, board: Any = None):
         """Initialize new gameboard"""
         self.gameboard = GameboardState(
             map_name=map_name,
             width=width,
-            height=height
+            height=height,
+            board=board
         )
+        self.npcs.clear()
+        self.occupancy = OccupancyGrid(width, height)
+        for player in self.players.values():
+            if not player.is_gm:
+                self.occupancy.place(player.player_id, player.position["x"], player.position["y"])
+        self.lighting = LightMap(board, LEVELS.index(Config.LIGHT_AMBIENT)) if board else None
     
     def get_gameboard(self) -> Optional[GameboardState]:
         """Get current gameboard"""
@@ -142,12 +216,36 @@ class GameStateManager:
         """Add object to gameboard"""
         if self.gameboard:
             self.gameboard.objects.append(obj)
+            if self._blocking_object(obj):
+                self.occupancy.place(obj["id"], obj["x"], obj["y"], kind="object")
+    
+    @staticmethod
+    def _blocking_object(obj: Dict[str, Any]) -> bool:
+        """Objects with an id and position occupy their tile unless `blocking` is false"""
+        return "id" in obj and "x" in obj and "y" in obj and obj.get("blocking", True)
     
     def add_npc(self, npc: Dict[str, Any]):
-        """Add NPC to gameboard"""
+        """Add NPC to gameboard; NPCs with an id and position are simulated"""
         if self.gameboard:
+            if "id" in npc and "x" in npc and "y" in npc:
+                self.npcs.add(
+                    npc["id"], npc.get("name", npc["id"]), npc["x"], npc["y"],
+                    hp=npc.get("hp", 10),
+                    behaviour=npc.get("behaviour", "idle"),
+                    patrol_to=npc.get("patrol_to"),
+                    speed=npc.get("speed", 1.0),
+                    sight=npc.get("sight", 6)
+                )
+                self.occupancy.place(npc["id"], npc["x"], npc["y"], kind="npc")
             self.gameboard.npcs.append(npc)
     
+    def remove_npc(self, npc_id: str) -> bool:
+        """Remove a simulated NPC"""
+        if self.gameboard:
+            self.gameboard.npcs = [n for n in self.gameboard.npcs if n.get("id") != npc_id]
+            self.occupancy.remove(npc_id)
+        return self.npcs.remove(npc_id)
+    
     # ========== Combat Management ==========
     
     def start_combat(self, combat_id: str, participants: List[Dict[str, Any]]):
@@ -210,11 +308,17 @@ class GameStateManager:
     # ========== Utility ==========
     
     def reset_game(self):
-        """Reset entire game state"""
-        self.__init__()
+        """Reset entire game state; the new game gets a freshly seeded dice sequence"""
+        self.clear()
+        self.dice.reset(Config.DICE_SEED or None)
     
-    def get_public_state(self) -> Dict[str, Any]:
-        """Get game state safe for broadcast to all clients"""
+    def get_public_state(self, vision=None) -> Dict[str, Any]:
+        """Get game state safe for broadcast to all clients
+        
+        With a viewer's lighting Vision (fog of war), tokens, NPCs, lights and
+        light levels are limited to what that viewer can see.
+        """
+        seen = lambda pos: vision is None or self.lighting.can_see(vision, pos["x"], pos["y"])
         return {
             "game_state": self.game_state.value,
             "players": [
@@ -224,13 +328,16 @@ class GameStateManager:
                     "position": p.position,
                     "character_id": p.character_id
                 }
-                for p in self.players.values()
+                for p in self.players.values() if p.is_gm or seen(p.position)
             ],
             "gameboard": {
                 "map_name": self.gameboard.map_name,
                 "width": self.gameboard.width,
-                "height": self.gameboard.height
+                "height": self.gameboard.height,
+                "fog_of_war": self.gameboard.fog_of_war
             } if self.gameboard else None,
+            "npcs": [npc for npc in self.npcs.snapshot() if seen(npc["position"])],
+            "lighting": self.lighting.snapshot(vision) if self.lighting else None,
             "in_combat": self.combat is not None,
             "combat": {
                 "combat_id": self.combat.combat_id,
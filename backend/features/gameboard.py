@@ -2,7 +2,13 @@
 
 import json
 import os
+import uuid
+import numpy as np
 from config import Config
+from features.metrics import timed_persistence
+
+# Tiles per side of a chunk, the unit of caching and streaming
+CHUNK_SIZE = 16
 
 class GameboardTile:
     """Represents a single tile on the gameboard."""
@@ -35,6 +41,12 @@ class Gameboard:
         self.tiles = self._initialize_tiles()
         self.npcs = []
         self.objects = []
+        # Change tracking for cache validators: every tile edit bumps the
+        # board revision and stamps it on the edited tile's chunk
+        self.board_id = uuid.uuid4().hex[:8]
+        self.revision = 0
+        self.chunk_revisions = {}
+        self._obstacle_grid = None
     
     def _initialize_tiles(self):
         """Create a grid of empty tiles."""
@@ -56,6 +68,64 @@ class Gameboard:
         if tile:
             tile.tile_type = tile_type
             tile.obstacle = obstacle
+            self.revision += 1
+            self.chunk_revisions[(x // CHUNK_SIZE, y // CHUNK_SIZE)] = self.revision
+            # Patch an up-to-date obstacle grid (copy on write) rather than rebuilding it
+            cached = self._obstacle_grid
+            if cached is not None and cached[0] == self.revision - 1:
+                grid = cached[1].copy()
+                grid[y, x] = bool(obstacle)
+                grid.flags.writeable = False
+                self._obstacle_grid = (self.revision, grid)
+    
+    def chunk_revision(self, cx, cy):
+        """Revision of the last edit inside a chunk (0 if never edited)."""
+        return self.chunk_revisions.get((cx, cy), 0)
+    
+    def obstacle_grid(self):
+        """Read-only bool array [y, x] of obstacle tiles, rebuilt after edits."""
+        cached = self._obstacle_grid
+        if cached is None or cached[0] != self.revision:
+            grid = np.zeros((self.height, self.width), dtype=bool)
+            for (x, y), tile in self.tiles.items():
+                if tile.obstacle:
+                    grid[y, x] = True
+            grid.flags.writeable = False
+            cached = self._obstacle_grid = (self.revision, grid)
+        return cached[1]
+    
+    def apply_layout(self, codes, obstacles, palette):
+        """Overwrite every tile from [y, x] arrays of palette codes and obstacle flags."""
+        names = [name for name, _ in palette]
+        code_rows, obstacle_rows = codes.tolist(), obstacles.tolist()
+        for (x, y), tile in self.tiles.items():
+            tile.tile_type = names[code_rows[y][x]]
+            tile.obstacle = obstacle_rows[y][x]
+        self.revision += 1
+        for cy in range((self.height + CHUNK_SIZE - 1) // CHUNK_SIZE):
+            for cx in range((self.width + CHUNK_SIZE - 1) // CHUNK_SIZE):
+                self.chunk_revisions[(cx, cy)] = self.revision
+        grid = np.array(obstacles, dtype=bool)
+        grid.flags.writeable = False
+        self._obstacle_grid = (self.revision, grid)
+    
+    @staticmethod
+    def layout_to_dict(name, codes, obstacles, palette):
+        """Dictionary form of a board laid out from [y, x] arrays, without building its tiles."""
+        height, width = codes.shape
+        names = [tile_type for tile_type, _ in palette]
+        code_rows, obstacle_rows = codes.tolist(), obstacles.tolist()
+        return {
+            "name": name,
+            "width": width,
+            "height": height,
+            "tiles": [
+                {"x": x, "y": y, "type": names[code_rows[y][x]], "obstacle": obstacle_rows[y][x], "objects": []}
+                for x in range(width) for y in range(height)
+            ],
+            "npcs": [],
+            "objects": []
+        }
     
     def to_dict(self):
         """Convert gameboard to dictionary."""
@@ -94,6 +164,7 @@ class GameboardManager:
     """Manages map creation, loading, and saving."""
     
     @staticmethod
+    @timed_persistence("save_gameboard")
     def save_gameboard(gameboard, map_name=None):
         """Save gameboard to JSON file."""
         os.makedirs(Config.MAPS_DIR, exist_ok=True)
@@ -103,6 +174,16 @@ class GameboardManager:
             json.dump(gameboard.to_dict(), f, indent=2)
     
     @staticmethod
+    def save_layout(name, codes, obstacles, palette, maps_dir=None):
+        """Save a generated layout to the same JSON file save_gameboard would write."""
+        maps_dir = maps_dir or Config.MAPS_DIR
+        os.makedirs(maps_dir, exist_ok=True)
+        filepath = os.path.join(maps_dir, f"{name}.json")
+        with open(filepath, "w") as f:
+            json.dump(Gameboard.layout_to_dict(name, codes, obstacles, palette), f, indent=2)
+    
+    @staticmethod
+    @timed_persistence("load_gameboard")
     def load_gameboard(map_name):
         """Load gameboard from JSON file."""
         filepath = os.path.join(Config.MAPS_DIR, f"{map_name}.json")
@@ -0,0 +1,183 @@
+"""
+Interest Management - Area-of-interest filtering for broadcasts
+
+Sessions are bucketed into a spatial hash of grid cells by token position.
+An event originating at a tile only goes to sessions whose area of interest
+(the cells within a fixed radius of their own cell) covers that tile, so the
+cost of a broadcast scales with nearby players rather than total players.
+GM and spectator sessions override the filter and receive everything.
+
+A session can instead declare its on-screen rectangle with `set_viewport`.
+The rectangle is registered in every cell it overlaps (a second spatial
+hash), so the lookup for a tile touches one cell bucket and then checks only
+those candidates' rectangles, independent of how many clients are connected.
+A declared viewport replaces the radius around the session's token.
+
+With `track_tokens=False` (radius AOI off) sessions without a viewport are
+unfiltered and receive everything.
+"""
+
+import threading
+from collections import defaultdict
+from typing import Dict, Set, Tuple, Any
+
+
+Cell = Tuple[int, int]
+Rect = Tuple[int, int, int, int]  # x0, y0, x1, y1 (half-open)
+
+
+class InterestManager:
+    """Spatial-hash area-of-interest tracking for connected sessions"""
+
+    def __init__(self, cell_size: int = 8, radius: int = 2, track_tokens: bool = True):
+        """
+        Args:
+            cell_size: Width/height of one interest cell in tiles
+            radius: How many cells around its own cell a session can see
+            track_tokens: Filter sessions without a viewport by token radius
+        """
+        self.cell_size = max(1, cell_size)
+        self.radius = max(0, radius)
+        self.track_tokens = track_tokens
+        self.cells: Dict[Cell, Set[str]] = defaultdict(set)
+        self.session_cells: Dict[str, Cell] = {}
+        self.viewport_cells: Dict[Cell, Set[str]] = defaultdict(set)
+        self.viewports: Dict[str, Rect] = {}
+        self.unfiltered: Set[str] = set()
+        self.overrides: Set[str] = set()
+        self.lock = threading.Lock()
+
+    def cell_of(self, x: int, y: int) -> Cell:
+        """Map tile coordinates to an interest cell"""
+        return (x // self.cell_size, y // self.cell_size)
+
+    def update(self, sid: str, x: int, y: int):
+        """Move a session's interest to the cell containing (x, y)"""
+        cell = self.cell_of(x, y)
+        with self.lock:
+            if sid in self.viewports:
+                return
+            if not self.track_tokens:
+                self.unfiltered.add(sid)
+                return
+            old_cell = self.session_cells.get(sid)
+            if old_cell == cell:
+                return
+            if old_cell is not None:
+                self._discard(old_cell, sid)
+            self.cells[cell].add(sid)
+            self.session_cells[sid] = cell
+
+    def set_override(self, sid: str, enabled: bool = True):
+        """Let a session (GM, spectator) receive every event"""
+        with self.lock:
+            if enabled:
+                self.overrides.add(sid)
+            else:
+                self.overrides.discard(sid)
+
+    def set_viewport(self, sid: str, rect: Rect):
+        """Subscribe a session to exactly the tiles inside rect"""
+        x0, y0, x1, y1 = rect
+        cells = self._rect_cells(rect)
+        with self.lock:
+            self._clear_viewport(sid)
+            old_cell = self.session_cells.pop(sid, None)
+            if old_cell is not None:
+                self._discard(old_cell, sid)
+            self.unfiltered.discard(sid)
+            self.viewports[sid] = (x0, y0, x1, y1)
+            for cell in cells:
+                self.viewport_cells[cell].add(sid)
+
+    def clear_viewport(self, sid: str):
+        """Drop a session's viewport; call update() to track its token again"""
+        with self.lock:
+            self._clear_viewport(sid)
+
+    def remove(self, sid: str):
+        """Forget a session entirely"""
+        with self.lock:
+            old_cell = self.session_cells.pop(sid, None)
+            if old_cell is not None:
+                self._discard(old_cell, sid)
+            self._clear_viewport(sid)
+            self.unfiltered.discard(sid)
+            self.overrides.discard(sid)
+
+    def filtering(self) -> bool:
+        """Whether any session is filtered at all (else broadcast to everyone)"""
+        return self.track_tokens or bool(self.viewports)
+
+    def recipients(self, x: int, y: int) -> Set[str]:
+        """Get sessions whose area of interest contains tile (x, y)"""
+        cx, cy = self.cell_of(x, y)
+        r = self.radius
+        with self.lock:
+            result = self.overrides | self.unfiltered
+            if self.track_tokens:
+                for dx in range(-r, r + 1):
+                    for dy in range(-r, r + 1):
+                        members = self.cells.get((cx + dx, cy + dy))
+                        if members:
+                            result |= members
+            for sid in self.viewport_cells.get((cx, cy), ()):
+                x0, y0, x1, y1 = self.viewports[sid]
+                if x0 <= x < x1 and y0 <= y < y1:
+                    result.add(sid)
+        return result
+
+    def sees(self, sid: str, x: int, y: int) -> bool:
+        """Whether tile (x, y) is in one session's area of interest"""
+        with self.lock:
+            if sid in self.overrides or sid in self.unfiltered:
+                return True
+            rect = self.viewports.get(sid)
+            if rect is not None:
+                return rect[0] <= x < rect[2] and rect[1] <= y < rect[3]
+            cell = self.session_cells.get(sid)
+        if cell is None:
+            return False
+        cx, cy = self.cell_of(x, y)
+        return abs(cx - cell[0]) <= self.radius and abs(cy - cell[1]) <= self.radius
+
+    def _rect_cells(self, rect: Rect):
+        """Cells overlapped by a half-open rectangle"""
+        x0, y0, x1, y1 = rect
+        cx0, cy0 = self.cell_of(x0, y0)
+        cx1, cy1 = self.cell_of(x1 - 1, y1 - 1)
+        return [(cx, cy) for cx in range(cx0, cx1 + 1) for cy in range(cy0, cy1 + 1)]
+
+    def _clear_viewport(self, sid: str):
+        """Unregister a session's viewport cells (lock held)"""
+        rect = self.viewports.pop(sid, None)
+        if rect is None:
+            return
+        for cell in self._rect_cells(rect):
+            members = self.viewport_cells.get(cell)
+            if members is not None:
+                members.discard(sid)
+                if not members:
+                    del self.viewport_cells[cell]
+
+    def _discard(self, cell: Cell, sid: str):
+        """Remove sid from a cell bucket, dropping empty buckets (lock held)"""
+        members = self.cells.get(cell)
+        if members is not None:
+            members.discard(sid)
+            if not members:
+                del self.cells[cell]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get interest management statistics"""
+        return {
+            "cell_size": self.cell_size,
+            "radius_cells": self.radius,
+            "track_tokens": self.track_tokens,
+            "tracked_sessions": len(self.session_cells),
+            "occupied_cells": len(self.cells),
+            "viewports": len(self.viewports),
+            "viewport_cells": len(self.viewport_cells),
+            "unfiltered": len(self.unfiltered),
+            "overrides": len(self.overrides)
+        }
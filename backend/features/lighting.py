@@ -0,0 +1,301 @@
+"""
+Lighting - Light sources, an incrementally maintained light map and vision
+
+Each light stores its footprint: the tiles within its dim radius that a
+straight (Bresenham) line from the light reaches without crossing an
+obstacle, each tagged bright (2) or dim (1). Walls themselves are lit, so
+room edges show. Footprints reuse the cached sphere templates of
+features.aoe, so computing one is a few array operations.
+
+The light map keeps, per tile, how many footprints light it brightly and
+how many dimly. Adding, moving or removing a light adds or subtracts one
+footprint and re-derives levels inside that footprint's box only; a wall
+edit recomputes just the lights whose box covers the edited tile. Every
+update returns the tiles whose level changed, ready to send as a delta.
+
+Levels here are from light sources only. The map's ambient level (dark,
+dim, bright) is applied on top, so changing it is O(1).
+
+Vision (for fog of war) is the line-of-sight footprint of a viewer out to
+its sight range, cached per viewer until it moves or the board changes.
+A viewer sees a tile in its line of sight that is lit, within its
+darkvision, or its own tile.
+"""
+
+import base64
+import math
+import threading
+from dataclasses import dataclass
+from typing import Dict, Any, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from features import aoe
+
+
+DARK, DIM, BRIGHT = range(3)
+LEVELS = ("dark", "dim", "bright")
+FEET_PER_TILE = 5
+
+Window = Tuple[int, int, int, int]  # x0, y0, x1, y1 (half-open)
+Footprint = Tuple[np.ndarray, np.ndarray, np.ndarray]  # xs, ys, levels
+
+
+def footprint(obstacles: np.ndarray, x: int, y: int, radius: float,
+              bright: Optional[float] = None) -> Footprint:
+    """Tiles within radius (tiles) of (x, y) in line of sight, with their light level"""
+    template = aoe.get_template("sphere", round(radius, 2))
+    height, width = obstacles.shape
+    xs, ys = template.dx + x, template.dy + y
+    on_board = (xs >= 0) & (xs < width) & (ys >= 0) & (ys < height)
+    px, py = template.path_dx[on_board] + x, template.path_dy[on_board] + y
+    path_on_board = template.path_valid[on_board] & (px >= 0) & (px < width) & (py >= 0) & (py < height)
+    blocked = obstacles[np.clip(py, 0, height - 1), np.clip(px, 0, width - 1)] & path_on_board
+    clear = ~blocked.any(axis=1)
+    dx, dy = template.dx[on_board][clear], template.dy[on_board][clear]
+    limit = radius if bright is None else bright
+    levels = np.where(dx * dx + dy * dy <= limit * limit + 1e-9, BRIGHT, DIM).astype(np.uint8)
+    return xs[on_board][clear], ys[on_board][clear], levels
+
+
+def _box(x: int, y: int, radius: float, width: int, height: int) -> Window:
+    reach = int(math.ceil(radius))
+    return (max(x - reach, 0), max(y - reach, 0), min(x + reach + 1, width), min(y + reach + 1, height))
+
+
+@dataclass
+class Light:
+    """A light source; radii in tiles, optionally carried by a token"""
+    light_id: str
+    x: int
+    y: int
+    bright: float
+    dim: float
+    token_id: Optional[str] = None
+    footprint: Optional[Footprint] = None
+    window: Optional[Window] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"light_id": self.light_id, "position": {"x": self.x, "y": self.y},
+                "bright": self.bright * FEET_PER_TILE, "dim": self.dim * FEET_PER_TILE,
+                "token_id": self.token_id}
+
+
+@dataclass
+class Vision:
+    """Cached line of sight of one viewer"""
+    key: Tuple
+    x: int
+    y: int
+    window: Window
+    sight: np.ndarray       # bool, window-shaped
+    darkvision: float       # tiles
+
+
+class LightMap:
+    """Light sources of one board and the light level of every tile"""
+
+    def __init__(self, board, ambient: int = BRIGHT):
+        self.board = board
+        self.width, self.height = board.width, board.height
+        self.ambient = ambient
+        self.bright = np.zeros((self.height, self.width), dtype=np.uint16)
+        self.dim = np.zeros((self.height, self.width), dtype=np.uint16)
+        self.levels = np.zeros((self.height, self.width), dtype=np.uint8)
+        self.lights: Dict[str, Light] = {}
+        self.carried: Dict[str, List[str]] = {}  # token_id -> light ids it carries
+        self.visions: Dict[str, Vision] = {}
+        self.lock = threading.RLock()
+        self.footprints_computed = 0
+        self.vision_hits = 0
+        self.vision_misses = 0
+
+    # ========== Light sources ==========
+
+    def _apply(self, light: Light, sign: int):
+        xs, ys, levels = light.footprint
+        lit = levels == BRIGHT
+        if sign > 0:
+            self.bright[ys[lit], xs[lit]] += 1
+            self.dim[ys[~lit], xs[~lit]] += 1
+        else:
+            self.bright[ys[lit], xs[lit]] -= 1
+            self.dim[ys[~lit], xs[~lit]] -= 1
+
+    def _cast(self, light: Light):
+        light.footprint = footprint(self.board.obstacle_grid(), light.x, light.y, light.dim, light.bright)
+        light.window = _box(light.x, light.y, light.dim, self.width, self.height)
+        self.footprints_computed += 1
+        self._apply(light, 1)
+
+    def _refresh(self, windows: Iterable[Optional[Window]]) -> List[List[int]]:
+        """Re-derive levels inside windows; returns [[x, y, level], ...] that changed"""
+        changed = []
+        for window in windows:
+            if window is None:
+                continue
+            x0, y0, x1, y1 = window
+            new = np.where(self.bright[y0:y1, x0:x1] > 0, BRIGHT,
+                           np.where(self.dim[y0:y1, x0:x1] > 0, DIM, DARK)).astype(np.uint8)
+            ys, xs = np.nonzero(new != self.levels[y0:y1, x0:x1])
+            self.levels[y0:y1, x0:x1] = new
+            changed.extend([[int(x) + x0, int(y) + y0, int(new[y, x])] for x, y in zip(xs, ys)])
+        return changed
+
+    def _detach(self, light_id: str) -> Optional[Light]:
+        light = self.lights.pop(light_id, None)
+        if light:
+            self._apply(light, -1)
+            if light.token_id:
+                self.carried[light.token_id].remove(light_id)
+                if not self.carried[light.token_id]:
+                    del self.carried[light.token_id]
+        return light
+
+    def place(self, light_id: str, x: int, y: int, bright: float, dim: float,
+              token_id: Optional[str] = None) -> List[List[int]]:
+        """Add or replace a light; returns changed tiles"""
+        with self.lock:
+            old = self._detach(light_id)
+            light = self.lights[light_id] = Light(light_id, x, y, bright, max(dim, bright), token_id)
+            if token_id:
+                self.carried.setdefault(token_id, []).append(light_id)
+            self._cast(light)
+            return self._refresh([old and old.window, light.window])
+
+    def remove(self, light_id: str) -> Optional[List[List[int]]]:
+        """Remove a light; returns changed tiles (None if unknown)"""
+        with self.lock:
+            light = self._detach(light_id)
+            return self._refresh([light.window]) if light else None
+
+    def move_token(self, token_id: str, x: int, y: int) -> List[List[int]]:
+        """Move the lights a token carries; returns changed tiles"""
+        if token_id not in self.carried:
+            return []
+        with self.lock:
+            windows = []
+            for light_id in self.carried.get(token_id, ()):
+                light = self.lights[light_id]
+                if (light.x, light.y) != (x, y):
+                    self._apply(light, -1)
+                    windows.append(light.window)
+                    light.x, light.y = x, y
+                    self._cast(light)
+                    windows.append(light.window)
+            return self._refresh(windows)
+
+    def remove_token(self, token_id: str) -> List[List[int]]:
+        """Drop the lights a token carries; returns changed tiles"""
+        with self.lock:
+            windows = [self._detach(light_id).window for light_id in list(self.carried.get(token_id, ()))]
+            self.visions.pop(token_id, None)
+            return self._refresh(windows)
+
+    def tiles_changed(self, cells: Iterable[Tuple[int, int]]) -> List[List[int]]:
+        """Recompute lights whose box covers an edited tile; returns changed tiles"""
+        cells = list(cells)
+        with self.lock:
+            windows = []
+            for light in self.lights.values():
+                x0, y0, x1, y1 = light.window
+                if any(x0 <= x < x1 and y0 <= y < y1 for x, y in cells):
+                    self._apply(light, -1)
+                    self._cast(light)
+                    windows.append(light.window)
+            return self._refresh(windows)
+
+    def level(self, x: int, y: int) -> int:
+        """Effective light level of a tile, ambient included"""
+        return max(int(self.levels[y, x]), self.ambient)
+
+    # ========== Vision ==========
+
+    def vision(self, viewer_id: str, x: int, y: int, sight: float, darkvision: float = 0) -> Vision:
+        """Line of sight of a viewer, from cache while it and the board are unchanged"""
+        key = (x, y, sight, darkvision, self.board.revision)
+        with self.lock:
+            cached = self.visions.get(viewer_id)
+            if cached and cached.key == key:
+                self.vision_hits += 1
+                return cached
+            self.vision_misses += 1
+        window = _box(x, y, sight, self.width, self.height)
+        mask = np.zeros((window[3] - window[1], window[2] - window[0]), dtype=bool)
+        if 0 <= x < self.width and 0 <= y < self.height:
+            xs, ys, _ = footprint(self.board.obstacle_grid(), x, y, sight)
+            mask[ys - window[1], xs - window[0]] = True
+        vision = Vision(key, x, y, window, mask, darkvision)
+        with self.lock:
+            self.visions[viewer_id] = vision
+        return vision
+
+    def in_sight(self, vision: Vision, x: int, y: int) -> bool:
+        """Whether a tile is in the viewer's line of sight (lit or not)"""
+        x0, y0, x1, y1 = vision.window
+        return x0 <= x < x1 and y0 <= y < y1 and bool(vision.sight[y - y0, x - x0])
+
+    def can_see(self, vision: Vision, x: int, y: int) -> bool:
+        """Whether the viewer sees what happens on a tile"""
+        if (x, y) == (vision.x, vision.y):
+            return True
+        if not self.in_sight(vision, x, y):
+            return False
+        dx, dy = x - vision.x, y - vision.y
+        return self.level(x, y) > DARK or dx * dx + dy * dy <= vision.darkvision ** 2 + 1e-9
+
+    def visible_mask(self, vision: Vision) -> np.ndarray:
+        """Bool array over vision.window: the tiles can_see() would accept"""
+        x0, y0, x1, y1 = vision.window
+        with self.lock:
+            lit = np.maximum(self.levels[y0:y1, x0:x1], self.ambient) > DARK
+        ys, xs = np.mgrid[y0:y1, x0:x1]
+        near = (xs - vision.x) ** 2 + (ys - vision.y) ** 2 <= vision.darkvision ** 2 + 1e-9
+        mask = vision.sight & (lit | near)
+        if x0 <= vision.x < x1 and y0 <= vision.y < y1:
+            mask[vision.y - y0, vision.x - x0] = True
+        return mask
+
+    def forget_viewer(self, viewer_id: str):
+        with self.lock:
+            self.visions.pop(viewer_id, None)
+
+    # ========== Snapshots ==========
+
+    def encode_levels(self, vision: Optional[Vision] = None) -> Dict[str, Any]:
+        """Source light levels as two packed bitmasks (bright, dim) over their bounding window,
+        only inside a viewer's line of sight if one is given"""
+        with self.lock:
+            levels = self.levels
+            if vision is not None:
+                x0, y0, x1, y1 = vision.window
+                levels = np.zeros_like(self.levels)
+                levels[y0:y1, x0:x1] = np.where(vision.sight, self.levels[y0:y1, x0:x1], DARK)
+            ys, xs = np.nonzero(levels)
+            if not len(xs):
+                return {"x0": 0, "y0": 0, "x1": 0, "y1": 0, "bright": "", "dim": ""}
+            x0, y0, x1, y1 = int(xs.min()), int(ys.min()), int(xs.max()) + 1, int(ys.max()) + 1
+            window = levels[y0:y1, x0:x1]
+        pack = lambda mask: base64.b64encode(np.packbits(mask.ravel()).tobytes()).decode("ascii")
+        return {"x0": x0, "y0": y0, "x1": x1, "y1": y1,
+                "bright": pack(window == BRIGHT), "dim": pack(window == DIM)}
+
+    def snapshot(self, vision: Optional[Vision] = None) -> Dict[str, Any]:
+        """Public lighting state: ambient level, lights and source light levels
+        (limited to a viewer's line of sight if one is given)"""
+        with self.lock:
+            lights = [light.to_dict() for light in self.lights.values()
+                      if vision is None or self.in_sight(vision, light.x, light.y)]
+        return {"ambient": LEVELS[self.ambient], "lights": lights, "levels": self.encode_levels(vision)}
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get lighting statistics"""
+        return {
+            "lights": len(self.lights),
+            "lit_tiles": int(np.count_nonzero(self.levels)),
+            "footprints_computed": self.footprints_computed,
+            "viewers": len(self.visions),
+            "vision_hits": self.vision_hits,
+            "vision_misses": self.vision_misses,
+            "ambient": LEVELS[self.ambient]
+        }
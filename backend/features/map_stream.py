@@ -0,0 +1,155 @@
+"""
+Map Streaming - Progressive, prioritized delivery of a loaded map
+
+After `map_loaded`, each client is sent the board as `map_chunk` events
+(one CHUNK_SIZE x CHUNK_SIZE tile window each, in the tile_window encoding),
+nearest chunks to that player's token first. A single background task sends
+a small batch per client per tick and sleeps in between, so a large map is
+spread over many small frames instead of one giant one that stalls the room.
+Loading another map cancels streams still in flight.
+"""
+
+import threading
+from typing import Dict, Any, Callable, List, Optional, Tuple
+
+from features.gameboard import CHUNK_SIZE
+from features.tile_window import chunk_window, encode_window
+from features.structured_log import get_logger
+
+
+log = get_logger("map_stream")
+
+
+def chunk_grid(board) -> Tuple[int, int]:
+    """Number of chunks across and down a board"""
+    return (board.width + CHUNK_SIZE - 1) // CHUNK_SIZE, (board.height + CHUNK_SIZE - 1) // CHUNK_SIZE
+
+
+def chunk_order(board, origin: Optional[Dict[str, int]]) -> List[Tuple[int, int]]:
+    """All chunks of a board, nearest (Chebyshev distance) to origin first"""
+    chunks_x, chunks_y = chunk_grid(board)
+    if origin:
+        ox, oy = origin["x"] // CHUNK_SIZE, origin["y"] // CHUNK_SIZE
+    else:
+        ox, oy = chunks_x // 2, chunks_y // 2
+    chunks = [(cx, cy) for cy in range(chunks_y) for cx in range(chunks_x)]
+    chunks.sort(key=lambda c: (max(abs(c[0] - ox), abs(c[1] - oy)), abs(c[0] - ox) + abs(c[1] - oy)))
+    return chunks
+
+
+class MapStreamer:
+    """Round-robin, rate-limited chunk streams to individual clients"""
+
+    def __init__(self, sio, send: Callable[[str, str, Dict[str, Any]], None],
+                 chunks_per_tick: int = 4, tick_seconds: float = 0.05):
+        """
+        Args:
+            sio: Socket.IO instance used to run the streaming task
+            send: Callback (sid, event, data) writing to one client
+            chunks_per_tick: Chunks sent to each client per tick
+            tick_seconds: Pause between ticks
+        """
+        self.sio = sio
+        self.send = send
+        self.chunks_per_tick = chunks_per_tick
+        self.tick_seconds = tick_seconds
+        self.board = None
+        self.streams: Dict[str, List[Tuple[int, int]]] = {}
+        self.lock = threading.Lock()
+        self.running = False
+        self.chunks_sent = 0
+        self.streams_completed = 0
+
+    def start_map(self, board, origins: Dict[str, Optional[Dict[str, int]]]):
+        """Stream a newly loaded board to every sid in origins, replacing old streams"""
+        with self.lock:
+            self.board = board
+            self.streams = {sid: chunk_order(board, origin) for sid, origin in origins.items()}
+        self._ensure_running()
+
+    def stream_to(self, sid: str, origin: Optional[Dict[str, int]] = None):
+        """(Re)start streaming the current board to one client"""
+        with self.lock:
+            if self.board is None:
+                return
+            self.streams[sid] = chunk_order(self.board, origin)
+        self._ensure_running()
+
+    def refocus(self, sid: str, origin: Dict[str, int]):
+        """Reorder a client's remaining chunks around a new point of interest"""
+        with self.lock:
+            pending = self.streams.get(sid)
+            if not pending or self.board is None:
+                return
+            remaining = set(pending)
+            pending[:] = [c for c in chunk_order(self.board, origin) if c in remaining]
+
+    def cancel(self, sid: str):
+        """Stop streaming to a client"""
+        with self.lock:
+            self.streams.pop(sid, None)
+
+    def _ensure_running(self):
+        with self.lock:
+            if self.running or not self.streams:
+                return
+            self.running = True
+        self.sio.start_background_task(self._run)
+
+    def tick(self) -> int:
+        """Send one batch to every active stream; returns chunks sent"""
+        with self.lock:
+            board = self.board
+            batches = {}
+            finished = []
+            for sid, pending in self.streams.items():
+                batches[sid] = pending[:self.chunks_per_tick]
+                del pending[:self.chunks_per_tick]
+                if not pending:
+                    finished.append(sid)
+            for sid in finished:
+                del self.streams[sid]
+
+        if board is None:
+            return 0
+        chunks_x, chunks_y = chunk_grid(board)
+        total = chunks_x * chunks_y
+        encoded: Dict[Tuple[int, int], Dict[str, Any]] = {}
+        sent = 0
+        for sid, chunks in batches.items():
+            for cx, cy in chunks:
+                chunk = encoded.get((cx, cy))
+                if chunk is None:
+                    chunk = encoded[(cx, cy)] = {
+                        **encode_window(board, chunk_window(board, cx, cy)),
+                        "cx": cx, "cy": cy, "total": total
+                    }
+                self.send(sid, "map_chunk", chunk)
+                sent += 1
+        for sid in finished:
+            self.send(sid, "map_stream_complete", {"map_name": board.name, "chunks": total})
+        self.chunks_sent += sent
+        self.streams_completed += len(finished)
+        return sent
+
+    def _run(self):
+        """Tick until every stream has finished"""
+        while True:
+            try:
+                self.tick()
+            except Exception as e:
+                log.error("map_stream", "Map stream tick failed", error=str(e))
+            with self.lock:
+                if not self.streams:
+                    self.running = False
+                    return
+            self.sio.sleep(self.tick_seconds)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get streaming statistics"""
+        return {
+            "active_streams": len(self.streams),
+            "pending_chunks": sum(len(p) for p in list(self.streams.values())),
+            "chunks_sent": self.chunks_sent,
+            "streams_completed": self.streams_completed
+        }
@@ -0,0 +1,242 @@
+"""
+Map Generation - Seeded procedural maps built on NumPy arrays
+
+Generators return two arrays of the map's shape ([y, x]): a tile type code
+(index into PALETTE) and an obstacle flag. They are pure functions of
+(width, height, seed, params), so the same seed reproduces the same map on
+any process, and they are cheap to pickle back from a worker.
+
+- dungeon: binary space partition into leaves, one room per leaf, L-shaped
+  corridors joining sibling subtrees
+- cave:    random fill smoothed by a cellular automaton (4-5 rule) with
+  neighbour counts from shifted array sums
+- outdoor: multi-octave value noise (bilinear upsampling of random grids)
+  thresholded into water, sand, grass, forest and mountain
+
+MapGenerator runs generators in a process pool, and writes the map file
+there too, so a large map never holds the socket thread or the GIL.
+"""
+
+import time
+import multiprocessing
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Dict, Any, Callable, List, Optional, Tuple
+
+import numpy as np
+
+from features.gameboard import GameboardManager
+
+
+# code -> (tile_type, obstacle)
+PALETTE: List[Tuple[str, bool]] = [
+    ("floor", False),
+    ("wall", True),
+    ("water", False),
+    ("sand", False),
+    ("grass", False),
+    ("forest", False),
+    ("mountain", True),
+]
+FLOOR, WALL, WATER, SAND, GRASS, FOREST, MOUNTAIN = range(len(PALETTE))
+_OBSTACLE = np.array([obstacle for _, obstacle in PALETTE], dtype=bool)
+
+Layout = Tuple[np.ndarray, np.ndarray]
+
+# Tunable generator parameters and their allowed ranges
+PARAM_LIMITS = {
+    "dungeon": {"min_leaf": (5, 64), "room_padding": (0, 4)},
+    "cave": {"fill": (0.3, 0.7), "iterations": (0, 10)},
+    "outdoor": {"scale": (4.0, 256.0), "water_level": (0.0, 1.0)},
+}
+
+
+def _finish(codes: np.ndarray) -> Layout:
+    return codes, _OBSTACLE[codes]
+
+
+def dungeon(width: int, height: int, seed: int, min_leaf: int = 10,
+            room_padding: int = 1) -> Layout:
+    """Rooms in BSP leaves joined by corridors"""
+    rng = np.random.default_rng(seed)
+    codes = np.full((height, width), WALL, dtype=np.uint8)
+
+    def build(x0: int, y0: int, x1: int, y1: int) -> Tuple[int, int]:
+        """Carve the subtree in [x0, x1) x [y0, y1); returns a floor tile inside it"""
+        w, h = x1 - x0, y1 - y0
+        can_x, can_y = w >= 2 * min_leaf, h >= 2 * min_leaf
+        if can_x or can_y:
+            vertical = can_x and (not can_y or (w > h if w != h else rng.random() < 0.5))
+            if vertical:
+                cut = int(rng.integers(x0 + min_leaf, x1 - min_leaf + 1))
+                a, b = build(x0, y0, cut, y1), build(cut, y0, x1, y1)
+            else:
+                cut = int(rng.integers(y0 + min_leaf, y1 - min_leaf + 1))
+                a, b = build(x0, y0, x1, cut), build(x0, cut, x1, y1)
+            (ax, ay), (bx, by) = a, b
+            if rng.random() < 0.5:
+                codes[ay, min(ax, bx):max(ax, bx) + 1] = FLOOR
+                codes[min(ay, by):max(ay, by) + 1, bx] = FLOOR
+            else:
+                codes[min(ay, by):max(ay, by) + 1, ax] = FLOOR
+                codes[by, min(ax, bx):max(ax, bx) + 1] = FLOOR
+            return a if rng.random() < 0.5 else b
+
+        inner_w, inner_h = w - 2 * room_padding, h - 2 * room_padding
+        room_w = int(rng.integers(max(3, inner_w // 2), max(3, inner_w) + 1))
+        room_h = int(rng.integers(max(3, inner_h // 2), max(3, inner_h) + 1))
+        rx = x0 + room_padding + int(rng.integers(0, max(1, inner_w - room_w + 1)))
+        ry = y0 + room_padding + int(rng.integers(0, max(1, inner_h - room_h + 1)))
+        codes[ry:ry + room_h, rx:rx + room_w] = FLOOR
+        return rx + room_w // 2, ry + room_h // 2
+
+    build(0, 0, width, height)
+    codes[[0, -1], :] = WALL
+    codes[:, [0, -1]] = WALL
+    return _finish(codes)
+
+
+def _neighbour_walls(walls: np.ndarray) -> np.ndarray:
+    """Count of walls among the 8 neighbours (outside the map counts as wall)"""
+    padded = np.pad(walls.astype(np.uint8), 1, constant_values=1)
+    height, width = walls.shape
+    total = np.zeros(walls.shape, dtype=np.uint8)
+    for dy in (0, 1, 2):
+        for dx in (0, 1, 2):
+            if dx != 1 or dy != 1:
+                total += padded[dy:dy + height, dx:dx + width]
+    return total
+
+
+def cave(width: int, height: int, seed: int, fill: float = 0.45, iterations: int = 5) -> Layout:
+    """Cellular-automaton caves"""
+    rng = np.random.default_rng(seed)
+    walls = rng.random((height, width)) < fill
+    for _ in range(iterations):
+        neighbours = _neighbour_walls(walls)
+        walls = (neighbours >= 5) | (walls & (neighbours >= 4))
+    walls[[0, -1], :] = True
+    walls[:, [0, -1]] = True
+    return _finish(np.where(walls, WALL, FLOOR).astype(np.uint8))
+
+
+def value_noise(width: int, height: int, rng: np.random.Generator,
+                scale: float = 32.0, octaves: int = 4) -> np.ndarray:
+    """Smooth noise in [0, 1): random lattices bilinearly upsampled and summed"""
+    noise = np.zeros((height, width))
+    amplitude, total = 1.0, 0.0
+    ys, xs = np.arange(height), np.arange(width)
+    for _ in range(octaves):
+        lattice = rng.random((int(height / scale) + 2, int(width / scale) + 2))
+        fy, fx = ys / scale, xs / scale
+        iy, ix = fy.astype(int), fx.astype(int)
+        ty, tx = (fy - iy)[:, None], (fx - ix)[None, :]
+        ty, tx = ty * ty * (3 - 2 * ty), tx * tx * (3 - 2 * tx)
+        top = lattice[iy][:, ix] * (1 - tx) + lattice[iy][:, ix + 1] * tx
+        bottom = lattice[iy + 1][:, ix] * (1 - tx) + lattice[iy + 1][:, ix + 1] * tx
+        noise += amplitude * (top * (1 - ty) + bottom * ty)
+        total += amplitude
+        amplitude /= 2
+        scale = max(scale / 2, 1.0)
+    return noise / total
+
+
+def outdoor(width: int, height: int, seed: int, scale: float = 32.0,
+            water_level: float = 0.35) -> Layout:
+    """Noise-based terrain: water, beaches, grassland, forest, mountains"""
+    rng = np.random.default_rng(seed)
+    elevation = value_noise(width, height, rng, scale)
+    # Stretch to the full range so thresholds behave the same at any size
+    low, high = elevation.min(), elevation.max()
+    elevation = (elevation - low) / max(high - low, 1e-9)
+    moisture = value_noise(width, height, rng, scale / 2)
+    codes = np.full((height, width), GRASS, dtype=np.uint8)
+    codes[moisture > 0.55] = FOREST
+    codes[elevation < water_level + 0.05] = SAND
+    codes[elevation < water_level] = WATER
+    codes[elevation > 0.8] = MOUNTAIN
+    return _finish(codes)
+
+
+GENERATORS: Dict[str, Callable[..., Layout]] = {
+    "dungeon": dungeon,
+    "cave": cave,
+    "outdoor": outdoor,
+}
+
+
+def clean_params(kind: str, params: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Validate client-supplied parameters against PARAM_LIMITS; raises ValueError"""
+    if kind not in GENERATORS:
+        raise ValueError(f"Unknown map kind: {kind}")
+    cleaned = {}
+    for name, value in (params or {}).items():
+        if name not in PARAM_LIMITS[kind]:
+            raise ValueError(f"Unknown parameter for {kind}: {name}")
+        low, high = PARAM_LIMITS[kind][name]
+        value = type(low)(value)
+        if not low <= value <= high:
+            raise ValueError(f"{name} must be between {low} and {high}")
+        cleaned[name] = value
+    return cleaned
+
+
+def generate(kind: str, width: int, height: int, seed: int,
+             params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Run a generator; returns codes, obstacles and the time it took"""
+    started = time.perf_counter()
+    codes, obstacles = GENERATORS[kind](width, height, seed, **(params or {}))
+    return {"kind": kind, "seed": seed, "codes": codes, "obstacles": obstacles,
+            "duration_ms": round((time.perf_counter() - started) * 1000, 1)}
+
+
+def generate_and_save(kind: str, width: int, height: int, seed: int,
+                      params: Optional[Dict[str, Any]], map_name: str,
+                      maps_dir: Optional[str] = None) -> Dict[str, Any]:
+    """Run a generator and write the map file; generate()'s result plus save time"""
+    result = generate(kind, width, height, seed, params)
+    started = time.perf_counter()
+    GameboardManager.save_layout(map_name, result["codes"], result["obstacles"], PALETTE, maps_dir)
+    result["save_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    return result
+
+
+# Fresh worker processes: forking the threaded server would copy locks that
+# other threads hold mid-operation
+START_METHOD = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+
+
+class MapGenerator:
+    """Process pool running map generators off the server process"""
+
+    def __init__(self, workers: int = 2):
+        self.workers = workers
+        self.executor: Optional[ProcessPoolExecutor] = None
+        self.generated = 0
+
+    def submit(self, kind: str, width: int, height: int, seed: int,
+               params: Optional[Dict[str, Any]] = None, map_name: Optional[str] = None,
+               maps_dir: Optional[str] = None) -> Future:
+        """Queue a generation; the future resolves to generate()'s result
+
+        With a map_name the worker also saves the map (see generate_and_save).
+        """
+        if kind not in GENERATORS:
+            raise ValueError(f"Unknown map kind: {kind}")
+        if self.executor is None:
+            self.executor = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context(START_METHOD))
+        self.generated += 1
+        if map_name is not None:
+            return self.executor.submit(generate_and_save, kind, width, height, seed, params,
+                                        map_name, maps_dir)
+        return self.executor.submit(generate, kind, width, height, seed, params)
+
+    def shutdown(self):
+        """Stop the worker processes"""
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get generator statistics"""
+        return {"workers": self.workers, "start_method": START_METHOD,
+                "started": self.executor is not None, "generated": self.generated}
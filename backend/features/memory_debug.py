@@ -0,0 +1,172 @@
+"""
+Memory Debugging - Approximate per-subsystem sizes and tracemalloc diffs
+
+Subsystems (boards, sessions, combat, caches, queues) register getters for
+the objects they own; a report walks each object graph and sums
+`sys.getsizeof` over everything reachable (each object counted once), so the
+numbers are approximate but comparable between requests. Reports run while
+the server keeps mutating these objects, so containers are copied before
+they are walked and a copy that races a resize is retried.
+
+tracemalloc is off by default (it slows allocation). It can be started on
+demand, snapshots taken and any two diffed, grouped by allocation traceback,
+which makes slow leaks like sessions that are never removed stand out.
+"""
+
+import functools
+import gc
+import sys
+import threading
+import time
+import tracemalloc
+import types
+from collections import OrderedDict, deque
+from typing import Dict, Any, Callable, List
+
+
+_ATOMIC = (str, bytes, int, float, bool, type(None))
+_SKIP = (type, types.ModuleType, types.FunctionType, types.MethodType, types.BuiltinFunctionType)
+_LRU_CACHE = type(functools.lru_cache()(lambda: None))
+
+
+def _children(item: Any) -> List[Any]:
+    """Objects directly held by a container, copied so other threads can keep
+    mutating it; retried if it changes size mid-copy"""
+    for _ in range(5):
+        try:
+            if isinstance(item, dict):
+                return [*item.keys(), *item.values()]
+            if isinstance(item, _LRU_CACHE):
+                # The cache dict is only reachable through the GC
+                return [r for r in gc.get_referents(item) if isinstance(r, dict)]
+            return list(item)
+        except RuntimeError:
+            continue
+    return []
+
+
+def deep_size(obj: Any, limit: int = 2_000_000) -> Dict[str, int]:
+    """Approximate bytes and object count reachable from obj
+
+    Functions, methods, classes and modules are not followed, so a bound
+    callback does not pull in the whole server; lru_cache wrappers are
+    followed into their cached entries.
+    """
+    seen = set()
+    total = objects = 0
+    stack = [obj]
+    while stack and objects < limit:
+        item = stack.pop()
+        if id(item) in seen or isinstance(item, _SKIP):
+            continue
+        seen.add(id(item))
+        total += sys.getsizeof(item, 0)
+        objects += 1
+        if isinstance(item, _ATOMIC):
+            continue
+        if isinstance(item, (dict, list, tuple, set, frozenset, deque, _LRU_CACHE)):
+            stack.extend(_children(item))
+        else:
+            attrs = getattr(item, "__dict__", None)
+            if attrs is not None:
+                stack.append(attrs)
+            for slot in getattr(type(item), "__slots__", ()):
+                if hasattr(item, slot):
+                    stack.append(getattr(item, slot))
+    return {"bytes": total, "objects": objects}
+
+
+class MemoryInspector:
+    """Registry of subsystem objects plus on-demand tracemalloc snapshots"""
+
+    def __init__(self, max_snapshots: int = 10):
+        self.sources: Dict[str, Dict[str, Callable[[], Any]]] = {}
+        self.snapshots: "OrderedDict[int, Dict[str, Any]]" = OrderedDict()
+        self.max_snapshots = max_snapshots
+        self.next_snapshot_id = 1
+        self.lock = threading.Lock()
+
+    def track(self, subsystem: str, name: str, getter: Callable[[], Any]):
+        """Register an object (via a getter, so it can be replaced) under a subsystem"""
+        self.sources.setdefault(subsystem, {})[name] = getter
+
+    def sizes(self) -> Dict[str, Any]:
+        """Approximate size of every registered object, grouped by subsystem"""
+        report = {}
+        for subsystem, getters in self.sources.items():
+            entries = {}
+            for name, getter in getters.items():
+                obj = getter()
+                entries[name] = deep_size(obj) if obj is not None else {"bytes": 0, "objects": 0}
+            report[subsystem] = {
+                "bytes": sum(e["bytes"] for e in entries.values()),
+                "items": entries
+            }
+        return report
+
+    # ========== tracemalloc ==========
+
+    def start_tracing(self, frames: int = 25):
+        """Start recording allocation tracebacks (no-op if already tracing)"""
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(frames)
+
+    def stop_tracing(self):
+        """Stop tracing and drop stored snapshots"""
+        tracemalloc.stop()
+        with self.lock:
+            self.snapshots.clear()
+
+    def take_snapshot(self, label: str = "") -> Dict[str, Any]:
+        """Store a snapshot; returns its id and summary"""
+        if not tracemalloc.is_tracing():
+            raise RuntimeError("tracemalloc is not running")
+        gc.collect()
+        snapshot = tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap*>"),
+        ))
+        current, peak = tracemalloc.get_traced_memory()
+        with self.lock:
+            snapshot_id = self.next_snapshot_id
+            self.next_snapshot_id += 1
+            self.snapshots[snapshot_id] = {
+                "snapshot": snapshot, "label": label, "taken_at": time.time(),
+                "traced_bytes": current, "peak_bytes": peak
+            }
+            while len(self.snapshots) > self.max_snapshots:
+                self.snapshots.popitem(last=False)
+        return {"id": snapshot_id, "label": label, "traced_bytes": current, "peak_bytes": peak}
+
+    def diff(self, from_id: int, to_id: int, limit: int = 20,
+             group_by: str = "traceback") -> List[Dict[str, Any]]:
+        """Largest allocation growth between two stored snapshots"""
+        with self.lock:
+            older = self.snapshots.get(from_id)
+            newer = self.snapshots.get(to_id)
+        if older is None or newer is None:
+            raise KeyError("Unknown snapshot id")
+        stats = newer["snapshot"].compare_to(older["snapshot"], group_by)
+        return [
+            {
+                "size_diff": stat.size_diff,
+                "size": stat.size,
+                "count_diff": stat.count_diff,
+                "count": stat.count,
+                "traceback": [f"{frame.filename}:{frame.lineno}" for frame in stat.traceback]
+            }
+            for stat in stats[:limit]
+        ]
+
+    def tracing_status(self) -> Dict[str, Any]:
+        """Whether tracemalloc is running, and the stored snapshots"""
+        tracing = tracemalloc.is_tracing()
+        current, peak = tracemalloc.get_traced_memory() if tracing else (0, 0)
+        with self.lock:
+            snapshots = [
+                {"id": sid, "label": s["label"], "taken_at": s["taken_at"],
+                 "traced_bytes": s["traced_bytes"]}
+                for sid, s in self.snapshots.items()
+            ]
+        return {"tracing": tracing, "traced_bytes": current, "peak_bytes": peak,
+                "snapshots": snapshots}
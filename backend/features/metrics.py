@@ -0,0 +1,247 @@
+"""
+Metrics - Prometheus text-format counters and histograms
+
+Recording is kept cheap enough to leave on in production: counters and
+histogram buckets are plain preallocated cells updated without locks (a
+rare lost increment under thread contention is acceptable for monitoring),
+and all formatting happens at scrape time in `render()`.
+
+Collected:
+- per-event handler calls and latency (`rpg_event_*`)
+- emitted packets and bytes by event name, per recipient (`rpg_emitted_*`)
+- broadcast fan-out sizes (`rpg_broadcast_fanout`)
+- persistence timings for character/map storage (`rpg_persistence_seconds`)
+- process memory (`rpg_process_*`)
+"""
+
+import contextvars
+import functools
+import inspect
+import os
+import resource
+import time
+from bisect import bisect_left
+from typing import Dict, Any, Callable, List, Tuple
+
+
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01,
+                   0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+FANOUT_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def _labels(names: Tuple[str, ...], values: Tuple[Any, ...], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class Counter:
+    """Monotonic counter with optional labels"""
+
+    def __init__(self, name: str, help_text: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = labelnames
+        self.cells: Dict[Tuple[Any, ...], List[float]] = {}
+
+    def inc(self, *labelvalues, amount: float = 1):
+        cell = self.cells.get(labelvalues)
+        if cell is None:
+            cell = self.cells.setdefault(labelvalues, [0])
+        cell[0] += amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        for values, cell in list(self.cells.items()):
+            lines.append(f"{self.name}{_labels(self.labelnames, values)} {cell[0]}")
+        return lines
+
+
+class Histogram:
+    """Fixed-bucket histogram; each label set gets preallocated bucket counts"""
+
+    def __init__(self, name: str, help_text: str, buckets: Tuple[float, ...],
+                 labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.help = help_text
+        self.bounds = buckets
+        self.labelnames = labelnames
+        # per label set: [bucket counts..., +Inf count], [sum]
+        self.cells: Dict[Tuple[Any, ...], Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, *labelvalues):
+        cell = self.cells.get(labelvalues)
+        if cell is None:
+            cell = self.cells.setdefault(labelvalues, ([0] * (len(self.bounds) + 1), [0.0]))
+        cell[0][bisect_left(self.bounds, value)] += 1
+        cell[1][0] += value
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for values, (counts, total) in list(self.cells.items()):
+            cumulative = 0
+            for bound, count in zip(self.bounds, counts):
+                cumulative += count
+                le = _labels(self.labelnames, values, 'le="%s"' % bound)
+                lines.append(f"{self.name}_bucket{le} {cumulative}")
+            cumulative += counts[-1]
+            le = _labels(self.labelnames, values, 'le="+Inf"')
+            lines.append(f"{self.name}_bucket{le} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, values)} {total[0]}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, values)} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    """All server metrics plus scrape-time collectors"""
+
+    def __init__(self):
+        self.event_calls = Counter(
+            "rpg_event_calls_total", "Socket.IO events handled", ("event",))
+        self.event_errors = Counter(
+            "rpg_event_errors_total", "Socket.IO handlers that raised", ("event",))
+        self.event_latency = Histogram(
+            "rpg_event_latency_seconds", "Socket.IO handler latency", LATENCY_BUCKETS, ("event",))
+        self.emitted_packets = Counter(
+            "rpg_emitted_packets_total", "Encoded Socket.IO packets by event", ("event",))
+        self.emitted_bytes = Counter(
+            "rpg_emitted_bytes_total", "Encoded Socket.IO packet bytes by event", ("event",))
+        self.broadcast_fanout = Histogram(
+            "rpg_broadcast_fanout", "Recipients per broadcast", FANOUT_BUCKETS, ("event",))
+        self.persistence = Histogram(
+            "rpg_persistence_seconds", "Character/map storage operation time",
+            LATENCY_BUCKETS, ("operation",))
+        self.collectors: Dict[str, Callable[[], List[str]]] = {}
+
+    def add_collector(self, name: str, collector: Callable[[], List[str]]):
+        """Register (or replace) a callable producing extra lines at scrape time"""
+        self.collectors[name] = collector
+
+    def render(self) -> str:
+        """Render everything in Prometheus text exposition format"""
+        lines: List[str] = []
+        for metric in (self.event_calls, self.event_errors, self.event_latency,
+                       self.emitted_packets, self.emitted_bytes, self.broadcast_fanout,
+                       self.persistence):
+            lines.extend(metric.render())
+        lines.extend(process_memory_lines())
+        for collector in list(self.collectors.values()):
+            lines.extend(collector())
+        return "\n".join(lines) + "\n"
+
+
+def gauge_lines(name: str, help_text: str, samples: Dict[str, float], label: str = "",
+                metric_type: str = "gauge") -> List[str]:
+    """Exposition lines for a scrape-time value, optionally labelled by one dimension"""
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} {metric_type}"]
+    for key, value in samples.items():
+        lines.append(f'{name}{{{label}="{_escape(key)}"}} {value}' if label else f"{name} {value}")
+    return lines
+
+
+def process_memory_lines() -> List[str]:
+    """Resident and peak memory of this process"""
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    peak = usage.ru_maxrss * 1024  # kilobytes on Linux
+    lines = gauge_lines("rpg_process_peak_rss_bytes", "Peak resident set size", {"": peak})
+    try:
+        with open("/proc/self/statm") as f:
+            rss_pages = int(f.read().split()[1])
+        lines += gauge_lines("rpg_process_rss_bytes", "Resident set size",
+                             {"": rss_pages * os.sysconf("SC_PAGE_SIZE")})
+    except (OSError, ValueError, IndexError):
+        pass
+    return lines
+
+
+def timed_persistence(operation: str):
+    """Decorator recording a storage operation's duration"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                metrics.persistence.observe(time.perf_counter() - start, operation)
+        return wrapper
+    return decorator
+
+
+# (event, encoded parts, part sizes) of the last event packet encoded in this context
+_encoded: contextvars.ContextVar = contextvars.ContextVar("metered_encoded", default=None)
+
+
+def metered_packet_class(base):
+    """Subclass a python-socketio packet class to remember each event packet's
+    encoded size, for meter_sends to count per recipient"""
+    class MeteredPacket(base):
+        def encode(self):
+            encoded = super().encode()
+            data = self.data
+            if isinstance(data, list) and data and isinstance(data[0], str):
+                parts = encoded if isinstance(encoded, list) else [encoded]
+                sizes = [len(p.encode()) if isinstance(p, str) else len(p) for p in parts]
+                _encoded.set((data[0], parts, sizes))
+            else:
+                _encoded.set(None)
+            return encoded
+    MeteredPacket.__name__ = f"Metered{base.__name__}"
+    return MeteredPacket
+
+
+def _record_sent(part: Any = None):
+    """Count one recipient's copy of the packet last encoded in this context,
+    or of just `part` of it when a broadcast sends the encoded parts itself"""
+    encoded = _encoded.get()
+    if encoded is None:
+        return
+    event, parts, sizes = encoded
+    if part is None:
+        metrics.emitted_packets.inc(event)
+        metrics.emitted_bytes.inc(event, amount=sum(sizes))
+        return
+    for i, p in enumerate(parts):
+        if p is part:
+            if i == 0:
+                metrics.emitted_packets.inc(event)
+            metrics.emitted_bytes.inc(event, amount=sizes[i])
+            return
+
+
+def meter_sends(server):
+    """Count emitted packets and bytes per recipient on a python-socketio
+    Server or AsyncServer
+    
+    Broadcasts encode a packet once and send it to every participant, so
+    counting happens at send time rather than in encode.
+    """
+    server.packet_class = metered_packet_class(server.packet_class)
+    send_packet, send_eio_packet = server._send_packet, server._send_eio_packet
+    if inspect.iscoroutinefunction(send_packet):
+        async def metered_send_packet(eio_sid, pkt):
+            await send_packet(eio_sid, pkt)
+            _record_sent()
+
+        async def metered_send_eio_packet(eio_sid, eio_pkt):
+            await send_eio_packet(eio_sid, eio_pkt)
+            _record_sent(eio_pkt.data)
+    else:
+        def metered_send_packet(eio_sid, pkt):
+            send_packet(eio_sid, pkt)
+            _record_sent()
+
+        def metered_send_eio_packet(eio_sid, eio_pkt):
+            send_eio_packet(eio_sid, eio_pkt)
+            _record_sent(eio_pkt.data)
+    server._send_packet = metered_send_packet
+    server._send_eio_packet = metered_send_eio_packet
+
+
+# Global registry (one per server)
+metrics = MetricsRegistry()
@@ -0,0 +1,183 @@
+"""
+Movement Range - Reachable tiles for a token within its movement budget
+
+Dijkstra from the token's tile over 8-connected neighbours, where entering
+a tile costs its terrain multiplier (TERRAIN_COSTS, in tiles of movement)
+and obstacles or tiles held by other tokens cannot be entered. Diagonal
+steps cost the same as orthogonal ones and may not squeeze between two
+obstacles.
+
+Other tokens block movement; with an occupancy grid the blocking tiles
+in the search window come straight from it (blocking objects included).
+
+Results are cached per token and stay valid while the token, the turn,
+the tokens blocking the searched window and every chunk revision under
+that window are unchanged. The reachable set is sent as a bitmask over
+its bounding window: row-major bits, packed with numpy.packbits (most
+significant bit first) and base64-encoded.
+"""
+
+import base64
+import heapq
+import threading
+from typing import Dict, Any, Iterable, Optional, Tuple
+
+import numpy as np
+
+from features.tile_window import chunks_in_window
+
+
+FEET_PER_TILE = 5
+TERRAIN_COSTS = {
+    "difficult": 2,
+    "forest": 2,
+    "rubble": 2,
+    "mud": 2,
+    "water": 2,
+    "deep_water": 3,
+}
+_NEIGHBOURS = ((1, 0), (-1, 0), (0, 1), (0, -1), (1, 1), (1, -1), (-1, 1), (-1, -1))
+
+# board_id -> (revision, cost grid), for the few most recently used boards
+_cost_grids: Dict[str, Tuple[int, np.ndarray]] = {}
+_cost_grids_lock = threading.Lock()
+
+
+def cached_cost_grids() -> Dict[str, Tuple[int, np.ndarray]]:
+    """Copy of the cost grid cache, for memory reports"""
+    with _cost_grids_lock:
+        return dict(_cost_grids)
+
+
+def cost_grid(board) -> np.ndarray:
+    """Float array [y, x] of entry costs (inf for obstacles), rebuilt after edits"""
+    with _cost_grids_lock:
+        cached = _cost_grids.get(board.board_id)
+    if cached is None or cached[0] != board.revision:
+        revision = board.revision
+        grid = np.ones((board.height, board.width), dtype=np.float32)
+        for (x, y), tile in list(board.tiles.items()):
+            if tile.obstacle:
+                grid[y, x] = np.inf
+            elif tile.tile_type in TERRAIN_COSTS:
+                grid[y, x] = TERRAIN_COSTS[tile.tile_type]
+        grid.flags.writeable = False
+        cached = (revision, grid)
+        with _cost_grids_lock:
+            _cost_grids.pop(board.board_id, None)
+            _cost_grids[board.board_id] = cached
+            while len(_cost_grids) > 8:
+                del _cost_grids[next(iter(_cost_grids))]
+    return cached[1]
+
+
+def reachable(costs: np.ndarray, origin: Tuple[int, int], budget: float,
+              blocked: Iterable[Tuple[int, int]] = ()) -> Dict[Tuple[int, int], float]:
+    """Cheapest cost to every tile reachable from origin within budget"""
+    height, width = costs.shape
+    blocked = set(blocked)
+    best = {origin: 0.0}
+    heap = [(0.0, origin)]
+    while heap:
+        spent, (x, y) = heapq.heappop(heap)
+        if spent > best.get((x, y), np.inf):
+            continue
+        for dx, dy in _NEIGHBOURS:
+            nx, ny = x + dx, y + dy
+            if not (0 <= nx < width and 0 <= ny < height) or (nx, ny) in blocked:
+                continue
+            if dx and dy and costs[y, nx] == np.inf and costs[ny, x] == np.inf:
+                continue
+            total = spent + float(costs[ny, nx])
+            if total <= budget and total < best.get((nx, ny), np.inf):
+                best[(nx, ny)] = total
+                heapq.heappush(heap, (total, (nx, ny)))
+    return best
+
+
+def encode_mask(tiles: Iterable[Tuple[int, int]]) -> Dict[str, Any]:
+    """Bounding window plus base64 packed bitmask of a set of tiles"""
+    tiles = list(tiles)
+    xs = np.array([t[0] for t in tiles], dtype=np.int32)
+    ys = np.array([t[1] for t in tiles], dtype=np.int32)
+    x0, y0, x1, y1 = int(xs.min()), int(ys.min()), int(xs.max()) + 1, int(ys.max()) + 1
+    mask = np.zeros((y1 - y0, x1 - x0), dtype=bool)
+    mask[ys - y0, xs - x0] = True
+    return {"x0": x0, "y0": y0, "x1": x1, "y1": y1,
+            "mask": base64.b64encode(np.packbits(mask.ravel()).tobytes()).decode("ascii")}
+
+
+def decode_mask(encoded: Dict[str, Any]) -> set:
+    """Tiles set in an encoded mask"""
+    width = encoded["x1"] - encoded["x0"]
+    count = width * (encoded["y1"] - encoded["y0"])
+    bits = np.unpackbits(np.frombuffer(base64.b64decode(encoded["mask"]), dtype=np.uint8))[:count]
+    return {(encoded["x0"] + int(i) % width, encoded["y0"] + int(i) // width) for i in np.flatnonzero(bits)}
+
+
+class ReachabilityCache:
+    """Reachable-set masks per token, revalidated against moves, turns and edits"""
+
+    def __init__(self):
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, board, token_id: str, origin: Dict[str, int], speed_feet: float,
+            turn: Any = None, tokens: Optional[Dict[str, Dict[str, int]]] = None,
+            occupancy=None) -> Dict[str, Any]:
+        """Encoded reachable set for a token, from cache when still valid
+
+        Args:
+            board: Loaded Gameboard
+            token_id: Token whose range is wanted
+            origin: Its current {"x", "y"}
+            speed_feet: Movement budget in feet
+            turn: Anything identifying the current turn (cache is per turn)
+            tokens: All token positions; others block movement
+            occupancy: OccupancyGrid to take blocking tiles from instead of `tokens`
+        """
+        start = (int(origin["x"]), int(origin["y"]))
+        budget = speed_feet / FEET_PER_TILE
+        reach = int(budget)
+        window = (max(start[0] - reach, 0), max(start[1] - reach, 0),
+                  min(start[0] + reach + 1, board.width), min(start[1] + reach + 1, board.height))
+        if occupancy is not None:
+            blockers = frozenset(cell for cell in occupancy.cells_in(window) if cell != start)
+        else:
+            blockers = frozenset(
+                (p["x"], p["y"]) for tid, p in (tokens or {}).items()
+                if tid != token_id and window[0] <= p["x"] < window[2] and window[1] <= p["y"] < window[3]
+            )
+        key = (board.board_id, start, budget, turn, blockers)
+        revisions = tuple(board.chunk_revision(cx, cy) for cx, cy in chunks_in_window(window))
+
+        with self.lock:
+            entry = self.entries.get(token_id)
+            if entry and entry["key"] == key and entry["revisions"] == revisions:
+                self.hits += 1
+                return entry["result"]
+            self.misses += 1
+
+        costs = cost_grid(board)
+        best = reachable(costs, start, budget, blockers)
+        result = {"token_id": token_id, "speed": speed_feet, "origin": {"x": start[0], "y": start[1]},
+                  **encode_mask(best)}
+        with self.lock:
+            self.entries[token_id] = {"key": key, "revisions": revisions, "result": result}
+        return result
+
+    def invalidate(self, token_id: str):
+        """Forget a token's range (it moved or left)"""
+        with self.lock:
+            self.entries.pop(token_id, None)
+
+    def clear(self):
+        """Forget every range (new turn or map)"""
+        with self.lock:
+            self.entries.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache statistics"""
+        return {"entries": len(self.entries), "hits": self.hits, "misses": self.misses}
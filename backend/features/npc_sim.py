@@ -0,0 +1,309 @@
+"""
+NPC Simulation - Fixed-timestep, batched NPC behaviour
+
+NPC state lives in an NPCPool as parallel NumPy arrays (struct of arrays):
+position, hp, behaviour id, speed, sight and two patrol waypoints, with
+ids mapped to row indices. One step updates every NPC with a handful of
+array operations, so the cost per tick grows with NPC count times player
+count, not with Python-level work per NPC.
+
+Behaviours:
+- idle:   stands still
+- patrol: walks back and forth between its spawn point and `patrol_to`
+- chase:  walks toward the nearest player within `sight` (Chebyshev tiles),
+          stopping adjacent; patrols otherwise
+- flee:   walks away from the nearest player within `sight`; patrols otherwise
+
+NPCs step one tile (diagonals allowed) whenever their accumulated
+`speed * dt` reaches 1. A blocked diagonal falls back to either axis; a
+step is blocked by the board edge, obstacles, players and other NPCs.
+
+NPCScheduler runs steps on a background task against absolute deadlines
+(skipping, not bursting, when behind) and flushes every NPC that moved in
+a tick as one `npcs_update` payload. Given an occupancy grid, a step runs
+under the grid's lock, treats blocking objects as obstacles and records
+each NPC's new tile on the grid.
+"""
+
+import threading
+import time
+from contextlib import nullcontext
+from typing import Dict, Any, Callable, List, Optional
+
+import numpy as np
+
+from features.structured_log import get_logger
+
+
+log = get_logger("npc_sim")
+
+BEHAVIOURS = ("idle", "patrol", "chase", "flee")
+IDLE, PATROL, CHASE, FLEE = range(len(BEHAVIOURS))
+
+
+class NPCPool:
+    """NPC state as parallel arrays; rows [0, count) are live"""
+
+    FIELDS = {
+        "x": np.int32, "y": np.int32, "hp": np.int32, "behaviour": np.uint8,
+        "speed": np.float32, "progress": np.float32, "sight": np.int32,
+        "home_x": np.int32, "home_y": np.int32, "patrol_x": np.int32, "patrol_y": np.int32,
+        "leg": np.uint8,
+    }
+
+    def __init__(self, capacity: int = 64):
+        self.count = 0
+        self.ids: List[str] = []
+        self.names: List[str] = []
+        self.index: Dict[str, int] = {}
+        self.lock = threading.Lock()
+        for name, dtype in self.FIELDS.items():
+            setattr(self, name, np.zeros(capacity, dtype=dtype))
+
+    def _grow(self):
+        for name in self.FIELDS:
+            array = getattr(self, name)
+            setattr(self, name, np.concatenate([array, np.zeros_like(array)]))
+
+    def add(self, npc_id: str, name: str, x: int, y: int, hp: int = 10,
+            behaviour: str = "idle", patrol_to: Optional[Dict[str, int]] = None,
+            speed: float = 1.0, sight: int = 6):
+        """Add (or replace) an NPC; speed is in tiles per second"""
+        if behaviour not in BEHAVIOURS:
+            raise ValueError(f"Unknown behaviour: {behaviour}")
+        with self.lock:
+            i = self.index.get(npc_id)
+            if i is None:
+                if self.count == len(self.x):
+                    self._grow()
+                i = self.count
+                self.count += 1
+                self.ids.append(npc_id)
+                self.names.append(name)
+                self.index[npc_id] = i
+            self.names[i] = name
+            target = patrol_to or {"x": x, "y": y}
+            values = dict(x=x, y=y, hp=hp, behaviour=BEHAVIOURS.index(behaviour), speed=speed,
+                          progress=0, sight=sight, home_x=x, home_y=y,
+                          patrol_x=target["x"], patrol_y=target["y"], leg=0)
+            for field, value in values.items():
+                getattr(self, field)[i] = value
+
+    def remove(self, npc_id: str) -> bool:
+        """Remove an NPC by moving the last row into its slot"""
+        with self.lock:
+            i = self.index.pop(npc_id, None)
+            if i is None:
+                return False
+            last = self.count - 1
+            if i != last:
+                for field in self.FIELDS:
+                    array = getattr(self, field)
+                    array[i] = array[last]
+                self.ids[i], self.names[i] = self.ids[last], self.names[last]
+                self.index[self.ids[i]] = i
+            self.ids.pop()
+            self.names.pop()
+            self.count = last
+            return True
+
+    def clear(self):
+        """Remove every NPC"""
+        with self.lock:
+            self.count = 0
+            self.ids, self.names, self.index = [], [], {}
+
+    def positions(self) -> Dict[str, Dict[str, int]]:
+        """{npc_id: {"x", "y"}} for every NPC"""
+        with self.lock:
+            return {npc_id: {"x": int(self.x[i]), "y": int(self.y[i])} for i, npc_id in enumerate(self.ids)}
+
+    def describe(self, i: int) -> Dict[str, Any]:
+        """Public view of one row"""
+        return {"npc_id": self.ids[i], "name": self.names[i],
+                "position": {"x": int(self.x[i]), "y": int(self.y[i])},
+                "hp": int(self.hp[i]), "behaviour": BEHAVIOURS[self.behaviour[i]]}
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        """Public view of every NPC"""
+        with self.lock:
+            return [self.describe(i) for i in range(self.count)]
+
+
+def step_npcs(pool: NPCPool, dt: float, obstacles: np.ndarray, players: np.ndarray) -> np.ndarray:
+    """Advance every NPC by dt seconds; returns row indices that moved
+
+    Call with pool.lock held. `players` is an (k, 2) array of x, y.
+    """
+    n = pool.count
+    if n == 0:
+        return np.empty(0, dtype=np.int64)
+    height, width = obstacles.shape
+    x, y = pool.x[:n], pool.y[:n]
+    behaviour = pool.behaviour[:n]
+
+    progress = pool.progress[:n]
+    progress += pool.speed[:n] * dt
+    ready = progress >= 1
+    np.minimum(progress, 1, out=progress)
+
+    # Patrol legs: turn around on reaching the current waypoint
+    leg = pool.leg[:n]
+    goal_x = np.where(leg == 0, pool.patrol_x[:n], pool.home_x[:n])
+    goal_y = np.where(leg == 0, pool.patrol_y[:n], pool.home_y[:n])
+    arrived = (behaviour != IDLE) & (x == goal_x) & (y == goal_y)
+    leg[arrived] ^= 1
+    goal_x = np.where(arrived, np.where(leg == 0, pool.patrol_x[:n], pool.home_x[:n]), goal_x)
+    goal_y = np.where(arrived, np.where(leg == 0, pool.patrol_y[:n], pool.home_y[:n]), goal_y)
+    target_x = np.where(behaviour == IDLE, x, goal_x)
+    target_y = np.where(behaviour == IDLE, y, goal_y)
+
+    if len(players):
+        px, py = players[:, 0], players[:, 1]
+        distance = np.maximum(np.abs(x[:, None] - px[None, :]), np.abs(y[:, None] - py[None, :]))
+        nearest = distance.argmin(axis=1)
+        near = distance[np.arange(n), nearest] <= pool.sight[:n]
+        chase = near & (behaviour == CHASE)
+        flee = near & (behaviour == FLEE)
+        target_x = np.where(chase, px[nearest], target_x)
+        target_y = np.where(chase, py[nearest], target_y)
+        target_x = np.where(flee, 2 * x - px[nearest], target_x)
+        target_y = np.where(flee, 2 * y - py[nearest], target_y)
+        ready &= ~(chase & (distance[np.arange(n), nearest] <= 1))
+
+    dx, dy = np.sign(target_x - x), np.sign(target_y - y)
+    moving = ready & ((dx != 0) | (dy != 0))
+    if not moving.any():
+        return np.empty(0, dtype=np.int64)
+
+    occupied = np.zeros((height, width), dtype=bool)
+    inside = (x >= 0) & (x < width) & (y >= 0) & (y < height)
+    occupied[y[inside], x[inside]] = True
+    if len(players):
+        on_board = (px >= 0) & (px < width) & (py >= 0) & (py < height)
+        occupied[py[on_board], px[on_board]] = True
+    blocked = obstacles | occupied
+
+    def free(cx, cy):
+        ok = (cx >= 0) & (cx < width) & (cy >= 0) & (cy < height)
+        ok[ok] = ~blocked[cy[ok], cx[ok]]
+        return ok
+
+    new_x, new_y = x.copy(), y.copy()
+    pending = moving.copy()
+    for step_x, step_y in ((dx, dy), (dx, np.zeros_like(dy)), (np.zeros_like(dx), dy)):
+        cx, cy = x + step_x, y + step_y
+        take = pending & ((step_x != 0) | (step_y != 0)) & free(cx, cy)
+        new_x[take], new_y[take] = cx[take], cy[take]
+        pending &= ~take
+
+    # Two NPCs stepping onto the same tile: the lower row wins
+    moved = np.flatnonzero((new_x != x) | (new_y != y))
+    cells = new_y[moved].astype(np.int64) * width + new_x[moved]
+    _, first = np.unique(cells, return_index=True)
+    moved = moved[np.sort(first)]
+
+    x[moved], y[moved] = new_x[moved], new_y[moved]
+    progress[moved] -= 1
+    return moved
+
+
+class NPCScheduler:
+    """Runs step_npcs on a fixed timestep and flushes one update per tick"""
+
+    def __init__(self, sio, tick_hz: float, get_pool: Callable[[], NPCPool],
+                 get_board: Callable[[], Any], get_players: Callable[[], List[Dict[str, int]]],
+                 flush: Callable[[Dict[str, Any]], None],
+                 get_occupancy: Optional[Callable[[], Any]] = None):
+        """
+        Args:
+            sio: Socket.IO instance used to run the background task
+            tick_hz: Simulation steps per second
+            get_pool: Returns the NPCPool to simulate
+            get_board: Returns the loaded Gameboard (or None to idle)
+            get_players: Returns player token positions
+            flush: Callback receiving each `npcs_update` payload
+            get_occupancy: Returns the map's OccupancyGrid, kept in step with NPC moves
+        """
+        self.sio = sio
+        self.interval = 1.0 / tick_hz
+        self.get_pool = get_pool
+        self.get_board = get_board
+        self.get_players = get_players
+        self.flush = flush
+        self.get_occupancy = get_occupancy or (lambda: None)
+        self.running = False
+        self.lock = threading.Lock()
+        self.tick_count = 0
+        self.moves = 0
+        self.last_ms = 0.0
+        self.max_ms = 0.0
+        self.overruns = 0
+
+    def start(self):
+        """Start the background task (idempotent)"""
+        with self.lock:
+            if self.running:
+                return
+            self.running = True
+        self.sio.start_background_task(self._run)
+
+    def stop(self):
+        """Stop after the current tick"""
+        self.running = False
+
+    def tick(self) -> Optional[Dict[str, Any]]:
+        """Run one step; returns the payload flushed, if any NPC moved"""
+        self.tick_count += 1
+        pool, board = self.get_pool(), self.get_board()
+        if board is None or pool.count == 0:
+            return None
+        started = time.perf_counter()
+        occupancy = self.get_occupancy()
+        with occupancy.lock if occupancy else nullcontext(), pool.lock:
+            players = np.array([[p["x"], p["y"]] for p in self.get_players()], dtype=np.int32).reshape(-1, 2)
+            obstacles = board.obstacle_grid()
+            if occupancy and occupancy.counts.shape == obstacles.shape:
+                obstacles = obstacles | occupancy.mask(("object",))
+            moved = step_npcs(pool, self.interval, obstacles, players)
+            npcs = [{"npc_id": pool.ids[i], "position": {"x": int(pool.x[i]), "y": int(pool.y[i])}}
+                    for i in moved]
+            if occupancy:
+                for npc in npcs:
+                    occupancy.place(npc["npc_id"], npc["position"]["x"], npc["position"]["y"], kind="npc")
+        self.last_ms = (time.perf_counter() - started) * 1000
+        self.max_ms = max(self.max_ms, self.last_ms)
+        if not npcs:
+            return None
+        self.moves += len(npcs)
+        payload = {"npcs": npcs, "tick": self.tick_count, "timestamp": time.time()}
+        self.flush(payload)
+        return payload
+
+    def _run(self):
+        """Tick loop scheduled against absolute deadlines; late ticks are dropped"""
+        next_tick = time.monotonic()
+        while self.running:
+            next_tick += self.interval
+            delay = next_tick - time.monotonic()
+            if delay > 0:
+                self.sio.sleep(delay)
+            else:
+                self.overruns += 1
+                next_tick = time.monotonic()
+            try:
+                self.tick()
+            except Exception as e:
+                log.error("npc_sim", "NPC tick failed", error=str(e))
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get scheduler statistics"""
+        return {
+            "tick_hz": 1.0 / self.interval,
+            "ticks": self.tick_count,
+            "npcs": self.get_pool().count,
+            "moves": self.moves,
+            "last_tick_ms": round(self.last_ms, 3),
+            "max_tick_ms": round(self.max_ms, 3),
+            "overruns": self.overruns
+        }
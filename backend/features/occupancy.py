@@ -0,0 +1,147 @@
+"""
+Occupancy Grid - Which tokens stand on which tile, kept in lockstep with moves
+
+Every player token, simulated NPC and positioned board object is recorded
+on the grid of the loaded map:
+
+- `counts`: uint16 array [y, x] of occupants per tile (for vectorized masks)
+- `cells`:  (x, y) -> occupant ids, in arrival order
+- `where`:  occupant id -> (x, y)
+
+so "is this tile occupied / by whom" and "where is this token" are O(1).
+Tokens may share a tile when placed (everyone joins at the same spawn
+point); `move` is what enforces the one-token-per-tile rule, and a token
+may always leave a shared tile. Off-board positions are not recorded.
+"""
+
+import threading
+from typing import Dict, Any, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+
+Cell = Tuple[int, int]
+
+
+class OccupancyGrid:
+    """Tile occupants of one map"""
+
+    def __init__(self, width: int, height: int):
+        self.width = width
+        self.height = height
+        self.counts = np.zeros((height, width), dtype=np.uint16)
+        self.cells: Dict[Cell, List[str]] = {}
+        self.where: Dict[str, Cell] = {}
+        self.kinds: Dict[str, str] = {}
+        self.lock = threading.RLock()
+        self.rejected = 0
+
+    def in_bounds(self, x: int, y: int) -> bool:
+        return 0 <= x < self.width and 0 <= y < self.height
+
+    def _take(self, token_id: str, cell: Cell):
+        # counts first: a bad cell raises before cells/where are touched
+        self.counts[cell[1], cell[0]] += 1
+        self.cells.setdefault(cell, []).append(token_id)
+        self.where[token_id] = cell
+
+    def _leave(self, token_id: str) -> Optional[Cell]:
+        cell = self.where.pop(token_id, None)
+        if cell is not None:
+            occupants = self.cells[cell]
+            occupants.remove(token_id)
+            if not occupants:
+                del self.cells[cell]
+            self.counts[cell[1], cell[0]] -= 1
+        return cell
+
+    def place(self, token_id: str, x: int, y: int, kind: str = "player"):
+        """Put a token on a tile (or take it off the grid if off-board), sharing allowed"""
+        with self.lock:
+            self._leave(token_id)
+            self.kinds[token_id] = kind
+            if self.in_bounds(x, y):
+                self._take(token_id, (x, y))
+
+    def move(self, token_id: str, x: int, y: int) -> bool:
+        """Move a token unless another token holds the target tile"""
+        with self.lock:
+            if self.blocked(x, y, token_id):
+                self.rejected += 1
+                return False
+            self._leave(token_id)
+            if self.in_bounds(x, y):
+                self._take(token_id, (x, y))
+            return True
+
+    def remove(self, token_id: str) -> bool:
+        """Take a token off the grid"""
+        with self.lock:
+            self.kinds.pop(token_id, None)
+            return self._leave(token_id) is not None
+
+    def occupants(self, x: int, y: int) -> List[str]:
+        """Ids on a tile, earliest arrival first"""
+        return list(self.cells.get((x, y), ()))
+
+    def occupant(self, x: int, y: int) -> Optional[str]:
+        """First token on a tile, if any"""
+        occupants = self.cells.get((x, y))
+        return occupants[0] if occupants else None
+
+    def is_occupied(self, x: int, y: int) -> bool:
+        return (x, y) in self.cells
+
+    def blocked(self, x: int, y: int, token_id: Optional[str] = None) -> bool:
+        """Whether a token other than `token_id` stands on the tile"""
+        occupants = self.cells.get((x, y))
+        return bool(occupants) and occupants != [token_id]
+
+    def mask(self, kinds: Optional[Iterable[str]] = None) -> np.ndarray:
+        """Bool array [y, x] of occupied tiles, optionally only by these kinds"""
+        with self.lock:
+            if kinds is None:
+                return self.counts > 0
+            kinds = set(kinds)
+            grid = np.zeros(self.counts.shape, dtype=bool)
+            for token_id, (x, y) in self.where.items():
+                if self.kinds[token_id] in kinds:
+                    grid[y, x] = True
+            return grid
+
+    def cells_in(self, window: Tuple[int, int, int, int]) -> List[Cell]:
+        """Occupied tiles inside a half-open (x0, y0, x1, y1) window"""
+        x0, y0, x1, y1 = window
+        with self.lock:
+            ys, xs = np.nonzero(self.counts[y0:y1, x0:x1])
+        return [(int(x) + x0, int(y) + y0) for x, y in zip(xs, ys)]
+
+    def check(self, expected: Dict[str, Dict[str, int]]) -> List[str]:
+        """Differences between the grid and authoritative {token_id: {"x", "y"}} positions"""
+        problems = []
+        with self.lock:
+            for token_id, position in expected.items():
+                cell = (position["x"], position["y"])
+                if not self.in_bounds(*cell):
+                    cell = None
+                if self.where.get(token_id) != cell:
+                    problems.append(f"{token_id}: grid {self.where.get(token_id)}, actual {cell}")
+            for token_id in self.where.keys() - expected.keys():
+                problems.append(f"{token_id}: on grid but not in game state")
+            for cell, occupants in self.cells.items():
+                if self.counts[cell[1], cell[0]] != len(occupants):
+                    problems.append(f"{cell}: count {self.counts[cell[1], cell[0]]}, occupants {occupants}")
+            if int(self.counts.sum()) != len(self.where):
+                problems.append(f"grid holds {int(self.counts.sum())} tokens, index {len(self.where)}")
+        return problems
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get grid statistics"""
+        return {
+            "width": self.width,
+            "height": self.height,
+            "tokens": len(self.where),
+            "occupied_tiles": len(self.cells),
+            "shared_tiles": sum(1 for o in self.cells.values() if len(o) > 1),
+            "rejected_moves": self.rejected
+        }
@@ -0,0 +1,193 @@
+"""
+Outbound Queues - Per-connection send queues with backpressure
+
+Each session gets a bounded application-level queue in front of its
+transport. Messages go straight to the transport while the client keeps up;
+once its transport backlog reaches the window, messages wait here instead,
+where slow-consumer policies apply:
+
+- superseded updates are replaced in place (a newer `character_moved` for the
+  same player, a newer `game_state_update` snapshot)
+- batched `positions_update` entries are merged by player
+- a session whose queue passes the high watermark is disconnected
+"""
+
+import threading
+from collections import deque
+from typing import Dict, Any, Callable, Tuple
+
+from features.structured_log import get_logger
+
+
+log = get_logger("outbound")
+
+
+def _merge_positions(old: Dict[str, Any], new: Dict[str, Any]) -> Dict[str, Any]:
+    """Merge two positions_update batches, keeping each player's latest position"""
+    merged = {p["player_id"]: p for p in old["positions"]}
+    for p in new["positions"]:
+        merged[p["player_id"]] = p
+    return {**new, "positions": list(merged.values())}
+
+
+def _replace(old: Dict[str, Any], new: Dict[str, Any]) -> Dict[str, Any]:
+    return new
+
+
+# event name -> (supersede key, merge(old, new)); the key scopes what is superseded
+SUPERSEDE_POLICIES: Dict[str, Tuple[Callable[[Dict[str, Any]], Any], Callable]] = {
+    "character_moved": (lambda d: d.get("player_id"), _replace),
+    "positions_update": (lambda d: None, _merge_positions),
+    "game_state_update": (lambda d: None, _replace),
+}
+
+
+class ConnectionQueue:
+    """Pending messages and counters for one session"""
+
+    def __init__(self, sid: str):
+        self.sid = sid
+        self.messages = deque()  # entries are [event_name, key, data]
+        self.index: Dict[Tuple[str, Any], list] = {}
+        self.sent = 0
+        self.queued = 0
+        self.superseded = 0
+        self.max_depth_seen = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "depth": len(self.messages),
+            "max_depth": self.max_depth_seen,
+            "sent": self.sent,
+            "queued": self.queued,
+            "superseded": self.superseded
+        }
+
+
+class OutboundQueueManager:
+    """Bounded per-session send queues with slow-consumer policies"""
+
+    def __init__(self, sio, send: Callable[[str, str, Dict[str, Any]], None],
+                 backlog: Callable[[str], int], disconnect: Callable[[str], None],
+                 max_depth: int = 256, transport_window: int = 16,
+                 drain_interval: float = 0.02):
+        """
+        Args:
+            sio: Socket.IO instance used to run the background drain task
+            send: Writes one message to a session's transport
+            backlog: Number of packets waiting in a session's transport
+            disconnect: Drops a session that fell past the watermark
+            max_depth: High watermark; deeper queues get disconnected
+            transport_window: Transport backlog above which messages are held here
+            drain_interval: Seconds between background drain passes
+        """
+        self.sio = sio
+        self.send = send
+        self.backlog = backlog
+        self.disconnect = disconnect
+        self.max_depth = max_depth
+        self.transport_window = transport_window
+        self.drain_interval = drain_interval
+        self.queues: Dict[str, ConnectionQueue] = {}
+        self.lock = threading.Lock()
+        self.running = False
+        self.slow_disconnects = 0
+
+    def enqueue(self, sid: str, event_name: str, data: Dict[str, Any]):
+        """Send now if the session keeps up, otherwise queue under its policy"""
+        # Transport writes only enqueue a packet, so they happen under the lock
+        # to keep per-session ordering between direct sends and the drain task
+        with self.lock:
+            queue = self.queues.get(sid)
+            if queue is None:
+                queue = self.queues[sid] = ConnectionQueue(sid)
+
+            if not queue.messages and self.backlog(sid) < self.transport_window:
+                queue.sent += 1
+                self.send(sid, event_name, data)
+                return
+
+            self._queue_locked(queue, event_name, data)
+            overflowed = len(queue.messages) > self.max_depth
+
+        if overflowed:
+            self._drop_slow_consumer(sid)
+        elif not self.running:
+            self.start()
+
+    def _queue_locked(self, queue: ConnectionQueue, event_name: str, data: Dict[str, Any]):
+        """Append or supersede a pending message (lock held)"""
+        queue.queued += 1
+        policy = SUPERSEDE_POLICIES.get(event_name)
+        if policy:
+            key_fn, merge = policy
+            index_key = (event_name, key_fn(data))
+            entry = queue.index.get(index_key)
+            if entry is not None:
+                entry[2] = merge(entry[2], data)
+                queue.superseded += 1
+                return
+            entry = [event_name, index_key, data]
+            queue.index[index_key] = entry
+        else:
+            entry = [event_name, None, data]
+        queue.messages.append(entry)
+        queue.max_depth_seen = max(queue.max_depth_seen, len(queue.messages))
+
+    def _drop_slow_consumer(self, sid: str):
+        """Disconnect a session whose queue passed the high watermark"""
+        with self.lock:
+            self.queues.pop(sid, None)
+            self.slow_disconnects += 1
+        log.warning("backpressure", "Disconnecting slow consumer", sid=sid)
+        self.disconnect(sid)
+
+    def drain(self):
+        """Move queued messages to transports that have room"""
+        with self.lock:
+            sids = [sid for sid, q in self.queues.items() if q.messages]
+        for sid in sids:
+            with self.lock:
+                queue = self.queues.get(sid)
+                while queue and queue.messages and self.backlog(sid) < self.transport_window:
+                    event_name, index_key, data = queue.messages.popleft()
+                    if index_key is not None:
+                        queue.index.pop(index_key, None)
+                    queue.sent += 1
+                    self.send(sid, event_name, data)
+
+    def remove(self, sid: str):
+        """Forget a disconnected session"""
+        with self.lock:
+            self.queues.pop(sid, None)
+
+    def start(self):
+        """Start the background drain task (idempotent)"""
+        with self.lock:
+            if self.running:
+                return
+            self.running = True
+        self.sio.start_background_task(self._run)
+
+    def stop(self):
+        self.running = False
+
+    def _run(self):
+        while self.running:
+            self.sio.sleep(self.drain_interval)
+            try:
+                self.drain()
+            except Exception as e:
+                log.error("outbound_drain", "Outbound drain failed", error=str(e))
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get per-session queue depth and drop counts"""
+        with self.lock:
+            sessions = {sid: q.get_stats() for sid, q in self.queues.items()}
+        return {
+            "max_depth": self.max_depth,
+            "transport_window": self.transport_window,
+            "slow_disconnects": self.slow_disconnects,
+            "total_depth": sum(s["depth"] for s in sessions.values()),
+            "sessions": sessions
+        }
@@ -0,0 +1,171 @@
+"""
+Handler Profiling - Runtime-toggled instrumentation for Socket.IO handlers
+
+Every registered handler is wrapped once at startup; what the wrapper does is
+switched at runtime (GM-only `/api/debug/profiling`):
+
+- Sampling: time a random fraction of calls per handler (count/avg/max)
+- Slow log: log and keep the most recent calls slower than a threshold
+- Capture: cProfile every handler call for N seconds, written as .pstats
+
+While all three are off the wrapper is a single attribute check.
+"""
+
+import cProfile
+import functools
+import os
+import pstats
+import random
+import threading
+import time
+from collections import deque
+from typing import Dict, Any, Callable, Optional
+
+from features.structured_log import get_logger
+
+
+log = get_logger("profiling")
+
+
+class HandlerTiming:
+    """Sampled wall-clock timings for one handler"""
+
+    __slots__ = ("count", "total", "max")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, elapsed: float):
+        self.count += 1
+        self.total += elapsed
+        if elapsed > self.max:
+            self.max = elapsed
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "samples": self.count,
+            "avg_ms": round(self.total / self.count * 1000, 3) if self.count else 0.0,
+            "max_ms": round(self.max * 1000, 3)
+        }
+
+
+class HandlerProfiler:
+    """Wraps handlers with instrumentation that can be switched on at runtime"""
+
+    def __init__(self, sio, output_dir: str, slow_log_size: int = 100):
+        """
+        Args:
+            sio: Socket.IO instance used to time out captures
+            output_dir: Directory for .pstats capture files
+            slow_log_size: Number of slow calls kept in memory
+        """
+        self.sio = sio
+        self.output_dir = output_dir
+        self.active = False
+        self.sample_rate = 0.0
+        self.slow_ms = 0.0
+        self.timings: Dict[str, HandlerTiming] = {}
+        self.slow_calls = deque(maxlen=slow_log_size)
+        self.lock = threading.Lock()
+        self.capture: Optional[pstats.Stats] = None
+        self.capture_until = 0.0
+        self.capture_calls = 0
+        self.last_capture: Optional[Dict[str, Any]] = None
+
+    def instrument(self, event_name: str, handler: Callable) -> Callable:
+        """Wrap a handler; a no-op pass-through while profiling is inactive"""
+        @functools.wraps(handler)
+        def profiled(*args):
+            if not self.active:
+                return handler(*args)
+            return self._run(event_name, handler, args)
+        return profiled
+
+    def _run(self, event_name: str, handler: Callable, args):
+        profile = cProfile.Profile() if self.capture is not None else None
+        start = time.perf_counter()
+        try:
+            if profile is not None:
+                return profile.runcall(handler, *args)
+            return handler(*args)
+        finally:
+            elapsed = time.perf_counter() - start
+            if self.sample_rate and random.random() < self.sample_rate:
+                timing = self.timings.get(event_name)
+                if timing is None:
+                    timing = self.timings.setdefault(event_name, HandlerTiming())
+                timing.add(elapsed)
+            if self.slow_ms and elapsed * 1000 >= self.slow_ms:
+                self._record_slow(event_name, elapsed)
+            if profile is not None:
+                self._merge(profile)
+
+    def _record_slow(self, event_name: str, elapsed: float):
+        entry = {"event": event_name, "ms": round(elapsed * 1000, 3), "at": time.time()}
+        self.slow_calls.append(entry)
+        log.warning("slow_handler", "Slow socket handler", handler=event_name, ms=entry["ms"])
+
+    def _merge(self, profile: cProfile.Profile):
+        with self.lock:
+            if self.capture is None:
+                return
+            self.capture.add(profile)
+            self.capture_calls += 1
+
+    def configure(self, sample_rate: Optional[float] = None, slow_ms: Optional[float] = None):
+        """Set sampling rate (0-1) and slow-call threshold in ms (0 = off)"""
+        if sample_rate is not None:
+            self.sample_rate = min(max(float(sample_rate), 0.0), 1.0)
+        if slow_ms is not None:
+            self.slow_ms = max(float(slow_ms), 0.0)
+        self._update_active()
+
+    def reset(self):
+        """Clear sampled timings and the slow-call log"""
+        self.timings = {}
+        self.slow_calls.clear()
+
+    def start_capture(self, seconds: float) -> bool:
+        """Profile all handler calls for `seconds`; False if one is running"""
+        with self.lock:
+            if self.capture is not None:
+                return False
+            self.capture = pstats.Stats()
+            self.capture_calls = 0
+            self.capture_until = time.time() + seconds
+        self._update_active()
+        self.sio.start_background_task(self._finish_capture, seconds)
+        return True
+
+    def _finish_capture(self, seconds: float):
+        self.sio.sleep(seconds)
+        with self.lock:
+            stats, self.capture = self.capture, None
+            calls = self.capture_calls
+        self._update_active()
+
+        path = None
+        if calls:
+            os.makedirs(self.output_dir, exist_ok=True)
+            path = os.path.join(self.output_dir, f"handlers-{time.strftime('%Y%m%d-%H%M%S')}.pstats")
+            stats.dump_stats(path)
+        self.last_capture = {"path": path, "calls": calls, "seconds": seconds, "finished_at": time.time()}
+        log.event("profile_capture", "Handler profile capture finished", path=path, calls=calls)
+
+    def _update_active(self):
+        self.active = bool(self.sample_rate or self.slow_ms or self.capture is not None)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get profiler settings, sampled timings and recent slow calls"""
+        return {
+            "active": self.active,
+            "sample_rate": self.sample_rate,
+            "slow_ms": self.slow_ms,
+            "timings": {name: t.to_dict() for name, t in list(self.timings.items())},
+            "slow_calls": list(self.slow_calls),
+            "capturing": self.capture is not None,
+            "capture_remaining": max(0.0, self.capture_until - time.time()) if self.capture is not None else 0.0,
+            "last_capture": self.last_capture
+        }
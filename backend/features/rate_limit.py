@@ -0,0 +1,145 @@
+"""
+Rate Limiting - Token buckets for incoming socket events
+
+Each limited event gets one bucket per client and one bucket for the
+whole game. A call must take a token from both; otherwise it is throttled
+before it reaches the handler, so a flooding client never triggers logging,
+state mutation or a broadcast. Memory is a fixed set of buckets per client.
+
+A client is its sid until it joins, then its player: buckets follow the
+player across reconnects, so reconnecting does not refill them.
+
+Limits are written as `event=rate/burst` pairs, e.g.
+`move_character=20/40,chat_message=2/5`. The rate must be positive and the
+burst at least 1, or no call would ever get through.
+"""
+
+import threading
+import time
+from typing import Dict, Any, Optional, Tuple
+
+
+Limits = Dict[str, Tuple[float, float]]
+
+
+def parse_limits(spec: str) -> Limits:
+    """Parse `event=rate/burst,...` into {event: (rate, burst)}
+    
+    Raises ValueError on a malformed pair, a rate <= 0 or a burst < 1.
+    """
+    limits: Limits = {}
+    for part in spec.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        event_name, _, value = part.partition("=")
+        rate, _, burst = value.partition("/")
+        try:
+            rate = float(rate)
+            burst = float(burst) if burst else rate
+        except ValueError:
+            raise ValueError(f"Invalid rate limit {part!r}, expected event=rate/burst") from None
+        if not event_name.strip() or not rate > 0 or not burst >= 1:
+            raise ValueError(f"Invalid rate limit {part!r}: rate must be > 0 and burst >= 1")
+        limits[event_name.strip()] = (rate, burst)
+    return limits
+
+
+class TokenBucket:
+    """Classic token bucket refilled lazily on each check"""
+
+    __slots__ = ("rate", "capacity", "tokens", "updated")
+
+    def __init__(self, rate: float, capacity: float, now: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = now
+
+    def refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def retry_after(self) -> float:
+        """Seconds until one token is available"""
+        return max(0.0, (1.0 - self.tokens) / self.rate) if self.rate > 0 else float("inf")
+
+
+class RateLimiter:
+    """Per-client and per-game token buckets keyed by event name"""
+
+    def __init__(self, client_limits: Limits, game_limits: Optional[Limits] = None):
+        self.client_limits = client_limits
+        self.game_limits = game_limits or {}
+        self.client_buckets: Dict[str, Dict[str, TokenBucket]] = {}
+        self.players: Dict[str, str] = {}  # sid -> bucket key of the player it joined as
+        self.game_buckets: Dict[str, TokenBucket] = {}
+        self.throttled: Dict[str, int] = {}
+        self.lock = threading.Lock()
+
+    def is_limited(self, event_name: str) -> bool:
+        """Whether any limit applies to an event"""
+        return event_name in self.client_limits or event_name in self.game_limits
+
+    def check(self, sid: str, event_name: str) -> Optional[float]:
+        """Consume a token; returns None if allowed, else seconds to retry after"""
+        now = time.monotonic()
+        with self.lock:
+            buckets = []
+
+            limit = self.client_limits.get(event_name)
+            if limit:
+                client = self.client_buckets.setdefault(self.players.get(sid, sid), {})
+                bucket = client.get(event_name)
+                if bucket is None:
+                    bucket = client[event_name] = TokenBucket(limit[0], limit[1], now)
+                buckets.append(bucket)
+
+            limit = self.game_limits.get(event_name)
+            if limit:
+                bucket = self.game_buckets.get(event_name)
+                if bucket is None:
+                    bucket = self.game_buckets[event_name] = TokenBucket(limit[0], limit[1], now)
+                buckets.append(bucket)
+
+            for bucket in buckets:
+                bucket.refill(now)
+            empty = [b for b in buckets if b.tokens < 1.0]
+            if empty:
+                self.throttled[event_name] = self.throttled.get(event_name, 0) + 1
+                return max(b.retry_after() for b in empty)
+
+            for bucket in buckets:
+                bucket.tokens -= 1.0
+            return None
+
+    def bind(self, sid: str, player_id: str):
+        """Charge a sid's calls to the player it joined (or resumed) as
+        
+        Tokens the sid spent before joining carry over unless the player
+        already has buckets.
+        """
+        key = f"player:{player_id}"
+        with self.lock:
+            self.players[sid] = key
+            spent = self.client_buckets.pop(sid, None)
+            if spent:
+                self.client_buckets.setdefault(key, spent)
+
+    def remove(self, sid: str):
+        """Forget a disconnected sid; its player's buckets stay until forget()"""
+        with self.lock:
+            self.players.pop(sid, None)
+            self.client_buckets.pop(sid, None)
+
+    def forget(self, player_id: str):
+        """Drop the buckets of a player who left the game"""
+        with self.lock:
+            self.client_buckets.pop(f"player:{player_id}", None)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get rate limiting statistics"""
+        return {
+            "tracked_clients": len(self.client_buckets),
+            "throttled": dict(self.throttled)
+        }
@@ -0,0 +1,85 @@
+"""
+Session Resume - Resume tokens and a short event journal for reconnects
+
+A player gets a resume token at join. When their socket drops, the session is
+kept for a grace period instead of being removed; a reconnect presenting the
+token is rebound to the new sid and receives only the broadcasts it missed
+(from a bounded journal), with no leave/join churn sent to the room.
+
+Each journal entry keeps the scope its broadcast was filtered by (origin
+tiles, per-entry positions, the excluded sender) so a replay can be filtered
+the same way for the resuming session.
+"""
+
+import secrets
+import threading
+from collections import deque
+from typing import Dict, Any, List, Optional
+
+
+class EventJournal:
+    """Bounded, sequentially numbered log of broadcast events"""
+
+    def __init__(self, maxlen: int = 500):
+        self.entries = deque(maxlen=maxlen)
+        self.last_id = 0
+        self.lock = threading.Lock()
+
+    def record(self, event_name: str, data: Dict[str, Any],
+               scope: Optional[Dict[str, Any]] = None) -> int:
+        """Append a broadcast and the scope it was filtered by; returns its id"""
+        with self.lock:
+            self.last_id += 1
+            self.entries.append((self.last_id, event_name, data, scope or {}))
+            return self.last_id
+
+    def since(self, event_id: int) -> Optional[List[Dict[str, Any]]]:
+        """Events after event_id, or None if some have already been evicted"""
+        with self.lock:
+            if self.entries and self.entries[0][0] > event_id + 1:
+                return None
+            return [
+                {"event_id": eid, "event": name, "data": data, "scope": scope}
+                for eid, name, data, scope in self.entries if eid > event_id
+            ]
+
+
+class ResumeManager:
+    """Issues resume tokens and keeps the journal of missed broadcasts"""
+
+    def __init__(self, grace_seconds: float, journal_size: int = 500):
+        self.grace_seconds = grace_seconds
+        self.journal = EventJournal(journal_size)
+        self.tokens: Dict[str, str] = {}
+        self.lock = threading.Lock()
+        self.resumed = 0
+        self.expired = 0
+
+    def issue(self, player_id: str) -> str:
+        """Create a resume token for a player, replacing any previous one"""
+        token = secrets.token_urlsafe(24)
+        with self.lock:
+            self.tokens = {t: p for t, p in self.tokens.items() if p != player_id}
+            self.tokens[token] = player_id
+        return token
+
+    def lookup(self, token: Optional[str]) -> Optional[str]:
+        """Player id for a resume token"""
+        if not token:
+            return None
+        return self.tokens.get(token)
+
+    def revoke(self, player_id: str):
+        """Invalidate a player's tokens"""
+        with self.lock:
+            self.tokens = {t: p for t, p in self.tokens.items() if p != player_id}
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "grace_seconds": self.grace_seconds,
+            "active_tokens": len(self.tokens),
+            "journal_last_id": self.journal.last_id,
+            "journal_size": len(self.journal.entries),
+            "resumed": self.resumed,
+            "expired": self.expired
+        }
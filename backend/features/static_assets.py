@@ -0,0 +1,114 @@
+"""
+Static Assets - Fingerprinted, precompressed player_web files
+
+At startup every file under the static folder is read once, named by its
+content hash (`js/main.js` -> `js/main.3f2a9c1b04de.js`) and compressed to
+gzip (and brotli, if installed). Fingerprinted URLs never change content, so
+they are served with immutable year-long caching; templates reference them
+through `asset_url()`.
+"""
+
+import gzip
+import hashlib
+import mimetypes
+import os
+from typing import Dict, Any, Optional
+
+from flask import Response, url_for
+
+try:
+    import brotli
+except ImportError:  # optional dependency
+    brotli = None
+
+
+IMMUTABLE = "public, max-age=31536000, immutable"
+COMPRESSIBLE = (".js", ".css", ".html", ".svg", ".json", ".txt", ".map")
+
+
+class Asset:
+    """One static file with its fingerprint and encoded variants"""
+
+    __slots__ = ("path", "digest", "mimetype", "variants")
+
+    def __init__(self, path: str, body: bytes):
+        self.path = path
+        self.digest = hashlib.sha256(body).hexdigest()[:12]
+        self.mimetype = mimetypes.guess_type(path)[0] or "application/octet-stream"
+        self.variants: Dict[str, bytes] = {"identity": body}
+        if path.endswith(COMPRESSIBLE):
+            self.add_variant("gzip", gzip.compress(body, compresslevel=9, mtime=0))
+            if brotli is not None:
+                self.add_variant("br", brotli.compress(body, quality=11))
+
+    def add_variant(self, encoding: str, data: bytes):
+        """Keep a compressed variant only if it is actually smaller"""
+        if len(data) < len(self.variants["identity"]):
+            self.variants[encoding] = data
+
+    @property
+    def fingerprinted_path(self) -> str:
+        stem, ext = os.path.splitext(self.path)
+        return f"{stem}.{self.digest}{ext}"
+
+
+class StaticAssets:
+    """Manifest of fingerprinted static files served from memory"""
+
+    def __init__(self, static_dir: str):
+        self.static_dir = static_dir
+        self.by_source: Dict[str, Asset] = {}
+        self.by_fingerprint: Dict[str, Asset] = {}
+        self.build()
+
+    def build(self):
+        """Hash and precompress every file under the static folder"""
+        by_source = {}
+        for root, _, files in os.walk(self.static_dir):
+            for filename in files:
+                full_path = os.path.join(root, filename)
+                rel_path = os.path.relpath(full_path, self.static_dir).replace(os.sep, "/")
+                with open(full_path, "rb") as f:
+                    by_source[rel_path] = Asset(rel_path, f.read())
+        self.by_source = by_source
+        self.by_fingerprint = {a.fingerprinted_path: a for a in by_source.values()}
+
+    def url(self, filename: str) -> str:
+        """URL for a static file, fingerprinted when it is in the manifest"""
+        asset = self.by_source.get(filename)
+        if asset is None:
+            return url_for("static", filename=filename)
+        return url_for("fingerprinted_asset", filename=asset.fingerprinted_path)
+
+    def response(self, filename: str, request) -> Optional[Response]:
+        """Serve a fingerprinted file in the best accepted encoding, or None"""
+        asset = self.by_fingerprint.get(filename)
+        if asset is None:
+            return None
+
+        encoding = "identity"
+        for candidate in ("br", "gzip"):
+            if candidate in asset.variants and request.accept_encodings[candidate] > 0:
+                encoding = candidate
+                break
+
+        etag = f"{asset.digest}-{encoding}"
+        headers = {"Cache-Control": IMMUTABLE, "Vary": "Accept-Encoding"}
+        if request.if_none_match.contains(etag):
+            response = Response(status=304, headers=headers)
+        else:
+            response = Response(asset.variants[encoding], mimetype=asset.mimetype, headers=headers)
+            if encoding != "identity":
+                response.headers["Content-Encoding"] = encoding
+        response.set_etag(etag)
+        return response
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get manifest and compressed sizes per file"""
+        return {
+            path: {
+                "url": asset.fingerprinted_path,
+                "bytes": {enc: len(data) for enc, data in asset.variants.items()}
+            }
+            for path, asset in self.by_source.items()
+        }
@@ -0,0 +1,174 @@
+"""
+Structured Logging - Non-blocking, sampled JSON-line event logs
+
+Handlers log through an EventLogger instead of print(). A record is only
+built if the event's level is enabled and its sampling budget allows it;
+it is then put on an in-memory queue and returned immediately. A background
+QueueListener thread does all formatting and stdout I/O, so handlers never
+wait on logging.
+
+- Per-event levels: `EVENT_LOG_LEVELS="move_character=DEBUG,chat_message=INFO"`
+- Sampling: `LOG_SAMPLE_PER_SECOND="move_character=2"` keeps at most that many
+  records per second for an event; the next kept record reports how many
+  were suppressed
+- Output: one JSON object per line (`LOG_FORMAT=json`) or plain text
+"""
+
+import atexit
+import json
+import logging
+import logging.handlers
+import queue
+import sys
+import threading
+import time
+from typing import Dict, Optional
+
+from config import Config
+
+
+ROOT_LOGGER = "rpg"
+
+_listener: Optional[logging.handlers.QueueListener] = None
+_setup_lock = threading.Lock()
+
+
+def parse_levels(spec: str) -> Dict[str, int]:
+    """Parse `event=LEVEL,...` into {event: logging level}
+    
+    Raises ValueError on an unknown level name.
+    """
+    levels = {}
+    for part in spec.split(","):
+        event_name, _, level = part.strip().partition("=")
+        if event_name and level:
+            number = logging.getLevelName(level.strip().upper())
+            if not isinstance(number, int):
+                raise ValueError(f"Unknown log level {level.strip()!r} for event {event_name!r}")
+            levels[event_name] = number
+    return levels
+
+
+def parse_rates(spec: str) -> Dict[str, float]:
+    """Parse `event=per_second,...` into {event: per_second}"""
+    rates = {}
+    for part in spec.split(","):
+        event_name, _, rate = part.strip().partition("=")
+        if event_name and rate:
+            rates[event_name] = float(rate)
+    return rates
+
+
+class JsonLineFormatter(logging.Formatter):
+    """Formats a record as one JSON object per line"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": round(record.created, 6),
+            "level": record.levelname,
+            "logger": record.name,
+            "event": getattr(record, "event", None),
+            "msg": record.getMessage(),
+        }
+        entry.update(getattr(record, "fields", {}))
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    """Human-readable fallback in the style of the old [EVENT] prints"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        fields = getattr(record, "fields", {})
+        extra = " ".join(f"{k}={v}" for k, v in fields.items())
+        tag = (getattr(record, "event", None) or record.name).upper()
+        line = f"[{tag}] {record.getMessage()}"
+        return f"{line} {extra}" if extra else line
+
+
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that leaves formatting to the listener thread"""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+class _Sampler:
+    """Per-event fixed-window sampler (at most N records per second)"""
+
+    __slots__ = ("limit", "window_start", "count", "suppressed")
+
+    def __init__(self, limit: float):
+        self.limit = limit
+        self.window_start = 0.0
+        self.count = 0
+        self.suppressed = 0
+
+    def admit(self, now: float) -> Optional[int]:
+        """Returns suppressed count to report if admitted, else None"""
+        if now - self.window_start >= 1.0:
+            self.window_start = now
+            self.count = 0
+        if self.count >= self.limit:
+            self.suppressed += 1
+            return None
+        self.count += 1
+        suppressed, self.suppressed = self.suppressed, 0
+        return suppressed
+
+
+class EventLogger:
+    """Logger with per-event levels and sampling for hot paths"""
+
+    def __init__(self, name: str):
+        self.logger = logging.getLogger(f"{ROOT_LOGGER}.{name}")
+        self.levels = parse_levels(Config.EVENT_LOG_LEVELS)
+        self.samplers = {e: _Sampler(r) for e, r in parse_rates(Config.LOG_SAMPLE_PER_SECOND).items()}
+
+    def event(self, event_name: str, message: str, level: int = logging.INFO, **fields):
+        """Log a structured event record (cheap no-op when filtered out)"""
+        level = self.levels.get(event_name, level)
+        if not self.logger.isEnabledFor(level):
+            return
+        sampler = self.samplers.get(event_name)
+        if sampler is not None:
+            suppressed = sampler.admit(time.monotonic())
+            if suppressed is None:
+                return
+            if suppressed:
+                fields["suppressed"] = suppressed
+        self.logger.log(level, message, extra={"event": event_name, "fields": fields})
+
+    def error(self, event_name: str, message: str, **fields):
+        self.event(event_name, message, logging.ERROR, **fields)
+
+    def warning(self, event_name: str, message: str, **fields):
+        self.event(event_name, message, logging.WARNING, **fields)
+
+
+def setup_logging():
+    """Route the rpg logger through a queue to a background writer (idempotent)"""
+    global _listener
+    with _setup_lock:
+        if _listener is not None:
+            return
+
+        stream = logging.StreamHandler(sys.stdout)
+        stream.setFormatter(JsonLineFormatter() if Config.LOG_FORMAT == "json" else TextFormatter())
+
+        log_queue = queue.SimpleQueue()
+        root = logging.getLogger(ROOT_LOGGER)
+        root.setLevel(logging.getLevelName(Config.LOG_LEVEL.upper()))
+        root.addHandler(DeferredQueueHandler(log_queue))
+        root.propagate = False
+
+        _listener = logging.handlers.QueueListener(log_queue, stream, respect_handler_level=False)
+        _listener.start()
+        atexit.register(_listener.stop)
+
+
+def get_logger(name: str) -> EventLogger:
+    """Get an EventLogger, configuring the queue pipeline on first use"""
+    setup_logging()
+    return EventLogger(name)
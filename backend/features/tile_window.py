@@ -0,0 +1,123 @@
+"""
+Tile Window - Compact encoding of rectangular parts of a map
+
+A window is encoded as a palette of distinct `[tile_type, obstacle]` pairs
+plus one run-length row per y: `[palette_index, run_length, ...]`. Open maps
+compress to a handful of numbers per row instead of one dict per tile.
+Tiles a viewer cannot see (fog of war) are runs of palette index -1.
+
+Windows are half-open (`x0 <= x < x1`, `y0 <= y < y1`) and clamped to the
+board. Each intersecting chunk (CHUNK_SIZE x CHUNK_SIZE tiles) reports its
+last-edit revision so clients can cache per chunk; the window's ETag is built
+from the highest of those revisions.
+"""
+
+from typing import Dict, Any, List, Optional, Tuple
+
+import numpy as np
+
+from features.gameboard import CHUNK_SIZE
+
+
+Window = Tuple[int, int, int, int]
+
+
+def clamp_window(board, x0: int, y0: int, x1: int, y1: int) -> Optional[Window]:
+    """Clip a window to the board; None if nothing is left"""
+    x0, y0 = max(x0, 0), max(y0, 0)
+    x1, y1 = min(x1, board.width), min(y1, board.height)
+    if x0 >= x1 or y0 >= y1:
+        return None
+    return x0, y0, x1, y1
+
+
+def chunks_in_window(window: Window) -> List[Tuple[int, int]]:
+    """Chunk coordinates intersecting a window"""
+    x0, y0, x1, y1 = window
+    return [
+        (cx, cy)
+        for cy in range(y0 // CHUNK_SIZE, (y1 - 1) // CHUNK_SIZE + 1)
+        for cx in range(x0 // CHUNK_SIZE, (x1 - 1) // CHUNK_SIZE + 1)
+    ]
+
+
+def chunk_window(board, cx: int, cy: int) -> Optional[Window]:
+    """Board window covered by one chunk"""
+    return clamp_window(board, cx * CHUNK_SIZE, cy * CHUNK_SIZE,
+                        (cx + 1) * CHUNK_SIZE, (cy + 1) * CHUNK_SIZE)
+
+
+def window_etag(board, window: Window) -> str:
+    """Validator that changes whenever a tile inside the window changes"""
+    revision = max(board.chunk_revision(cx, cy) for cx, cy in chunks_in_window(window))
+    x0, y0, x1, y1 = window
+    return f"{board.board_id}-{revision}-{x0}.{y0}.{x1}.{y1}"
+
+
+def encode_window(board, window: Window, visible: Optional[np.ndarray] = None) -> Dict[str, Any]:
+    """Encode the tiles of a (clamped) window as palette + run-length rows
+
+    With a window-shaped `visible` mask, hidden tiles are sent as palette
+    index -1 and the window carries no chunk revisions (it is partial).
+    """
+    x0, y0, x1, y1 = window
+    palette: List[List[Any]] = []
+    palette_index: Dict[Tuple[str, bool], int] = {}
+    rows = []
+    objects = []
+    tiles = board.tiles
+
+    for y in range(y0, y1):
+        row = []
+        run_value, run_length = -1, 0
+        for x in range(x0, x1):
+            tile = tiles[(x, y)]
+            if visible is not None and not visible[y - y0, x - x0]:
+                index = -1
+            else:
+                key = (tile.tile_type, tile.obstacle)
+                index = palette_index.get(key)
+                if index is None:
+                    index = palette_index[key] = len(palette)
+                    palette.append([tile.tile_type, tile.obstacle])
+                if tile.objects:
+                    objects.append({"x": x, "y": y, "objects": tile.objects})
+            if index == run_value:
+                run_length += 1
+            else:
+                if run_length:
+                    row += (run_value, run_length)
+                run_value, run_length = index, 1
+        row += (run_value, run_length)
+        rows.append(row)
+
+    return {
+        "map_name": board.name,
+        "x0": x0, "y0": y0, "x1": x1, "y1": y1,
+        "palette": palette,
+        "rows": rows,
+        "objects": objects,
+        "chunk_size": CHUNK_SIZE,
+        "chunks": [] if visible is not None else [
+            {"cx": cx, "cy": cy, "rev": board.chunk_revision(cx, cy)}
+            for cx, cy in chunks_in_window(window)
+        ],
+        "etag": window_etag(board, window)
+    }
+
+
+def decode_rows(window: Dict[str, Any]) -> Dict[Tuple[int, int], Tuple[str, bool]]:
+    """Expand an encoded window back to {(x, y): (tile_type, obstacle)}, skipping hidden tiles"""
+    palette = window["palette"]
+    tiles = {}
+    for dy, row in enumerate(window["rows"]):
+        x = window["x0"]
+        for i in range(0, len(row), 2):
+            if row[i] < 0:
+                x += row[i + 1]
+                continue
+            tile_type, obstacle = palette[row[i]]
+            for _ in range(row[i + 1]):
+                tiles[(x, window["y0"] + dy)] = (tile_type, obstacle)
+                x += 1
+    return tiles
@@ -4,13 +4,41 @@ WebSocket Event Handlers - Real-time communication handlers for all game events
 Handles incoming Socket.IO events and broadcasts state changes to connected clients.
 """
 
+import re
+import math
 import uuid
 import time
-from typing import Dict, Any, Optional
-from flask_socketio import emit, join_room, leave_room
+import secrets
+import functools
+from typing import Dict, Any, Callable, List, Optional
+from flask import request
+from flask_socketio import emit, join_room
+from config import Config
+from features.broadcast_tick import MovementCoalescer
+from features.interest import InterestManager
+from features import wire_codec
+from features.outbound import OutboundQueueManager
+from features.rate_limit import RateLimiter, parse_limits
+from features.session_resume import ResumeManager
+from features.structured_log import get_logger
+from features.metrics import metrics, meter_sends, gauge_lines
+from features.profiling import HandlerProfiler
+from features.map_stream import MapStreamer, chunk_grid
+from features.tile_window import chunks_in_window, encode_window
+from features.gameboard import CHUNK_SIZE
 from features.game_state import game_state_manager, GameState
 from features.characters import CharacterManager
-from features.gameboard import GameboardManager
+from features.dice import DiceError
+from features import aoe
+from features.movement import ReachabilityCache
+from features.npc_sim import NPCScheduler, BEHAVIOURS
+from features import mapgen
+from features.lighting import LEVELS as LIGHT_LEVELS, FEET_PER_TILE as LIGHT_FEET_PER_TILE
+from features.gameboard import Gameboard, GameboardManager
+
+log = get_logger("events")
+
+MAP_NAME = re.compile(r"^[\w-]{1,64}$")
 
 
 class WebSocketEventHandler:
@@ -19,54 +47,274 @@ class WebSocketEventHandler:
     def __init__(self, sio):
         """Initialize handlers with Socket.IO instance"""
         self.sio = sio
+        self.move_coalescer = None
+        if Config.BROADCAST_TICK_HZ > 0:
+            self.move_coalescer = MovementCoalescer(
+                sio, Config.BROADCAST_TICK_HZ,
+                flush=self.broadcast_positions
+            )
+        self.binary_sids = set()
+        self.connected_sids = set()
+        self.outbound = None
+        if Config.OUTBOUND_QUEUES_ENABLED:
+            self.outbound = OutboundQueueManager(
+                sio,
+                send=self.send_to_sid,
+                backlog=self.transport_backlog,
+                disconnect=self.disconnect_client,
+                max_depth=Config.OUTBOUND_QUEUE_MAX,
+                transport_window=Config.OUTBOUND_TRANSPORT_WINDOW
+            )
+        self.interest = None
+        if Config.AOI_ENABLED or Config.VIEWPORTS_ENABLED:
+            self.interest = InterestManager(Config.AOI_CELL_SIZE, Config.AOI_RADIUS_CELLS,
+                                            track_tokens=Config.AOI_ENABLED)
+        self.rate_limiter = None
+        if Config.RATE_LIMIT_ENABLED:
+            self.rate_limiter = RateLimiter(
+                parse_limits(Config.RATE_LIMITS),
+                parse_limits(Config.GAME_RATE_LIMITS)
+            )
+        self.resume = None
+        self.superseded_sids = set()
+        if Config.SESSION_GRACE_SECONDS > 0:
+            self.resume = ResumeManager(Config.SESSION_GRACE_SECONDS, Config.RESUME_JOURNAL_SIZE)
+        if Config.METRICS_ENABLED:
+            self.install_metrics()
+        self.map_streamer = None
+        if Config.MAP_STREAM_ENABLED:
+            self.map_streamer = MapStreamer(
+                sio,
+                send=lambda sid, event_name, data: self.emit_to_sids(event_name, data, [sid]),
+                chunks_per_tick=Config.MAP_STREAM_CHUNKS_PER_TICK,
+                tick_seconds=Config.MAP_STREAM_TICK_SECONDS
+            )
+        self.reach_cache = ReachabilityCache()
+        self.map_generator = mapgen.MapGenerator(Config.MAPGEN_WORKERS)
+        self.npc_scheduler = None
+        if Config.NPC_TICK_HZ > 0:
+            self.npc_scheduler = NPCScheduler(
+                sio, Config.NPC_TICK_HZ,
+                get_pool=lambda: game_state_manager.npcs,
+                get_board=lambda: game_state_manager.gameboard and game_state_manager.gameboard.board,
+                get_players=lambda: [p.position for p in game_state_manager.get_all_players() if not p.is_gm],
+                flush=self.broadcast_npcs,
+                get_occupancy=lambda: game_state_manager.occupancy
+            )
+        self.profiler = HandlerProfiler(sio, Config.PROFILE_DIR)
+        self.profiler.configure(sample_rate=Config.PROFILE_SAMPLE_RATE, slow_ms=Config.PROFILE_SLOW_MS)
         self.register_handlers()
     
+    def get_handlers(self) -> Dict[str, Callable]:
+        """Map Socket.IO event names to handler methods"""
+        return {
+            # Connection events
+            "connect": self.on_connect,
+            "disconnect": self.on_disconnect,
+            "player_join": self.on_player_join,
+            "resume_session": self.on_resume_session,
+            
+            # Movement events
+            "move_character": self.on_move_character,
+            "set_viewport": self.on_set_viewport,
+            
+            # Chat events
+            "chat_message": self.on_chat_message,
+            
+            # Combat events
+            "request_combat": self.on_request_combat,
+            "end_combat": self.on_end_combat,
+            "next_turn": self.on_next_turn,
+            "roll_dice": self.on_roll_dice,
+            "request_dice_log": self.on_request_dice_log,
+            "preview_aoe": self.on_preview_aoe,
+            "request_reach": self.on_request_reach,
+            
+            # NPC events (GM only)
+            "spawn_npc": self.on_spawn_npc,
+            "despawn_npc": self.on_despawn_npc,
+            
+            # Gameboard events
+            "load_map": self.on_load_map,
+            "generate_map": self.on_generate_map,
+            "modify_map": self.on_modify_map,
+            "place_light": self.on_place_light,
+            "remove_light": self.on_remove_light,
+            "set_lighting": self.on_set_lighting,
+            "request_game_state": self.on_request_game_state,
+            
+            # Debug/utility
+            "echo": self.on_echo,
+        }
+    
     def register_handlers(self):
-        """Register all Socket.IO event handlers"""
-        # Connection events
-        self.sio.on("connect")(self.on_connect)
-        self.sio.on("disconnect")(self.on_disconnect)
-        self.sio.on("player_join")(self.on_player_join)
-        
-        # Movement events
-        self.sio.on("move_character")(self.on_move_character)
-        
-        # Chat events
-        self.sio.on("chat_message")(self.on_chat_message)
-        
-        # Combat events
-        self.sio.on("request_combat")(self.on_request_combat)
-        self.sio.on("end_combat")(self.on_end_combat)
-        self.sio.on("next_turn")(self.on_next_turn)
+        """Register all Socket.IO event handlers (kept in `dispatchers` as registered)"""
+        self.dispatchers: Dict[str, Callable] = {}
+        for event_name, handler in self.get_handlers().items():
+            handler = self.wrap_handler(event_name, handler)
+            self.dispatchers[event_name] = self.profiler.instrument(event_name, handler)
+            self.sio.on(event_name)(self.dispatchers[event_name])
+    
+    def wrap_handler(self, event_name: str, handler: Callable) -> Callable:
+        """Apply cross-cutting concerns (rate limiting, metrics) to a handler"""
+        if self.rate_limiter and self.rate_limiter.is_limited(event_name):
+            handler = self.rate_limited(event_name, handler, self.get_throttle_handlers().get(event_name))
+        if Config.METRICS_ENABLED:
+            handler = self.metered(event_name, handler)
+        return handler
+    
+    def get_throttle_handlers(self) -> Dict[str, Callable]:
+        """Map event names to what answers a throttled call, when not `rate_limited`"""
+        return {
+            "move_character": self.on_move_throttled
+        }
+    
+    def rate_limited(self, event_name: str, handler: Callable,
+                     on_throttled: Optional[Callable] = None) -> Callable:
+        """Throttle a handler with the per-client and per-game token buckets
         
-        # Gameboard events
-        self.sio.on("load_map")(self.on_load_map)
-        self.sio.on("request_game_state")(self.on_request_game_state)
+        A throttled call is answered by `on_throttled(data, retry_after)`, by
+        default a `rate_limited` reply to the sender.
+        """
+        @functools.wraps(handler)
+        def limited(*args):
+            retry_after = self.rate_limiter.check(self.current_sid(), event_name)
+            if retry_after is None:
+                return handler(*args)
+            if on_throttled:
+                on_throttled(args[0] if args and isinstance(args[0], dict) else {}, retry_after)
+            else:
+                self.reply("rate_limited", {"event": event_name, "retry_after": retry_after})
+        return limited
+    
+    def metered(self, event_name: str, handler: Callable) -> Callable:
+        """Count a handler's calls, errors and latency"""
+        calls = metrics.event_calls
+        errors = metrics.event_errors
+        latency = metrics.event_latency
         
-        # Debug/utility
-        self.sio.on("echo")(self.on_echo)
+        @functools.wraps(handler)
+        def timed(*args):
+            start = time.perf_counter()
+            try:
+                return handler(*args)
+            except Exception:
+                errors.inc(event_name)
+                raise
+            finally:
+                calls.inc(event_name)
+                latency.observe(time.perf_counter() - start, event_name)
+        return timed
+    
+    def install_metrics(self):
+        """Meter sent packets on the server and export live gauges"""
+        meter_sends(self.sio.server)
+        metrics.add_collector("events", self.metrics_gauges)
+    
+    def metrics_gauges(self) -> List[str]:
+        """Scrape-time gauges for connections and queues"""
+        lines = gauge_lines("rpg_connected_clients", "Connected Socket.IO clients",
+                            {"": len(self.connected_sids)})
+        lines += gauge_lines("rpg_players", "Players in the game",
+                             {"": len(game_state_manager.players)})
+        if self.rate_limiter:
+            lines += gauge_lines("rpg_events_throttled_total", "Events rejected by rate limits",
+                                 self.rate_limiter.get_stats()["throttled"], label="event",
+                                 metric_type="counter")
+        if self.outbound:
+            stats = self.outbound.get_stats()
+            lines += gauge_lines("rpg_outbound_queued", "Messages waiting in outbound queues",
+                                 {"": stats["total_depth"]})
+        return lines
+    
+    # ========== Transport Hooks ==========
+    
+    def current_sid(self) -> str:
+        """Socket.IO sid of the client whose event is being handled"""
+        return request.sid
+    
+    def reply(self, event_name: str, data: Dict[str, Any]):
+        """Emit event back to the client whose event is being handled"""
+        emit(event_name, data)
+    
+    def join_player_room(self, room: str):
+        """Add the current client to a room"""
+        join_room(room)
+    
+    def disconnect_client(self, sid: str):
+        """Forcibly disconnect a client"""
+        self.sio.server.disconnect(sid)
+    
+    def transport_backlog(self, sid: str) -> int:
+        """Packets written to a client's transport but not yet sent"""
+        server = self.sio.server
+        eio_sid = server.manager.eio_sid_from_sid(sid, "/")
+        socket = server.eio.sockets.get(eio_sid) if eio_sid else None
+        return socket.queue.qsize() if socket else 0
     
     # ========== Connection Events ==========
     
-    def on_connect(self, sid=None):
+    def on_connect(self, auth=None):
         """Handle client connection"""
-        print(f"[CONNECT] Client {sid} connected")
-        emit("response", {
+        sid = self.current_sid()
+        log.event("connect", "Client connected", sid=sid)
+        self.connected_sids.add(sid)
+        
+        codec = wire_codec.negotiate(auth)
+        if codec == wire_codec.MSGPACK:
+            self.binary_sids.add(sid)
+            self.join_player_room(wire_codec.MSGPACK_ROOM)
+        
+        self.reply("response", {
             "status": "connected",
             "message": f"Connected to server. SID: {sid}",
+            "codec": codec,
             "timestamp": time.time()
         })
     
-    def on_disconnect(self, sid=None):
+    def on_disconnect(self):
         """Handle client disconnection"""
-        print(f"[DISCONNECT] Client {sid} disconnected")
+        sid = self.current_sid()
+        log.event("disconnect", "Client disconnected", sid=sid)
+        
+        self.connected_sids.discard(sid)
+        self.binary_sids.discard(sid)
+        if self.outbound:
+            self.outbound.remove(sid)
+        if self.rate_limiter:
+            self.rate_limiter.remove(sid)
+        if self.interest:
+            self.interest.remove(sid)
+        if self.map_streamer:
+            self.map_streamer.cancel(sid)
+        
+        # The session already moved to a newer socket (resumed before this drop was noticed)
+        if sid in self.superseded_sids:
+            self.superseded_sids.discard(sid)
+            return
+        
+        player = game_state_manager.get_player_by_sid(sid)
+        
+        # Keep resumable sessions through the grace period, silently
+        if player and self.resume:
+            player.sid = None
+            player.disconnected_at = time.time()
+            player.resume_from = self.resume.journal.last_id
+            self.sio.start_background_task(self.expire_session, player.player_id, player.disconnected_at)
+            return
         
         # Remove player from game state
-        game_state_manager.remove_player(sid)
+        player_id = player.player_id if player else sid
+        game_state_manager.remove_player(player_id)
+        if self.rate_limiter:
+            self.rate_limiter.forget(player_id)
+        self.reach_cache.invalidate(player_id)
+        self.verify_occupancy("disconnect")
+        self.drop_token_lights(player_id)
         
         # Broadcast player left event
         self.broadcast_event("player_left", {
-            "player_id": sid,
+            "player_id": player_id,
             "timestamp": time.time()
         })
     
@@ -76,23 +324,48 @@ class WebSocketEventHandler:
         character_id = data.get("character_id")
         character_name = data.get("character_name", "Unknown")
         is_gm = data.get("is_gm", False)
+        is_spectator = data.get("is_spectator", False)
+        sid = self.current_sid()
         
-        print(f"[PLAYER_JOIN] {character_name} ({player_id}) joining as {'GM' if is_gm else 'Player'}")
+        log.event("player_join", "Player joining", player_id=player_id,
+                  character_name=character_name, is_gm=is_gm)
         
         # Add to game state
         player = game_state_manager.add_player(
             player_id=player_id,
             character_id=character_id,
             character_name=character_name,
-            is_gm=is_gm
+            is_gm=is_gm,
+            sid=sid
         )
+        player.is_spectator = bool(is_spectator)
+        try:
+            player.darkvision = int(min(max(float(data.get("darkvision") or 0), 0), Config.VISION_FEET))
+        except (TypeError, ValueError):
+            player.darkvision = 0
+        
+        # Address the player by player_id for targeted emits
+        self.join_player_room(player_id)
+        if self.rate_limiter:
+            self.rate_limiter.bind(sid, player_id)
+        
+        if self.interest:
+            self.interest.update(sid, player.position["x"], player.position["y"])
+            self.interest.set_override(sid, is_gm or is_spectator)
         
         # Emit confirmation to joining player
-        emit("player_joined", {
+        confirmation = {
             "player_id": player_id,
             "character_name": character_name,
             "timestamp": time.time()
-        })
+        }
+        if is_gm:
+            player.gm_token = secrets.token_urlsafe(24)
+            confirmation["gm_token"] = player.gm_token
+        if self.resume:
+            confirmation["resume_token"] = self.resume.issue(player_id)
+            confirmation["last_event_id"] = self.resume.journal.last_id
+        self.reply("player_joined", confirmation)
         
         # Broadcast to all others
         self.broadcast_event("player_joined", {
@@ -100,26 +373,156 @@ class WebSocketEventHandler:
             "character_name": character_name,
             "position": player.position,
             "timestamp": time.time()
-        }, exclude=player_id)
+        }, exclude=sid)
         
         # Send current game state to new player
         self.send_current_game_state(player_id)
+        
+        # Stream the loaded map, starting around the player's token
+        self.send_map(sid, player)
+    
+    def on_resume_session(self, data):
+        """Rebind a reconnecting client to its session and replay missed broadcasts
+        
+        Replay starts after `last_event_id`, the newest broadcast the client
+        saw. Without it, only a drop the server has already noticed tells
+        where the client stopped; otherwise the client gets a snapshot.
+        """
+        player_id = self.resume.lookup(data.get("resume_token")) if self.resume else None
+        player = game_state_manager.get_player(player_id) if player_id else None
+        if not player:
+            self.reply("resume_failed", {"message": "Session expired or unknown"})
+            return
+        
+        sid = self.current_sid()
+        old_sid = player.sid
+        if old_sid and old_sid != sid:
+            # The old socket's disconnect has not arrived yet; make it a no-op when it does
+            self.superseded_sids.add(old_sid)
+            self.connected_sids.discard(old_sid)
+            self.binary_sids.discard(old_sid)
+            if self.interest:
+                self.interest.remove(old_sid)
+            if self.map_streamer:
+                self.map_streamer.cancel(old_sid)
+        try:
+            last_seen = int(data["last_event_id"])
+        except (KeyError, TypeError, ValueError):
+            last_seen = None
+        if last_seen is None or not 0 <= last_seen <= self.resume.journal.last_id:
+            last_seen = player.resume_from if old_sid is None else None
+        player.sid = sid
+        player.disconnected_at = None
+        player.update_activity()
+        self.join_player_room(player_id)
+        if self.rate_limiter:
+            self.rate_limiter.bind(sid, player_id)
+        if self.interest:
+            self.interest.update(sid, player.position["x"], player.position["y"])
+            self.interest.set_override(sid, player.is_gm or player.is_spectator)
+        
+        missed = self.resume.journal.since(last_seen) if last_seen is not None else None
+        if missed is not None:
+            missed = self.replay_for(player, missed)
+        self.resume.resumed += 1
+        log.event("resume_session", "Session resumed", player_id=player_id,
+                  missed_events=None if missed is None else len(missed))
+        
+        response = {
+            "player_id": player_id,
+            "character_name": player.character_name,
+            "position": player.position,
+            "missed_events": missed,
+            "last_event_id": self.resume.journal.last_id,
+            "timestamp": time.time()
+        }
+        if missed is None:
+            # Journal no longer covers the gap; fall back to a snapshot
+            response["state"] = game_state_manager.get_public_state(self.player_vision(player))
+        self.reply("session_resumed", response)
+        
+        # The stream was cancelled with the old socket; send the map again from the token out
+        self.send_map(sid, player)
+    
+    def replay_for(self, player, missed: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Journaled events as a resumed session would have been sent them
+        
+        Applies the area-of-interest and fog-of-war filters of the original
+        broadcast against the session's current view, and drops its own
+        excluded echoes.
+        """
+        sid = player.sid
+        filtering = self.interest and self.interest.filtering()
+        fog = self.fog_viewers()
+        vision = fog.get(sid) if fog else None
+        lighting = game_state_manager.lighting
+        
+        def sees(pos):
+            if filtering and not self.interest.sees(sid, pos["x"], pos["y"]):
+                return False
+            return vision is None or lighting.can_see(vision, pos["x"], pos["y"])
+        
+        events = []
+        for entry in missed:
+            scope, data = entry["scope"], entry["data"]
+            if scope.get("exclude") == player.player_id:
+                continue
+            if "origins" in scope and not any(sees(pos) for pos in scope["origins"]):
+                continue
+            if "items" in scope:
+                key = scope["items"]
+                data = {**data, key: [item for item in data[key] if sees(item["position"])]}
+                if not data[key]:
+                    continue
+            if "sight_tiles" in scope and vision is not None:
+                data = {**data, "tiles": [t for t in data["tiles"] if lighting.in_sight(vision, t[0], t[1])]}
+                if not data["tiles"]:
+                    continue
+            events.append({"event_id": entry["event_id"], "event": entry["event"], "data": data})
+        return events
+    
+    def expire_session(self, player_id: str, disconnected_at: float):
+        """Remove a session that was not resumed within the grace period"""
+        self.sio.sleep(self.resume.grace_seconds)
+        player = game_state_manager.get_player(player_id)
+        if not player or player.sid is not None or player.disconnected_at != disconnected_at:
+            return
+        
+        log.event("session_expired", "Session expired", player_id=player_id)
+        game_state_manager.remove_player(player_id)
+        if self.rate_limiter:
+            self.rate_limiter.forget(player_id)
+        self.reach_cache.invalidate(player_id)
+        self.verify_occupancy("session_expired")
+        self.drop_token_lights(player_id)
+        self.resume.revoke(player_id)
+        self.resume.expired += 1
+        self.broadcast_event("player_left", {
+            "player_id": player_id,
+            "timestamp": time.time()
+        })
     
     # ========== Movement Events ==========
     
     def on_move_character(self, data):
-        """Handle player character movement"""
+        """Handle player character movement
+        
+        Moves carrying a client `seq` are acked to the sender only (with the
+        authoritative position) and the broadcast skips the mover, so clients
+        can move optimistically and reconcile on the ack.
+        """
         player_id = data.get("player_id")
         x = data.get("x")
         y = data.get("y")
+        seq = data.get("seq")
         
-        if player_id is None or x is None or y is None:
-            emit("error", {"message": "Invalid movement data"})
+        if player_id is None or not all(isinstance(v, int) and not isinstance(v, bool) for v in (x, y)):
+            self.reject_move(seq, "Invalid movement data")
             return
         
         player = game_state_manager.get_player(player_id)
         if not player:
-            emit("error", {"message": "Player not found"})
+            self.reject_move(seq, "Player not found")
             return
         
         old_pos = player.position.copy()
@@ -127,23 +530,160 @@ class WebSocketEventHandler:
         # Validate move is within bounds
         if game_state_manager.gameboard:
             if x < 0 or y < 0 or x >= game_state_manager.gameboard.width or y >= game_state_manager.gameboard.height:
-                emit("error", {"message": "Move out of bounds"})
+                self.reject_move(seq, "Move out of bounds", player)
                 return
         
-        # Update position
-        game_state_manager.update_player_position(player_id, x, y)
+        # Update position (and the occupancy grid, which refuses shared tiles)
+        if not game_state_manager.update_player_position(player_id, x, y):
+            occupancy = game_state_manager.occupancy
+            log.event("move_character", "Move blocked", player_id=player_id,
+                      position={"x": x, "y": y}, occupant=occupancy.occupant(x, y) if occupancy else None)
+            self.reject_move(seq, "Tile is occupied", player)
+            return
+        self.reach_cache.invalidate(player_id)
+        self.verify_occupancy("move_character")
+        self.move_token_lights(player_id, x, y)
+        if not player.is_gm and self.fog_viewers() is not None:
+            self.send_fog_reveal(player)
+        if self.interest and player.sid:
+            self.interest.update(player.sid, x, y)
         
-        print(f"[MOVE] {player.character_name} moved from {old_pos} to {{'x': {x}, 'y': {y}}}")
+        log.event("move_character", "Character moved", player_id=player_id,
+                  old_position=old_pos, new_position={"x": x, "y": y})
         
-        # Broadcast to all players
+        exclude = None
+        if seq is not None:
+            player.last_move_seq = seq
+            self.reply("move_ack", {
+                "seq": seq,
+                "accepted": True,
+                "position": {"x": x, "y": y}
+            })
+            exclude = self.current_sid()
+        
+        # Coalesce into the next tick's positions_update when enabled
+        if self.move_coalescer:
+            self.move_coalescer.queue_move(player_id, player.character_name, {"x": x, "y": y}, exclude)
+            return
+        
+        # Broadcast to all players (minus a sequenced mover, who has the ack)
         self.broadcast_event("character_moved", {
             "player_id": player_id,
             "character_name": player.character_name,
             "old_position": old_pos,
             "new_position": {"x": x, "y": y},
             "timestamp": time.time()
+        }, exclude=exclude, origins=[old_pos, {"x": x, "y": y}])
+    
+    def verify_occupancy(self, source: str):
+        """Log any drift between the occupancy grid and token positions (OCCUPANCY_CHECKS)"""
+        if not Config.OCCUPANCY_CHECKS:
+            return
+        problems = game_state_manager.check_occupancy()
+        if problems:
+            log.error(source, "Occupancy grid out of sync", count=len(problems), problems=problems[:10])
+    
+    def on_move_throttled(self, data, retry_after: float):
+        """Answer a throttled move: the client predicted a sequenced one, so it
+        gets a rejected move_ack to snap back; others get `rate_limited`"""
+        if data.get("seq") is None:
+            self.reply("rate_limited", {"event": "move_character", "retry_after": retry_after})
+            return
+        player = game_state_manager.get_player(data.get("player_id"))
+        self.reply("move_ack", {
+            "seq": data["seq"],
+            "accepted": False,
+            "reason": "Rate limited",
+            "retry_after": retry_after,
+            "position": player.position if player else None
+        })
+    
+    def reject_move(self, seq, message: str, player=None):
+        """Reject a move: a move_ack for sequenced moves, else a plain error"""
+        if seq is None:
+            self.reply("error", {"message": message})
+            return
+        self.reply("move_ack", {
+            "seq": seq,
+            "accepted": False,
+            "reason": message,
+            "position": player.position if player else None
         })
     
+    def on_set_viewport(self, data):
+        """Subscribe the client to updates inside its visible rectangle
+        
+        Rectangles are half-open (`x0 <= x < x1`); sending no bounds clears the
+        viewport and falls back to the default filtering. The reply carries the
+        tokens, NPCs and chunk revisions now in view, since updates outside the
+        old viewport were never sent.
+        """
+        sid = self.current_sid()
+        if not self.interest:
+            self.reply("error", {"message": "Viewports are disabled"})
+            return
+        
+        if not data or data.get("x0") is None:
+            self.interest.clear_viewport(sid)
+            player = game_state_manager.get_player_by_sid(sid)
+            if player:
+                self.interest.update(sid, player.position["x"], player.position["y"])
+            board = game_state_manager.gameboard
+            view = (0, 0, board.width, board.height) if board else None
+            self.reply("viewport_set", {"viewport": None, **self.viewport_contents(sid, view)})
+            return
+        
+        try:
+            x0, y0, x1, y1 = (int(data[k]) for k in ("x0", "y0", "x1", "y1"))
+        except (KeyError, TypeError, ValueError):
+            self.reply("error", {"message": "Invalid viewport"})
+            return
+        board = game_state_manager.gameboard
+        if board:
+            x0, y0 = max(x0, 0), max(y0, 0)
+            x1, y1 = min(x1, board.width), min(y1, board.height)
+        if x0 >= x1 or y0 >= y1 or (x1 - x0) * (y1 - y0) > Config.TILE_WINDOW_MAX_TILES:
+            self.reply("error", {"message": "Invalid viewport"})
+            return
+        
+        self.interest.set_viewport(sid, (x0, y0, x1, y1))
+        if self.map_streamer:
+            self.map_streamer.refocus(sid, {"x": (x0 + x1) // 2, "y": (y0 + y1) // 2})
+        self.reply("viewport_set", {
+            "viewport": {"x0": x0, "y0": y0, "x1": x1, "y1": y1},
+            **self.viewport_contents(sid, (x0, y0, x1, y1))
+        })
+    
+    def viewport_contents(self, sid: str, rect) -> Dict[str, Any]:
+        """Player tokens, NPCs and map chunk revisions inside a rectangle, as the session may see them"""
+        if rect is None:
+            return {"tokens": [], "npcs": [], "chunks": []}
+        x0, y0, x1, y1 = rect
+        player = game_state_manager.get_player_by_sid(sid)
+        vision = self.player_vision(player) if player else None
+        lighting = game_state_manager.lighting
+        
+        def visible(pos):
+            return x0 <= pos["x"] < x1 and y0 <= pos["y"] < y1 and \
+                (vision is None or lighting.can_see(vision, pos["x"], pos["y"]))
+        
+        contents = {
+            "tokens": [
+                {"player_id": p.player_id, "character_name": p.character_name, "position": p.position}
+                for p in game_state_manager.get_all_players() if not p.is_gm and visible(p.position)
+            ],
+            "npcs": [npc for npc in game_state_manager.npcs.snapshot() if visible(npc["position"])],
+            "chunks": []
+        }
+        board_state = game_state_manager.gameboard
+        if board_state and board_state.board:
+            board = board_state.board
+            contents.update(map_name=board_state.map_name, chunk_size=CHUNK_SIZE, chunks=[
+                {"cx": cx, "cy": cy, "rev": board.chunk_revision(cx, cy)}
+                for cx, cy in chunks_in_window(rect)
+            ])
+        return contents
+    
     # ========== Chat Events ==========
     
     def on_chat_message(self, data):
@@ -159,7 +699,8 @@ class WebSocketEventHandler:
         if not player:
             return
         
-        print(f"[CHAT] {player.character_name}: {text}")
+        log.event("chat_message", "Chat message", player_id=player_id,
+                  channel=channel, length=len(text))
         
         # Broadcast to all players
         self.broadcast_event("chat_message", {
@@ -179,17 +720,18 @@ class WebSocketEventHandler:
         
         # Only GM can initiate combat (for now)
         if not initiator or not initiator.is_gm:
-            emit("error", {"message": "Only GM can initiate combat"})
+            self.reply("error", {"message": "Only GM can initiate combat"})
             return
         
         participants = data.get("participants", [])
         if not participants:
-            emit("error", {"message": "No participants provided"})
+            self.reply("error", {"message": "No participants provided"})
             return
         
         combat_id = f"combat_{uuid.uuid4().hex[:8]}"
         
-        print(f"[COMBAT_START] {combat_id} with {len(participants)} participants")
+        log.event("request_combat", "Combat started", combat_id=combat_id,
+                  participants=len(participants))
         
         # Start combat in game state
         game_state_manager.start_combat(combat_id, participants)
@@ -208,13 +750,14 @@ class WebSocketEventHandler:
         player = game_state_manager.get_player(player_id)
         
         if not player or not player.is_gm:
-            emit("error", {"message": "Only GM can end combat"})
+            self.reply("error", {"message": "Only GM can end combat"})
             return
         
         combat = game_state_manager.end_combat()
         
         if combat:
-            print(f"[COMBAT_END] {combat.combat_id} ended after {combat.round_number} rounds")
+            log.event("end_combat", "Combat ended", combat_id=combat.combat_id,
+                      rounds=combat.round_number)
             self.broadcast_event("combat_ended", {
                 "combat_id": combat.combat_id,
                 "total_rounds": combat.round_number,
@@ -227,18 +770,20 @@ class WebSocketEventHandler:
         player = game_state_manager.get_player(player_id)
         
         if not player or not player.is_gm:
-            emit("error", {"message": "Only GM can advance turn"})
+            self.reply("error", {"message": "Only GM can advance turn"})
             return
         
         combat = game_state_manager.combat
         if not combat:
-            emit("error", {"message": "No combat in progress"})
+            self.reply("error", {"message": "No combat in progress"})
             return
         
         old_turn = combat.current_turn
         game_state_manager.next_turn()
+        self.reach_cache.clear()
         
-        print(f"[TURN_ADVANCE] {old_turn} -> {combat.current_turn} (round {combat.round_number})")
+        log.event("next_turn", "Turn advanced", previous_turn=old_turn,
+                  current_turn=combat.current_turn, round=combat.round_number)
         
         self.broadcast_event("turn_advanced", {
             "current_turn": combat.current_turn,
@@ -246,6 +791,394 @@ class WebSocketEventHandler:
             "timestamp": time.time()
         })
     
+    def on_roll_dice(self, data):
+        """Roll a dice expression, optionally once per target, with the game's generator"""
+        player_id = data.get("player_id")
+        player = game_state_manager.get_player(player_id)
+        if not player:
+            self.reply("error", {"message": "Player not found"})
+            return
+        
+        targets = data.get("targets")
+        if targets is not None and (not isinstance(targets, list) or not targets):
+            self.reply("error", {"message": "targets must be a non-empty list"})
+            return
+        try:
+            count = len(targets) if targets is not None else int(data.get("count", 1))
+        except (TypeError, ValueError):
+            count = 0
+        if not 1 <= count <= Config.DICE_MAX_BATCH:
+            self.reply("error", {"message": f"Roll between 1 and {Config.DICE_MAX_BATCH} results"})
+            return
+        
+        try:
+            roll = game_state_manager.dice.roll(str(data.get("expression", "")), count)
+        except DiceError as e:
+            self.reply("error", {"message": str(e)})
+            return
+        if targets is not None:
+            for target, result in zip(targets, roll["results"]):
+                result["target"] = target
+        
+        private = bool(data.get("private")) and player.is_gm
+        log.event("roll_dice", "Dice rolled", player_id=player_id, expression=roll["expression"],
+                  count=count, seq=roll["seq"], private=private)
+        
+        payload = {
+            **roll,
+            "player_id": player_id,
+            "player_name": player.character_name,
+            "reason": str(data.get("reason", ""))[:100],
+            "private": private,
+            "timestamp": time.time()
+        }
+        if private:
+            self.reply("dice_rolled", payload)
+        else:
+            self.broadcast_event("dice_rolled", payload)
+    
+    def on_request_dice_log(self, data):
+        """Send the game's dice seed and roll log to a GM, for replaying disputed rolls"""
+        player = game_state_manager.get_player(data.get("player_id"))
+        if not player or not player.is_gm:
+            self.reply("error", {"message": "Only GM can view the dice log"})
+            return
+        self.reply("dice_log", game_state_manager.dice.audit_log())
+    
+    def on_preview_aoe(self, data):
+        """Resolve an area-of-effect template against the loaded map
+        
+        Replies with the affected tiles, covered tiles and tokens hit. A GM can
+        set `share` to show the template to everyone.
+        """
+        player = game_state_manager.get_player(data.get("player_id"))
+        if not player:
+            self.reply("error", {"message": "Player not found"})
+            return
+        board_state = game_state_manager.gameboard
+        if not board_state or not board_state.board:
+            self.reply("error", {"message": "No map loaded"})
+            return
+        
+        shape = data.get("shape")
+        try:
+            size = float(data.get("size", 0))
+            direction = float(data.get("direction", 0))
+            origin = {"x": int(data["origin"]["x"]), "y": int(data["origin"]["y"])}
+        except (KeyError, TypeError, ValueError):
+            self.reply("error", {"message": "Invalid template"})
+            return
+        if shape not in aoe.SHAPES or not 0 < size <= Config.AOE_MAX_FEET or not math.isfinite(direction):
+            self.reply("error", {"message": "Invalid template"})
+            return
+        
+        result = aoe.resolve(board_state.board.obstacle_grid(), shape, size, origin, direction,
+                             game_state_manager.get_token_positions())
+        payload = {
+            "player_id": player.player_id,
+            "shape": shape,
+            "size": size,
+            "direction": aoe.template_key(shape, size, direction)[2] * aoe.ORIENTATION_STEP,
+            "origin": origin,
+            **result
+        }
+        self.reply("aoe_preview", payload)
+        if data.get("share") and player.is_gm:
+            self.broadcast_event("aoe_template", payload, origins=[origin])
+    
+    def on_request_reach(self, data):
+        """Reply with the tiles a token can reach this turn, as a bitmask
+        
+        Players get their own token's range; a GM may pass any `token_id`.
+        """
+        player = game_state_manager.get_player(data.get("player_id"))
+        if not player:
+            self.reply("error", {"message": "Player not found"})
+            return
+        board_state = game_state_manager.gameboard
+        if not board_state or not board_state.board:
+            self.reply("error", {"message": "No map loaded"})
+            return
+        
+        token_id = data.get("token_id") or player.player_id
+        if token_id != player.player_id and not player.is_gm:
+            self.reply("error", {"message": "Only GM can query other tokens"})
+            return
+        tokens = game_state_manager.get_token_positions()
+        if token_id not in tokens:
+            self.reply("error", {"message": "Unknown token"})
+            return
+        try:
+            speed = float(data.get("speed", Config.DEFAULT_SPEED_FEET))
+        except (TypeError, ValueError):
+            speed = -1
+        if not 0 <= speed <= Config.MAX_SPEED_FEET:
+            self.reply("error", {"message": "Invalid speed"})
+            return
+        
+        combat = game_state_manager.combat
+        turn = (combat.combat_id, combat.round_number, combat.current_turn) if combat else None
+        self.reply("reach", self.reach_cache.get(board_state.board, token_id, tokens[token_id],
+                                                 speed, turn, tokens, game_state_manager.occupancy))
+    
+    # ========== NPC Events ==========
+    
+    def on_spawn_npc(self, data):
+        """Place (or replace) a simulated NPC on the loaded map (GM only)"""
+        player = game_state_manager.get_player(data.get("player_id"))
+        if not player or not player.is_gm:
+            self.reply("error", {"message": "Only GM can spawn NPCs"})
+            return
+        board_state = game_state_manager.gameboard
+        if not board_state:
+            self.reply("error", {"message": "No map loaded"})
+            return
+        
+        npc_id = str(data.get("npc_id") or f"npc_{uuid.uuid4().hex[:8]}")
+        if npc_id not in game_state_manager.npcs.index and game_state_manager.npcs.count >= Config.NPC_MAX:
+            self.reply("error", {"message": f"NPC limit ({Config.NPC_MAX}) reached"})
+            return
+        try:
+            x, y = int(data["x"]), int(data["y"])
+            patrol_to = data.get("patrol_to")
+            npc = {
+                "id": npc_id,
+                "name": str(data.get("name", npc_id))[:50],
+                "x": x, "y": y,
+                "hp": int(data.get("hp", 10)),
+                "behaviour": data.get("behaviour", "idle"),
+                "patrol_to": {"x": int(patrol_to["x"]), "y": int(patrol_to["y"])} if patrol_to else None,
+                "speed": float(data.get("speed", 1.0)),
+                "sight": int(data.get("sight", 6))
+            }
+        except (KeyError, TypeError, ValueError):
+            self.reply("error", {"message": "Invalid NPC data"})
+            return
+        if npc["behaviour"] not in BEHAVIOURS or not (0 <= x < board_state.width and 0 <= y < board_state.height):
+            self.reply("error", {"message": "Invalid NPC data"})
+            return
+        
+        occupancy = game_state_manager.occupancy
+        if occupancy and Config.OCCUPANCY_BLOCKING and occupancy.blocked(x, y, npc_id):
+            self.reply("error", {"message": "Tile is occupied"})
+            return
+        
+        game_state_manager.remove_npc(npc_id)
+        game_state_manager.add_npc(npc)
+        self.verify_occupancy("spawn_npc")
+        log.event("spawn_npc", "NPC spawned", npc_id=npc_id, behaviour=npc["behaviour"])
+        self.broadcast_event("npc_spawned", {
+            **game_state_manager.npcs.describe(game_state_manager.npcs.index[npc_id]),
+            "timestamp": time.time()
+        }, origins=[{"x": x, "y": y}])
+        if self.npc_scheduler:
+            self.npc_scheduler.start()
+    
+    def on_despawn_npc(self, data):
+        """Remove a simulated NPC (GM only)"""
+        player = game_state_manager.get_player(data.get("player_id"))
+        if not player or not player.is_gm:
+            self.reply("error", {"message": "Only GM can remove NPCs"})
+            return
+        npc_id = data.get("npc_id")
+        position = game_state_manager.npcs.positions().get(npc_id)
+        if not game_state_manager.remove_npc(npc_id):
+            self.reply("error", {"message": "Unknown NPC"})
+            return
+        self.reach_cache.invalidate(npc_id)
+        self.verify_occupancy("despawn_npc")
+        self.drop_token_lights(npc_id)
+        self.broadcast_event("npc_removed", {"npc_id": npc_id, "timestamp": time.time()},
+                             origins=[position] if position else None)
+    
+    # ========== Lighting Events ==========
+    
+    def lighting_gm(self, data, action: str):
+        """The loaded map's LightMap if the sender is a GM, else reply an error"""
+        player = game_state_manager.get_player(data.get("player_id"))
+        if not player or not player.is_gm:
+            self.reply("error", {"message": f"Only GM can {action}"})
+            return None
+        if not game_state_manager.lighting:
+            self.reply("error", {"message": "No map loaded"})
+            return None
+        return game_state_manager.lighting
+    
+    def on_place_light(self, data):
+        """Place (or replace) a light, fixed or carried by a token (GM only)
+        
+        `bright` and `dim` are radii in feet; `dim` defaults to twice `bright`.
+        """
+        lighting = self.lighting_gm(data, "place lights")
+        if not lighting:
+            return
+        
+        light_id = str(data.get("light_id") or f"light_{uuid.uuid4().hex[:8]}")
+        token_id = data.get("token_id")
+        try:
+            bright = float(data.get("bright", 20))
+            dim = float(data.get("dim", bright * 2))
+            if token_id:
+                position = game_state_manager.get_token_positions()[token_id]
+                x, y = position["x"], position["y"]
+            else:
+                x, y = int(data["x"]), int(data["y"])
+        except (KeyError, TypeError, ValueError):
+            self.reply("error", {"message": "Invalid light data"})
+            return
+        if not (0 <= bright <= dim <= Config.LIGHT_MAX_FEET and 0 <= x < lighting.width and 0 <= y < lighting.height):
+            self.reply("error", {"message": "Invalid light data"})
+            return
+        
+        changed = lighting.place(light_id, x, y, bright / LIGHT_FEET_PER_TILE, dim / LIGHT_FEET_PER_TILE, token_id)
+        log.event("place_light", "Light placed", light_id=light_id, token_id=token_id, changed=len(changed))
+        self.broadcast_event("light_placed", {**lighting.lights[light_id].to_dict(), "timestamp": time.time()},
+                             origins=[{"x": x, "y": y}])
+        self.broadcast_light_delta(changed)
+    
+    def on_remove_light(self, data):
+        """Remove a light (GM only)"""
+        lighting = self.lighting_gm(data, "remove lights")
+        if not lighting:
+            return
+        light_id = data.get("light_id")
+        light = lighting.lights.get(light_id)
+        changed = lighting.remove(light_id)
+        if changed is None:
+            self.reply("error", {"message": "Unknown light"})
+            return
+        self.broadcast_event("light_removed", {"light_id": light_id, "timestamp": time.time()},
+                             origins=[{"x": light.x, "y": light.y}])
+        self.broadcast_light_delta(changed)
+    
+    def on_set_lighting(self, data):
+        """Set the map's ambient light level and/or fog of war (GM only)"""
+        lighting = self.lighting_gm(data, "change lighting")
+        if not lighting:
+            return
+        ambient = data.get("ambient", LIGHT_LEVELS[lighting.ambient])
+        if ambient not in LIGHT_LEVELS:
+            self.reply("error", {"message": f"Ambient light must be one of {', '.join(LIGHT_LEVELS)}"})
+            return
+        
+        board_state = game_state_manager.gameboard
+        lighting.ambient = LIGHT_LEVELS.index(ambient)
+        fog_was_on = board_state.fog_of_war
+        board_state.fog_of_war = bool(data.get("fog_of_war", board_state.fog_of_war))
+        log.event("set_lighting", "Lighting changed", ambient=ambient, fog_of_war=board_state.fog_of_war)
+        self.broadcast_event("lighting_changed", {
+            "ambient": ambient,
+            "fog_of_war": board_state.fog_of_war,
+            "timestamp": time.time()
+        })
+        if board_state.fog_of_war and not fog_was_on:
+            # Players stop receiving the whole map and get what they see instead
+            for player in game_state_manager.get_all_players():
+                if player.sid and self.player_vision(player) is not None:
+                    if self.map_streamer:
+                        self.map_streamer.cancel(player.sid)
+                    self.send_fog_reveal(player)
+    
+    def move_token_lights(self, token_id: str, x: int, y: int):
+        """Carry a token's lights along and send the resulting light changes"""
+        lighting = game_state_manager.lighting
+        if lighting and token_id in lighting.carried:
+            self.broadcast_light_delta(lighting.move_token(token_id, x, y))
+    
+    def drop_token_lights(self, token_id: str):
+        """Remove the lights of a token that left the map"""
+        lighting = game_state_manager.lighting
+        if lighting:
+            self.broadcast_light_delta(lighting.remove_token(token_id))
+    
+    def fog_viewers(self) -> Optional[Dict[str, Any]]:
+        """{sid: Vision} for players under fog of war, or None when fog is off
+        
+        Sessions missing from the result (GMs, spectators) see everything.
+        """
+        board_state = game_state_manager.gameboard
+        lighting = game_state_manager.lighting
+        if not board_state or not board_state.fog_of_war or not lighting:
+            return None
+        return {
+            p.sid: self.vision_of(p)
+            for p in game_state_manager.get_all_players() if p.sid and not (p.is_gm or p.is_spectator)
+        }
+    
+    def vision_of(self, player):
+        """A player's line of sight on the loaded map"""
+        return game_state_manager.lighting.vision(
+            player.player_id, player.position["x"], player.position["y"],
+            Config.VISION_FEET / LIGHT_FEET_PER_TILE, player.darkvision / LIGHT_FEET_PER_TILE)
+    
+    def player_vision(self, player):
+        """A player's Vision when fog of war limits what it may see, else None"""
+        board_state = game_state_manager.gameboard
+        if not board_state or not board_state.fog_of_war or not game_state_manager.lighting \
+                or player.is_gm or player.is_spectator:
+            return None
+        return self.vision_of(player)
+    
+    def fog_filter(self, sids, origins: List[Dict[str, int]], viewers: Dict[str, Any]) -> set:
+        """Sessions among sids that can see at least one origin"""
+        lighting = game_state_manager.lighting
+        return {
+            sid for sid in sids
+            if sid not in viewers or any(lighting.can_see(viewers[sid], o["x"], o["y"]) for o in origins)
+        }
+    
+    def send_fog_reveal(self, player):
+        """Tell a player under fog of war which tokens and terrain it can see from its tile"""
+        lighting = game_state_manager.lighting
+        vision = self.vision_of(player)
+        tokens = [
+            {"token_id": token_id, "position": pos}
+            for token_id, pos in game_state_manager.get_token_positions().items()
+            if token_id != player.player_id and lighting.can_see(vision, pos["x"], pos["y"])
+        ]
+        payload = {"visible_tokens": tokens, "timestamp": time.time()}
+        board_state = game_state_manager.gameboard
+        if board_state and board_state.board:
+            payload["terrain"] = encode_window(board_state.board, vision.window, lighting.visible_mask(vision))
+        if player.sid:
+            self.emit_to_sids("fog_update", payload, [player.sid])
+    
+    def send_map(self, sid: str, player):
+        """Stream the loaded map to a session, starting around its token; a
+        player under fog of war only gets the terrain it sees"""
+        board_state = game_state_manager.gameboard
+        if not board_state or not board_state.board:
+            return
+        if self.player_vision(player) is not None:
+            self.send_fog_reveal(player)
+        elif self.map_streamer:
+            self.map_streamer.stream_to(sid, player.position)
+    
+    def broadcast_light_delta(self, tiles: List[List[int]]):
+        """Send light level changes ([x, y, level] from light sources)
+        
+        Under fog of war each player only gets the tiles in its line of sight.
+        """
+        board_state = game_state_manager.gameboard
+        if not tiles or not board_state:
+            return
+        payload = {"map_name": board_state.map_name, "tiles": tiles, "timestamp": time.time()}
+        fog = self.fog_viewers()
+        if fog is None:
+            self.broadcast_event("light_delta", payload,
+                                 origins=[{"x": t[0], "y": t[1]} for t in tiles])
+            return
+        
+        payload = self.journal_broadcast("light_delta", payload, sight_tiles=True)
+        lighting = game_state_manager.lighting
+        unfiltered = self.connected_sids - fog.keys()
+        if unfiltered:
+            self.emit_to_sids("light_delta", payload, unfiltered)
+        for sid, vision in fog.items():
+            seen = [t for t in tiles if lighting.in_sight(vision, t[0], t[1])]
+            if seen:
+                self.emit_to_sids("light_delta", {**payload, "tiles": seen}, [sid])
+    
     # ========== Gameboard Events ==========
     
     def on_load_map(self, data):
@@ -255,29 +1188,151 @@ class WebSocketEventHandler:
         
         player = game_state_manager.get_player(player_id)
         if not player or not player.is_gm:
-            emit("error", {"message": "Only GM can load maps"})
+            self.reply("error", {"message": "Only GM can load maps"})
             return
         
         # Load gameboard from storage
         try:
             gameboard = GameboardManager.load_gameboard(map_name)
-            game_state_manager.initialize_gameboard(
-                map_name=map_name,
-                width=gameboard.width,
-                height=gameboard.height
-            )
-            
-            print(f"[MAP_LOADED] {map_name} ({gameboard.width}x{gameboard.height})")
-            
-            self.broadcast_event("map_loaded", {
-                "map_name": map_name,
-                "width": gameboard.width,
-                "height": gameboard.height,
-                "timestamp": time.time()
+            self.activate_map(gameboard)
+        except Exception as e:
+            log.error("load_map", "Failed to load map", map_name=map_name, error=str(e))
+            self.reply("error", {"message": f"Failed to load map: {str(e)}"})
+    
+    def activate_map(self, gameboard):
+        """Make a board the current map, announce it and stream it to everyone"""
+        map_name = gameboard.name
+        game_state_manager.initialize_gameboard(
+            map_name=map_name,
+            width=gameboard.width,
+            height=gameboard.height,
+            board=gameboard
+        )
+        self.reach_cache.clear()
+        
+        log.event("load_map", "Map loaded", map_name=map_name,
+                  width=gameboard.width, height=gameboard.height)
+        
+        map_info = {
+            "map_name": map_name,
+            "width": gameboard.width,
+            "height": gameboard.height,
+            "timestamp": time.time()
+        }
+        if self.map_streamer:
+            chunks_x, chunks_y = chunk_grid(gameboard)
+            map_info.update(streaming=True, chunk_size=CHUNK_SIZE,
+                            chunks_x=chunks_x, chunks_y=chunks_y)
+        self.broadcast_event("map_loaded", map_info)
+        
+        if self.map_streamer:
+            positions = {p.sid: p.position for p in game_state_manager.get_all_players() if p.sid}
+            self.map_streamer.start_map(gameboard, {
+                sid: positions.get(sid) for sid in self.connected_sids
             })
+    
+    def on_modify_map(self, data):
+        """Edit tiles of the loaded map (GM only)
+        
+        Sends the edit as `map_delta`; lights whose footprint an edited tile
+        touches are recast and their changes sent as `light_delta`.
+        """
+        player = game_state_manager.get_player(data.get("player_id"))
+        if not player or not player.is_gm:
+            self.reply("error", {"message": "Only GM can modify maps"})
+            return
+        board_state = game_state_manager.gameboard
+        if not board_state or not board_state.board:
+            self.reply("error", {"message": "No map loaded"})
+            return
+        
+        board = board_state.board
+        try:
+            edits = [{"x": int(t["x"]), "y": int(t["y"]), "type": str(t.get("type", "empty"))[:32],
+                      "obstacle": bool(t.get("obstacle", False))} for t in data["tiles"]]
+        except (KeyError, TypeError, ValueError):
+            self.reply("error", {"message": "Invalid tile data"})
+            return
+        if not 0 < len(edits) <= Config.MAP_EDIT_MAX_TILES or \
+                any(not (0 <= t["x"] < board.width and 0 <= t["y"] < board.height) for t in edits):
+            self.reply("error", {"message": f"Send 1 to {Config.MAP_EDIT_MAX_TILES} tiles inside the map"})
+            return
+        
+        walls = []
+        for t in edits:
+            if board.get_tile(t["x"], t["y"]).obstacle != t["obstacle"]:
+                walls.append((t["x"], t["y"]))
+            board.set_tile(t["x"], t["y"], t["type"], t["obstacle"])
+        log.event("modify_map", "Map modified", map_name=board_state.map_name, tiles=len(edits),
+                  walls=len(walls))
+        self.broadcast_map_delta(board_state.map_name, edits)
+        if walls and game_state_manager.lighting:
+            self.broadcast_light_delta(game_state_manager.lighting.tiles_changed(walls))
+    
+    def on_generate_map(self, data):
+        """Generate a map in the worker pool, save it and (by default) load it
+        
+        Replies `map_generation_started` at once; `map_generated` is broadcast
+        when the map is saved. The same kind, size, seed and params always
+        produce the same map.
+        """
+        player_id = data.get("player_id")
+        player = game_state_manager.get_player(player_id)
+        if not player or not player.is_gm:
+            self.reply("error", {"message": "Only GM can generate maps"})
+            return
+        
+        map_name = str(data.get("map_name", ""))
+        kind = data.get("kind", "dungeon")
+        try:
+            width, height = int(data.get("width", 64)), int(data.get("height", 64))
+            seed = int(data["seed"]) if data.get("seed") is not None else secrets.randbits(32)
+            params = mapgen.clean_params(kind, data.get("params"))
+        except (TypeError, ValueError) as e:
+            self.reply("error", {"message": f"Invalid map generation request: {e}"})
+            return
+        if not MAP_NAME.match(map_name):
+            self.reply("error", {"message": "Map name may only use letters, digits, '_' and '-'"})
+            return
+        if not (8 <= width <= Config.MAPGEN_MAX_SIDE and 8 <= height <= Config.MAPGEN_MAX_SIDE):
+            self.reply("error", {"message": f"Map sides must be 8 to {Config.MAPGEN_MAX_SIDE} tiles"})
+            return
+        
+        future = self.map_generator.submit(kind, width, height, seed, params, map_name, Config.MAPS_DIR)
+        log.event("generate_map", "Map generation started", map_name=map_name, kind=kind,
+                  width=width, height=height, seed=seed)
+        self.reply("map_generation_started", {"map_name": map_name, "kind": kind, "seed": seed})
+        self.sio.start_background_task(self.finish_map_generation, future, player_id, map_name,
+                                       width, height, data.get("load", True))
+    
+    def finish_map_generation(self, future, player_id: str, map_name: str,
+                              width: int, height: int, load: bool):
+        """Announce and optionally load a generated map (background task)
+        
+        The worker has already saved the map file; the in-memory board is
+        only built when it is loaded.
+        """
+        try:
+            result = future.result()
+            if load:
+                gameboard = Gameboard(map_name, width, height)
+                gameboard.apply_layout(result["codes"], result["obstacles"], mapgen.PALETTE)
         except Exception as e:
-            print(f"[ERROR] Failed to load map: {str(e)}")
-            emit("error", {"message": f"Failed to load map: {str(e)}"})
+            log.error("generate_map", "Map generation failed", map_name=map_name, error=str(e))
+            self.emit_to_player(player_id, "error", {"message": f"Failed to generate map: {e}"})
+            return
+        
+        self.broadcast_event("map_generated", {
+            "map_name": map_name,
+            "kind": result["kind"],
+            "seed": result["seed"],
+            "width": width,
+            "height": height,
+            "duration_ms": result["duration_ms"],
+            "timestamp": time.time()
+        })
+        if load:
+            self.activate_map(gameboard)
     
     # ========== State Synchronization ==========
     
@@ -287,12 +1342,17 @@ class WebSocketEventHandler:
         self.send_current_game_state(player_id)
     
     def send_current_game_state(self, player_id: str):
-        """Send current game state to specific player"""
-        state = game_state_manager.get_public_state()
-        emit("game_state_update", {
+        """Send current game state to specific player
+        
+        Goes through the outbound queue, where a newer snapshot supersedes one
+        a slow client has not received yet.
+        """
+        player = game_state_manager.get_player(player_id)
+        state = game_state_manager.get_public_state(self.player_vision(player) if player else None)
+        self.emit_to_sids("game_state_update", {
             "state": state,
             "timestamp": time.time()
-        })
+        }, [self.current_sid()])
     
     # ========== Utility Events ==========
     
@@ -301,9 +1361,9 @@ class WebSocketEventHandler:
         player_id = data.get("player_id")
         message = data.get("message", "")
         
-        print(f"[ECHO] {player_id}: {message}")
+        log.event("echo", "Echo", player_id=player_id)
         
-        emit("echo_response", {
+        self.reply("echo_response", {
             "player_id": player_id,
             "message": message,
             "timestamp": time.time()
@@ -311,15 +1371,159 @@ class WebSocketEventHandler:
     
     # ========== Broadcasting Utilities ==========
     
-    def broadcast_event(self, event_name: str, data: Dict[str, Any], exclude: Optional[str] = None):
-        """Broadcast event to all connected clients"""
+    def broadcast_event(self, event_name: str, data: Dict[str, Any], exclude: Optional[str] = None,
+                        origins: Optional[List[Dict[str, int]]] = None):
+        """Broadcast event to all connected clients
+        
+        With area-of-interest filtering or viewports in use, events carrying
+        `origins` (the tiles they happen at) only reach sessions that can see
+        one of them. Under fog of war, players must also have one of them in
+        sight (see features.lighting). With session resume on, the event is
+        journaled and sent with its `event_id`.
+        """
+        if self.resume:
+            sender = game_state_manager.get_player_by_sid(exclude) if exclude else None
+            data = self.journal_broadcast(event_name, data, origins=origins,
+                                          exclude=sender and sender.player_id)
+        
+        fog = self.fog_viewers() if origins else None
+        filtering = self.interest and self.interest.filtering()
+        if origins and (filtering or fog is not None):
+            if filtering:
+                recipients = set()
+                for pos in origins:
+                    recipients |= self.interest.recipients(pos["x"], pos["y"])
+            else:
+                recipients = set(self.connected_sids)
+            if fog is not None:
+                recipients = self.fog_filter(recipients, origins, fog)
+            recipients.discard(exclude)
+            self.record_fanout(event_name, len(recipients))
+            self.emit_to_sids(event_name, data, recipients)
+            return
+        
+        self.record_fanout(event_name, len(self.connected_sids) - (exclude in self.connected_sids))
+        if self.outbound:
+            self.emit_to_sids(event_name, data, self.connected_sids - {exclude})
+            return
+        
+        if self.binary_sids and wire_codec.has_schema(event_name):
+            # JSON to everyone else, one shared binary payload to the msgpack room
+            skip = list(self.binary_sids) + ([exclude] if exclude else [])
+            self.sio.emit(event_name, data, skip_sid=skip)
+            self.sio.emit(event_name, wire_codec.encode(event_name, data),
+                          to=wire_codec.MSGPACK_ROOM, skip_sid=exclude)
+            return
+        
         if exclude:
             self.sio.emit(event_name, data, skip_sid=exclude)
         else:
             self.sio.emit(event_name, data)
     
+    def journal_broadcast(self, event_name: str, data: Dict[str, Any], **scope) -> Dict[str, Any]:
+        """Journal a broadcast for session resume with the scope it is filtered by;
+        returns the payload to send, carrying its event_id"""
+        if not self.resume:
+            return data
+        scope = {key: value for key, value in scope.items() if value}
+        return {**data, "event_id": self.resume.journal.record(event_name, data, scope)}
+    
+    def broadcast_map_delta(self, map_name: str, tiles: List[Dict[str, Any]]):
+        """Broadcast changed tiles ({x, y, type, obstacle}) to the sessions that can see them"""
+        self.broadcast_event("map_delta", {
+            "map_name": map_name,
+            "tiles": tiles,
+            "timestamp": time.time()
+        }, origins=[{"x": t["x"], "y": t["y"]} for t in tiles])
+    
+    def record_fanout(self, event_name: str, recipients: int):
+        """Record how many sessions a broadcast was addressed to"""
+        if Config.METRICS_ENABLED:
+            metrics.broadcast_fanout.observe(recipients, event_name)
+    
+    def broadcast_positions(self, payload: Dict[str, Any]):
+        """Broadcast a coalesced positions_update, split per area of interest,
+        leaving sequenced movers out of their own entry"""
+        movers = payload.pop("exclude", None) or {}
+        skip = {movers[p["player_id"]]: p for p in payload["positions"] if p["player_id"] in movers}
+        self.broadcast_batch("positions_update", payload, "positions", skip)
+    
+    def broadcast_npcs(self, payload: Dict[str, Any]):
+        """Broadcast one NPC simulation tick, split per area of interest"""
+        self.verify_occupancy("npc_sim")
+        for npc in payload["npcs"]:
+            self.move_token_lights(npc["npc_id"], npc["position"]["x"], npc["position"]["y"])
+        self.broadcast_batch("npcs_update", payload, "npcs")
+    
+    def broadcast_batch(self, event_name: str, payload: Dict[str, Any], items_key: str,
+                        skip: Optional[Dict[str, Dict[str, Any]]] = None):
+        """Broadcast a batch of entries with a `position` each; with interest
+        filtering or fog of war, every session gets only the entries it can see
+        
+        `skip` maps a sid to the one entry it must not be sent (its own move).
+        """
+        fog = self.fog_viewers()
+        filtering = self.interest and self.interest.filtering()
+        if not filtering and fog is None and not skip:
+            self.broadcast_event(event_name, payload)
+            return
+        
+        payload = self.journal_broadcast(event_name, payload, items=items_key)
+        if not filtering and fog is None:
+            # Everyone shares one payload except the skipped movers
+            full = self.connected_sids - skip.keys()
+            self.record_fanout(event_name, len(full) + len(skip))
+            self.emit_to_sids(event_name, payload, full)
+            for sid, own in skip.items():
+                entries = [entry for entry in payload[items_key] if entry is not own]
+                if entries and sid in self.connected_sids:
+                    self.emit_to_sids(event_name, {**payload, items_key: entries}, [sid])
+            return
+        
+        skip = skip or {}
+        batches: Dict[str, List[Dict[str, Any]]] = {}
+        for entry in payload[items_key]:
+            pos = entry["position"]
+            sids = self.interest.recipients(pos["x"], pos["y"]) if filtering else self.connected_sids
+            if fog is not None:
+                sids = self.fog_filter(sids, [pos], fog)
+            for sid in sids:
+                if skip.get(sid) is not entry:
+                    batches.setdefault(sid, []).append(entry)
+        self.record_fanout(event_name, len(batches))
+        for sid, entries in batches.items():
+            self.emit_to_sids(event_name, {**payload, items_key: entries}, [sid])
+    
+    def emit_to_sids(self, event_name: str, data: Dict[str, Any], sids):
+        """Emit to individual sessions in their negotiated codec, encoding at most once"""
+        if self.outbound:
+            for sid in list(sids):
+                self.outbound.enqueue(sid, event_name, data)
+            return
+        
+        encoded = None
+        binary = wire_codec.has_schema(event_name)
+        for sid in sids:
+            if binary and sid in self.binary_sids:
+                if encoded is None:
+                    encoded = wire_codec.encode(event_name, data)
+                self.sio.emit(event_name, encoded, to=sid)
+            else:
+                self.sio.emit(event_name, data, to=sid)
+    
+    def send_to_sid(self, sid: str, event_name: str, data: Dict[str, Any]):
+        """Write one event to a session's transport in its negotiated codec"""
+        if sid in self.binary_sids and wire_codec.has_schema(event_name):
+            self.sio.emit(event_name, wire_codec.encode(event_name, data), to=sid)
+        else:
+            self.sio.emit(event_name, data, to=sid)
+    
     def emit_to_player(self, player_id: str, event_name: str, data: Dict[str, Any]):
         """Emit event to specific player"""
+        player = game_state_manager.get_player(player_id)
+        if self.outbound and player and player.sid:
+            self.outbound.enqueue(player.sid, event_name, data)
+            return
         self.sio.emit(event_name, data, to=player_id)
     
     def get_connected_players(self):
@@ -328,7 +1532,31 @@ class WebSocketEventHandler:
     
     def get_event_stats(self) -> Dict[str, Any]:
         """Get event handler statistics"""
-        return {
+        stats = {
             "connected_players": self.get_connected_players(),
             "game_state": game_state_manager.get_public_state()
         }
+        if self.move_coalescer:
+            stats["broadcast_tick"] = self.move_coalescer.get_stats()
+        if self.interest:
+            stats["interest"] = self.interest.get_stats()
+        if self.outbound:
+            stats["outbound_queues"] = self.outbound.get_stats()
+        if self.rate_limiter:
+            stats["rate_limits"] = self.rate_limiter.get_stats()
+        if self.resume:
+            stats["session_resume"] = self.resume.get_stats()
+        if self.map_streamer:
+            stats["map_stream"] = self.map_streamer.get_stats()
+        stats["dice"] = game_state_manager.dice.get_stats()
+        stats["aoe_templates"] = aoe.get_cache_stats()
+        stats["reach_cache"] = self.reach_cache.get_stats()
+        if self.npc_scheduler:
+            stats["npc_sim"] = self.npc_scheduler.get_stats()
+        stats["mapgen"] = self.map_generator.get_stats()
+        if game_state_manager.occupancy:
+            stats["occupancy"] = game_state_manager.occupancy.get_stats()
+        if game_state_manager.lighting:
+            stats["lighting"] = game_state_manager.lighting.get_stats()
+        stats["msgpack_clients"] = len(self.binary_sids)
+        return stats
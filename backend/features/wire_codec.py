@@ -0,0 +1,116 @@
+"""
+Wire Codec - Negotiated compact binary encoding for high-frequency events
+
+JSON stays the default. A client can opt in at connect time with Socket.IO
+auth data `{"codec": "msgpack"}`; it then receives the events listed in
+SCHEMAS as a single MessagePack-encoded binary attachment holding a
+positional array instead of a keyed JSON object. Timestamps are integer
+milliseconds. Events without a schema are sent as JSON to everyone. A
+journaled broadcast's `event_id` (session resume) is appended to the array.
+
+Payload is encoded once per broadcast and shared by every msgpack client.
+"""
+
+import time
+from typing import Dict, Any, List, Callable, Optional, Tuple
+
+try:
+    import msgpack
+except ImportError:  # msgpack is only needed when a client negotiates it
+    msgpack = None
+
+
+JSON = "json"
+MSGPACK = "msgpack"
+MSGPACK_ROOM = "codec:msgpack"
+
+
+def _ms(timestamp: Optional[float]) -> int:
+    """Float seconds to integer milliseconds"""
+    return int((timestamp if timestamp is not None else time.time()) * 1000)
+
+
+def _pos(position: Dict[str, int]) -> List[int]:
+    return [position["x"], position["y"]]
+
+
+def _xy(values: List[int]) -> Dict[str, int]:
+    return {"x": values[0], "y": values[1]}
+
+
+# event name -> (encode dict to positional list, decode positional list to dict)
+SCHEMAS: Dict[str, Tuple[Callable[[Dict[str, Any]], list], Callable[[list], Dict[str, Any]]]] = {
+    # [player_id, character_name, old_x, old_y, new_x, new_y, ts_ms]
+    "character_moved": (
+        lambda d: [d["player_id"], d["character_name"],
+                   *_pos(d["old_position"]), *_pos(d["new_position"]), _ms(d.get("timestamp"))],
+        lambda v: {"player_id": v[0], "character_name": v[1],
+                   "old_position": _xy(v[2:4]), "new_position": _xy(v[4:6]),
+                   "timestamp": v[6] / 1000.0}
+    ),
+    # [tick, ts_ms, [[player_id, character_name, x, y], ...]]
+    "positions_update": (
+        lambda d: [d["tick"], _ms(d.get("timestamp")),
+                   [[p["player_id"], p["character_name"], *_pos(p["position"])] for p in d["positions"]]],
+        lambda v: {"tick": v[0], "timestamp": v[1] / 1000.0,
+                   "positions": [{"player_id": p[0], "character_name": p[1], "position": _xy(p[2:4])}
+                                 for p in v[2]]}
+    ),
+    # [tick, ts_ms, [[npc_id, x, y], ...]]
+    "npcs_update": (
+        lambda d: [d["tick"], _ms(d.get("timestamp")),
+                   [[n["npc_id"], *_pos(n["position"])] for n in d["npcs"]]],
+        lambda v: {"tick": v[0], "timestamp": v[1] / 1000.0,
+                   "npcs": [{"npc_id": n[0], "position": _xy(n[1:3])} for n in v[2]]}
+    ),
+    # [map_name, [[x, y, type, obstacle], ...], ts_ms]
+    "map_delta": (
+        lambda d: [d["map_name"],
+                   [[t["x"], t["y"], t["type"], bool(t.get("obstacle", False))] for t in d["tiles"]],
+                   _ms(d.get("timestamp"))],
+        lambda v: {"map_name": v[0],
+                   "tiles": [{"x": t[0], "y": t[1], "type": t[2], "obstacle": t[3]} for t in v[1]],
+                   "timestamp": v[2] / 1000.0}
+    ),
+    # [map_name, [[x, y, level], ...], ts_ms]
+    "light_delta": (
+        lambda d: [d["map_name"], d["tiles"], _ms(d.get("timestamp"))],
+        lambda v: {"map_name": v[0], "tiles": v[1], "timestamp": v[2] / 1000.0}
+    ),
+}
+
+
+def available() -> bool:
+    """Whether the msgpack codec can be negotiated"""
+    return msgpack is not None
+
+
+def negotiate(auth: Optional[Dict[str, Any]] = None) -> str:
+    """Pick a codec from connect-time auth data"""
+    requested = auth.get("codec") if isinstance(auth, dict) else None
+    if requested == MSGPACK and available():
+        return MSGPACK
+    return JSON
+
+
+def has_schema(event_name: str) -> bool:
+    """Whether an event has a compact binary schema"""
+    return event_name in SCHEMAS
+
+
+def encode(event_name: str, data: Dict[str, Any]) -> bytes:
+    """Encode an event payload with its compact schema"""
+    values = SCHEMAS[event_name][0](data)
+    if "event_id" in data:
+        values.append(data["event_id"])
+    return msgpack.packb(values, use_bin_type=True)
+
+
+def decode(event_name: str, payload: bytes) -> Dict[str, Any]:
+    """Decode a compact payload back into the JSON-shaped dict"""
+    to_values, from_values = SCHEMAS[event_name]
+    values = msgpack.unpackb(payload, raw=False)
+    data = from_values(values)
+    if len(values) > len(to_values(data)):
+        data["event_id"] = values[-1]
+    return data
@@ -0,0 +1,89 @@
+"""Unit tests for area-of-effect templates."""
+
+import numpy as np
+
+from features import aoe
+from features.game_state import game_state_manager
+from features.gameboard import Gameboard
+
+
+def setup_function():
+    game_state_manager.reset_game()
+    game_state_manager.add_player("gm", "c0", "Dungeon Master", is_gm=True)
+    game_state_manager.add_player("p1", "c1", "Aragorn")
+    game_state_manager.update_player_position("p1", 3, 2)
+    game_state_manager.initialize_gameboard("arena", 10, 10, board=Gameboard("arena", 10, 10))
+
+
+def tiles(result):
+    return {tuple(t) for t in result["tiles"]}
+
+
+def test_templates_are_cached_per_snapped_orientation():
+    assert aoe.template_key("cone", 30, 44) == ("cone", 6.0, 3)
+    assert aoe.template_key("sphere", 20, 90) == ("sphere", 4.0, 0)
+    assert aoe.get_template("cone", 6.0, 3) is aoe.get_template(*aoe.template_key("cone", 30, 46))
+
+
+def test_shapes_on_open_board():
+    open_board = np.zeros((30, 30), dtype=bool)
+    origin = {"x": 10, "y": 10}
+
+    sphere = tiles(aoe.resolve(open_board, "sphere", 10, origin))
+    assert (10, 10) in sphere and (12, 10) in sphere and (12, 12) not in sphere
+
+    cone = tiles(aoe.resolve(open_board, "cone", 15, origin, direction=0))
+    assert (10, 10) not in cone
+    assert {(11, 10), (12, 9), (12, 11), (13, 10)} <= cone
+    assert all(x > 10 for x, _ in cone)
+
+    line = tiles(aoe.resolve(open_board, "line", 20, origin, direction=90))
+    assert line == {(10, 11), (10, 12), (10, 13), (10, 14)}
+
+    cube = tiles(aoe.resolve(open_board, "cube", 15, origin))
+    assert cube == {(x, y) for x in range(9, 12) for y in range(9, 12)}
+
+
+def test_obstacles_give_cover_and_board_edges_clip():
+    board = Gameboard("walls", 20, 20)
+    for y in range(5, 10):
+        board.set_tile(8, y, "wall", True)
+
+    result = aoe.resolve(board.obstacle_grid(), "sphere", 20, {"x": 6, "y": 7},
+                         tokens={"behind": {"x": 9, "y": 7}, "open": {"x": 6, "y": 4}})
+    covered = {tuple(t) for t in result["covered"]}
+
+    assert (8, 7) in covered and (9, 7) in covered
+    assert result["targets"] == ["open"]
+
+    corner = tiles(aoe.resolve(board.obstacle_grid(), "sphere", 10, {"x": 0, "y": 0}))
+    assert all(x >= 0 and y >= 0 for x, y in corner)
+
+
+def test_obstacle_grid_follows_edits():
+    board = Gameboard("edit", 5, 5)
+    grid = board.obstacle_grid()
+    assert board.obstacle_grid() is grid and not grid.any()
+
+    board.set_tile(2, 3, "wall", True)
+    assert board.obstacle_grid()[3, 2]
+
+
+def test_preview_aoe_event(handler):
+    handler.on_preview_aoe({"player_id": "gm", "shape": "sphere", "size": 10,
+                            "origin": {"x": 2, "y": 2}, "share": True})
+    handler.on_preview_aoe({"player_id": "p1", "shape": "hexagon", "size": 10,
+                            "origin": {"x": 2, "y": 2}})
+
+    (event_name, preview), (error_name, _) = handler.replies
+    assert event_name == "aoe_preview" and preview["targets"] == ["p1"]
+    assert error_name == "error"
+    assert handler.broadcasts == [("aoe_template", preview, None)]
+
+
+def test_preview_aoe_rejects_non_finite_direction(handler):
+    for direction in ("nan", "inf", 1e400):
+        handler.on_preview_aoe({"player_id": "p1", "shape": "cone", "size": 15,
+                                "origin": {"x": 2, "y": 2}, "direction": direction})
+
+    assert handler.replies == [("error", {"message": "Invalid template"})] * 3
@@ -0,0 +1,35 @@
+"""Unit tests for tick-based movement coalescing."""
+
+from features.broadcast_tick import MovementCoalescer
+
+
+def test_moves_within_tick_collapse_to_final_position(fake_sio):
+    sent = []
+    coalescer = MovementCoalescer(fake_sio, 20, flush=sent.append)
+
+    for x in range(20):
+        coalescer.queue_move("player_1", "Aragorn", {"x": x, "y": 3})
+    coalescer.queue_move("player_2", "Legolas", {"x": 1, "y": 1})
+    coalescer.tick()
+
+    assert len(sent) == 1
+    positions = {p["player_id"]: p["position"] for p in sent[0]["positions"]}
+    assert positions == {"player_1": {"x": 19, "y": 3}, "player_2": {"x": 1, "y": 1}}
+
+
+def test_empty_tick_sends_nothing(fake_sio):
+    sent = []
+    coalescer = MovementCoalescer(fake_sio, 20, flush=sent.append)
+
+    assert coalescer.tick() is None
+    assert sent == []
+
+
+def test_background_task_started_once(fake_sio):
+    coalescer = MovementCoalescer(fake_sio, 10, flush=lambda payload: None)
+
+    coalescer.queue_move("player_1", "Aragorn", {"x": 1, "y": 1})
+    coalescer.queue_move("player_1", "Aragorn", {"x": 2, "y": 1})
+
+    assert len(fake_sio.tasks) == 1
+    assert coalescer.interval == 0.1
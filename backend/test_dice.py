@@ -0,0 +1,90 @@
+"""Unit tests for the dice engine and roll_dice event."""
+
+import numpy as np
+import pytest
+
+from features.dice import DiceError, DiceRoller, compile_expression, replay
+from features.game_state import game_state_manager
+
+
+def setup_function():
+    game_state_manager.reset_game()
+    game_state_manager.add_player("gm", "c0", "Dungeon Master", is_gm=True)
+    game_state_manager.add_player("p1", "c1", "Aragorn")
+
+
+def test_compile_normalizes_and_caches():
+    plan = compile_expression("4d6KH3 + 2")
+
+    assert plan.expression == "4d6kh3+2"
+    assert (plan.minimum, plan.maximum) == (5, 20)
+    assert compile_expression("4d6kh3  +  2") is plan
+    assert compile_expression("2d20dl1").expression == "2d20kh1"
+
+    labelled = compile_expression("8d6 fire")
+    assert labelled.damage_type == "fire" and labelled.expression == "8d6 fire"
+    assert (compile_expression("d%-1").minimum, compile_expression("d%-1").maximum) == (0, 99)
+
+
+@pytest.mark.parametrize("expression", ["", "d", "4d6kh5", "2d1", "3d6+", "1001d6", "4d6 fire 2"])
+def test_invalid_expressions(expression):
+    with pytest.raises(DiceError):
+        compile_expression(expression)
+
+
+def test_batch_totals_respect_keep_and_bounds():
+    plan = compile_expression("4d6kh3+2")
+    totals, rolls = plan.evaluate(np.random.default_rng(1), 1000)
+
+    assert totals.shape == (1000,) and rolls[0].shape == (1000, 4)
+    expected = np.sort(rolls[0], axis=1)[:, 1:].sum(axis=1) + 2
+    assert (totals == expected).all()
+    assert totals.min() >= plan.minimum and totals.max() <= plan.maximum
+
+
+def test_seeded_rolls_replay():
+    roller = DiceRoller(seed=1234)
+    first = roller.roll("8d6 fire", 30)
+    second = roller.roll("1d20+5")
+
+    assert len(first["results"]) == 30
+    assert replay(1234, list(roller.history)) == [
+        [r["total"] for r in first["results"]],
+        [r["total"] for r in second["results"]],
+    ]
+    assert DiceRoller(seed=1234).roll("8d6 fire", 30) == {**first, "seq": 1}
+
+
+def test_roll_dice_event_labels_targets(handler):
+    handler.on_roll_dice({"player_id": "gm", "expression": "8d6 fire",
+                          "targets": ["goblin_1", "goblin_2"], "reason": "Fireball"})
+
+    event_name, data, _ = handler.broadcasts[0]
+    assert event_name == "dice_rolled"
+    assert [r["target"] for r in data["results"]] == ["goblin_1", "goblin_2"]
+    assert data["damage_type"] == "fire" and data["player_name"] == "Dungeon Master"
+
+
+def test_roll_dice_event_errors_and_private_rolls(handler):
+    handler.on_roll_dice({"player_id": "p1", "expression": "2d"})
+    handler.on_roll_dice({"player_id": "p1", "expression": "1d20", "count": 10000})
+    handler.on_roll_dice({"player_id": "gm", "expression": "1d20", "private": True})
+
+    assert [name for name, _ in handler.replies] == ["error", "error", "dice_rolled"]
+    assert handler.replies[2][1]["private"] is True
+    assert handler.broadcasts == []
+
+
+def test_gm_gets_seed_and_log_and_new_game_reseeds(handler):
+    handler.on_roll_dice({"player_id": "gm", "expression": "1d20+5"})
+    handler.on_request_dice_log({"player_id": "p1"})
+    handler.on_request_dice_log({"player_id": "gm"})
+
+    (denied, _), (event_name, audit) = handler.replies
+    assert denied == "error" and event_name == "dice_log"
+    assert audit["complete"] and [r["expression"] for r in audit["rolls"]] == ["1d20+5"]
+    assert replay(audit["seed"], audit["rolls"]) == [[handler.broadcasts[0][1]["results"][0]["total"]]]
+
+    dice = game_state_manager.dice
+    game_state_manager.reset_game()
+    assert game_state_manager.dice is dice and dice.sequence == 0 and dice.seed != audit["seed"]
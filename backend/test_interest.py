@@ -0,0 +1,117 @@
+"""Unit tests for area-of-interest tracking."""
+
+from features.game_state import game_state_manager
+from features.gameboard import Gameboard
+from features.interest import InterestManager
+
+
+def test_only_nearby_sessions_are_recipients():
+    interest = InterestManager(cell_size=8, radius=1)
+    interest.update("near", 2, 2)
+    interest.update("far", 100, 100)
+
+    assert interest.recipients(10, 10) == {"near"}
+    assert interest.recipients(101, 99) == {"far"}
+
+
+def test_override_sessions_receive_everything():
+    interest = InterestManager(cell_size=8, radius=0)
+    interest.update("gm", 0, 0)
+    interest.set_override("gm")
+
+    assert "gm" in interest.recipients(500, 500)
+
+
+def test_moving_and_removing_sessions_updates_buckets():
+    interest = InterestManager(cell_size=4, radius=0)
+    interest.update("p1", 0, 0)
+    interest.update("p1", 20, 20)
+
+    assert interest.recipients(0, 0) == set()
+    assert interest.recipients(21, 22) == {"p1"}
+
+    interest.remove("p1")
+    assert interest.recipients(21, 22) == set()
+    assert interest.get_stats()["occupied_cells"] == 0
+
+
+def test_viewport_receives_only_tiles_inside_rectangle():
+    interest = InterestManager(cell_size=8, radius=0, track_tokens=False)
+    interest.update("plain", 0, 0)
+    interest.set_viewport("vp", (10, 10, 20, 20))
+
+    assert interest.recipients(15, 15) == {"plain", "vp"}
+    # Same cell as the viewport's corner but outside the rectangle
+    assert interest.recipients(9, 9) == {"plain"}
+    assert interest.recipients(100, 100) == {"plain"}
+
+
+def test_viewport_replaces_token_radius_until_cleared():
+    interest = InterestManager(cell_size=8, radius=1)
+    interest.update("p1", 0, 0)
+    interest.set_viewport("p1", (50, 50, 60, 60))
+
+    assert interest.recipients(1, 1) == set()
+    assert interest.recipients(55, 55) == {"p1"}
+
+    interest.clear_viewport("p1")
+    interest.update("p1", 0, 0)
+    assert interest.recipients(1, 1) == {"p1"}
+    assert interest.recipients(55, 55) == set()
+
+
+def test_filtering_only_when_needed():
+    interest = InterestManager(track_tokens=False)
+    assert not interest.filtering()
+
+    interest.set_viewport("vp", (0, 0, 4, 4))
+    assert interest.filtering()
+
+    interest.remove("vp")
+    assert not interest.filtering()
+    assert interest.get_stats()["viewport_cells"] == 0
+
+
+def test_viewport_set_carries_what_is_now_in_view(make_handler):
+    handler = make_handler(VIEWPORTS_ENABLED=True)
+    game_state_manager.reset_game()
+    board = Gameboard("arena", 40, 40)
+    handler.activate_map(board)
+    game_state_manager.add_player("p1", "c1", "Aragorn", sid="sid_1")
+    game_state_manager.add_player("p2", "c2", "Legolas", sid="sid_2")
+    game_state_manager.get_player("p2").position = {"x": 30, "y": 30}
+    game_state_manager.npcs.add("n1", "Goblin", 20, 5)
+    game_state_manager.npcs.add("n2", "Orc", 2, 2)
+    board.set_tile(17, 17, "wall", True)
+
+    handler.on_set_viewport({"x0": 16, "y0": 0, "x1": 40, "y1": 40})
+
+    event_name, data = handler.replies[-1]
+    assert event_name == "viewport_set"
+    assert [t["player_id"] for t in data["tokens"]] == ["p2"]
+    assert [n["npc_id"] for n in data["npcs"]] == ["n1"]
+    revisions = {(c["cx"], c["cy"]): c["rev"] for c in data["chunks"]}
+    assert set(revisions) == {(1, 0), (2, 0), (1, 1), (2, 1), (1, 2), (2, 2)}
+    assert revisions[(1, 1)] > revisions[(2, 1)]
+
+
+def test_npc_light_and_template_events_only_reach_sessions_in_view(make_handler):
+    handler = make_handler(VIEWPORTS_ENABLED=True)
+    game_state_manager.reset_game()
+    handler.activate_map(Gameboard("arena", 40, 40))
+    game_state_manager.add_player("gm", "c0", "GM", is_gm=True, sid="sid_0")
+    game_state_manager.add_player("p1", "c1", "Aragorn", sid="sid_1")
+    handler.connected_sids.update({"sid_0", "sid_1"})
+    handler.on_set_viewport({"x0": 0, "y0": 0, "x1": 10, "y1": 10})
+
+    handler.on_spawn_npc({"player_id": "gm", "npc_id": "far", "x": 30, "y": 30})
+    handler.on_despawn_npc({"player_id": "gm", "npc_id": "far"})
+    handler.on_place_light({"player_id": "gm", "light_id": "far", "x": 30, "y": 30})
+    handler.on_remove_light({"player_id": "gm", "light_id": "far"})
+    handler.on_preview_aoe({"player_id": "gm", "shape": "sphere", "size": 10,
+                            "origin": {"x": 30, "y": 30}, "share": True})
+    handler.on_spawn_npc({"player_id": "gm", "npc_id": "near", "x": 2, "y": 2})
+
+    events = ("npc_spawned", "npc_removed", "light_placed", "light_removed", "aoe_template")
+    seen = [(name, data.get("npc_id")) for name, data, to in handler.emits if name in events and to in ("sid_1", None)]
+    assert seen == [("npc_spawned", "near")]
@@ -0,0 +1,149 @@
+"""Unit tests for light maps, vision and fog-of-war filtering."""
+
+import threading
+
+import numpy as np
+
+from features.game_state import game_state_manager
+from features.gameboard import Gameboard
+from features.lighting import BRIGHT, DARK, DIM, LightMap, footprint
+from features.tile_window import decode_rows
+
+
+def walled_board():
+    """10x10 board split by a wall at x=5 with a gap at y=9"""
+    board = Gameboard("crypt", 10, 10)
+    for y in range(9):
+        board.set_tile(5, y, "wall", True)
+    return board
+
+
+def sent(handler, event_name):
+    return {to: data for name, data, to in handler.emits if name == event_name}
+
+
+def test_footprint_shadows_behind_walls():
+    obstacles = walled_board().obstacle_grid()
+
+    xs, ys, levels = footprint(obstacles, 3, 4, 4, bright=2)
+    lit = {(x, y): level for x, y, level in zip(xs, ys, levels)}
+
+    assert lit[(3, 4)] == BRIGHT and lit[(5, 4)] == BRIGHT and lit[(5, 2)] == DIM  # walls are lit
+    assert (6, 4) not in lit and (7, 4) not in lit
+    assert lit[(3, 6)] == BRIGHT and lit[(3, 7)] == DIM
+
+
+def test_incremental_updates_match_full_rebuild():
+    board = walled_board()
+    lights = LightMap(board, ambient=DARK)
+    lights.place("torch", 2, 2, 2, 4, token_id="p1")
+    lights.place("brazier", 7, 7, 1, 3)
+
+    changed = lights.move_token("p1", 3, 8)
+    board.set_tile(5, 8, "floor", False)
+    changed += lights.tiles_changed([(5, 8)])
+
+    rebuilt = LightMap(board, ambient=DARK)
+    rebuilt.place("torch", 3, 8, 2, 4)
+    rebuilt.place("brazier", 7, 7, 1, 3)
+    assert np.array_equal(lights.levels, rebuilt.levels)
+    assert [2, 2, DARK] in changed and lights.level(6, 8) > DARK
+    assert lights.remove_token("p1") and lights.remove("brazier") is not None
+    assert not lights.levels.any() and lights.remove("brazier") is None
+
+
+def test_vision_cache_counts_every_lookup_across_threads():
+    lighting = LightMap(walled_board())
+
+    def look(viewer):
+        for i in range(200):
+            lighting.vision(viewer, i % 3, 1, 6)
+
+    threads = [threading.Thread(target=look, args=(f"v{n % 2}",)) for n in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    stats = lighting.get_stats()
+    assert stats["vision_hits"] + stats["vision_misses"] == 800
+    assert stats["viewers"] == 2
+
+
+def test_fog_of_war_filters_positional_broadcasts(handler):
+    game_state_manager.reset_game()
+    game_state_manager.add_player("gm", "c0", "GM", is_gm=True, sid="s0")
+    game_state_manager.add_player("p1", "c1", "Aragorn", sid="s1")
+    game_state_manager.add_player("p2", "c2", "Legolas", sid="s2")
+    game_state_manager.initialize_gameboard("crypt", 10, 10, board=walled_board())
+    game_state_manager.update_player_position("p1", 1, 1)
+    game_state_manager.update_player_position("p2", 8, 1)
+    handler.connected_sids.update({"s0", "s1", "s2"})
+    handler.on_set_lighting({"player_id": "gm", "ambient": "dark", "fog_of_war": True})
+    moved = {"x": 3, "y": 1}
+
+    handler.broadcast_event("character_moved", {"id": 1}, origins=[moved])
+    handler.on_place_light({"player_id": "gm", "light_id": "t", "x": 2, "y": 2, "bright": 10})
+    handler.broadcast_event("character_moved", {"id": 2}, origins=[moved])
+
+    moves = [(data["id"], to) for name, data, to in handler.emits if name == "character_moved"]
+    assert sorted(moves) == [(1, "s0"), (2, "s0"), (2, "s1")]
+    deltas = sent(handler, "light_delta")
+    assert [2, 2, BRIGHT] in deltas["s1"]["tiles"] and len(deltas["s0"]["tiles"]) == 36
+    assert all(x == 5 for x, _, _ in deltas["s2"]["tiles"])  # only the far side of the wall
+
+    handler.on_modify_map({"player_id": "gm", "tiles": [{"x": 5, "y": 2, "type": "floor"}]})
+    assert sent(handler, "map_delta")["s0"]["tiles"] == [{"x": 5, "y": 2, "type": "floor", "obstacle": False}]
+    assert sent(handler, "light_delta")["s2"]["tiles"] == [[6, 2, DIM]]  # light spills through the gap
+
+
+def test_state_snapshot_respects_fog_of_war(handler):
+    game_state_manager.reset_game()
+    game_state_manager.add_player("gm", "c0", "GM", is_gm=True, sid="s0")
+    game_state_manager.add_player("p1", "c1", "Aragorn", sid="s1")
+    game_state_manager.add_player("p2", "c2", "Legolas", sid="s2")
+    game_state_manager.initialize_gameboard("crypt", 10, 10, board=walled_board())
+    game_state_manager.update_player_position("p1", 1, 1)
+    game_state_manager.update_player_position("p2", 8, 1)
+    game_state_manager.add_npc({"id": "ghoul", "x": 2, "y": 1})
+    handler.on_set_lighting({"player_id": "gm", "ambient": "bright", "fog_of_war": True})
+    handler.on_place_light({"player_id": "gm", "light_id": "beyond", "x": 8, "y": 4, "bright": 5})
+
+    handler.send_current_game_state("p1")
+    handler.send_current_game_state("gm")
+
+    mine, gms = [data for name, data, _ in handler.emits if name == "game_state_update"]
+    assert {p["id"] for p in mine["state"]["players"]} == {"gm", "p1"}
+    assert [n["npc_id"] for n in mine["state"]["npcs"]] == ["ghoul"]
+    assert mine["state"]["lighting"]["lights"] == [] and mine["state"]["lighting"]["levels"]["bright"] == ""
+    assert {p["id"] for p in gms["state"]["players"]} == {"gm", "p1", "p2"}
+    assert len(gms["state"]["lighting"]["lights"]) == 1
+
+
+def test_fog_of_war_hides_spawns_lights_and_terrain(handler):
+    import app
+
+    game_state_manager.reset_game()
+    game_state_manager.add_player("gm", "c0", "GM", is_gm=True, sid="s0")
+    game_state_manager.add_player("p1", "c1", "Aragorn", sid="s1")
+    game_state_manager.initialize_gameboard("crypt", 10, 10, board=walled_board())
+    game_state_manager.update_player_position("p1", 1, 1)
+    handler.connected_sids.update({"s0", "s1"})
+    handler.on_set_lighting({"player_id": "gm", "ambient": "bright", "fog_of_war": True})
+
+    handler.on_spawn_npc({"player_id": "gm", "npc_id": "near", "x": 3, "y": 3})
+    handler.on_spawn_npc({"player_id": "gm", "npc_id": "far", "x": 8, "y": 3})
+    handler.on_place_light({"player_id": "gm", "light_id": "hidden", "x": 8, "y": 5})
+
+    spawned = [(data["npc_id"], to) for name, data, to in handler.emits if name == "npc_spawned"]
+    assert sorted(spawned) == [("far", "s0"), ("near", "s0"), ("near", "s1")]
+    assert list(sent(handler, "light_placed")) == ["s0"]
+
+    terrain = sent(handler, "fog_update")["s1"]["terrain"]
+    tiles = decode_rows(terrain)
+    assert (5, 1) in tiles and (7, 1) not in tiles and terrain["chunks"] == []
+
+    client = app.app.test_client()
+    assert client.get("/api/maps/crypt/tiles").status_code == 403
+    token = game_state_manager.get_player("gm").gm_token = "gm-secret"
+    assert client.get("/api/maps/crypt/tiles", headers={"X-Player-Id": "gm", "X-GM-Token": token}).status_code == 200
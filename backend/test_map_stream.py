@@ -0,0 +1,45 @@
+"""Unit tests for prioritized map chunk streaming."""
+
+from features.gameboard import Gameboard, CHUNK_SIZE
+from features.map_stream import MapStreamer, chunk_order
+
+
+def test_chunk_order_starts_at_origin():
+    board = Gameboard("test", width=CHUNK_SIZE * 4, height=CHUNK_SIZE * 4)
+
+    order = chunk_order(board, {"x": CHUNK_SIZE * 3 + 1, "y": 2})
+
+    assert order[0] == (3, 0)
+    assert set(order[1:4]) == {(2, 0), (3, 1), (2, 1)}
+    assert len(order) == 16
+
+
+def test_streams_are_rate_limited_and_complete(fake_sio):
+    board = Gameboard("test", width=CHUNK_SIZE * 3, height=CHUNK_SIZE * 2)
+    sent = []
+    streamer = MapStreamer(fake_sio, send=lambda sid, e, d: sent.append((sid, e, d)),
+                           chunks_per_tick=2)
+
+    streamer.start_map(board, {"a": None, "b": {"x": 0, "y": 0}})
+    assert streamer.tick() == 4
+    assert [s[2]["total"] for s in sent] == [6, 6, 6, 6]
+
+    streamer.tick()
+    streamer.tick()
+    events = [(sid, e) for sid, e, _ in sent]
+    assert events.count(("a", "map_chunk")) == 6
+    assert ("b", "map_stream_complete") in events
+    assert streamer.get_stats()["active_streams"] == 0
+
+
+def test_cancel_stops_stream(fake_sio):
+    board = Gameboard("test", width=CHUNK_SIZE * 2, height=CHUNK_SIZE * 2)
+    sent = []
+    streamer = MapStreamer(fake_sio, send=lambda sid, e, d: sent.append(sid), chunks_per_tick=1)
+
+    streamer.start_map(board, {"a": None})
+    streamer.tick()
+    streamer.cancel("a")
+    streamer.tick()
+
+    assert sent == ["a"]
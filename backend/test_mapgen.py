@@ -0,0 +1,68 @@
+"""Unit tests for procedural map generation."""
+
+import json
+import time
+
+import numpy as np
+import pytest
+
+from features import mapgen
+from features.gameboard import Gameboard
+
+
+@pytest.mark.parametrize("kind", sorted(mapgen.GENERATORS))
+def test_same_seed_same_map(kind):
+    first = mapgen.generate(kind, 96, 64, seed=7)
+    second = mapgen.generate(kind, 96, 64, seed=7)
+    other = mapgen.generate(kind, 96, 64, seed=8)
+
+    assert first["codes"].shape == (64, 96)
+    assert np.array_equal(first["codes"], second["codes"])
+    assert not np.array_equal(first["codes"], other["codes"])
+    obstacle_codes = [code for code, (_, obstacle) in enumerate(mapgen.PALETTE) if obstacle]
+    assert np.array_equal(first["obstacles"], np.isin(first["codes"], obstacle_codes))
+
+
+def test_dungeon_and_cave_are_walled_with_open_floor():
+    for kind in ("dungeon", "cave"):
+        codes = mapgen.generate(kind, 64, 64, seed=3)["codes"]
+        assert (codes[[0, -1], :] == mapgen.WALL).all() and (codes[:, [0, -1]] == mapgen.WALL).all()
+        assert 0.2 < (codes == mapgen.FLOOR).mean() < 0.9
+
+
+def test_large_cave_is_fast():
+    started = time.perf_counter()
+    mapgen.generate("cave", 512, 512, seed=1)
+    assert time.perf_counter() - started < 1.0
+
+
+def test_clean_params():
+    assert mapgen.clean_params("cave", {"fill": "0.5", "iterations": 3}) == {"fill": 0.5, "iterations": 3}
+    with pytest.raises(ValueError):
+        mapgen.clean_params("cave", {"min_leaf": 8})
+    with pytest.raises(ValueError):
+        mapgen.clean_params("outdoor", {"water_level": 2})
+    with pytest.raises(ValueError):
+        mapgen.clean_params("maze", {})
+
+
+def test_apply_layout_writes_board():
+    result = mapgen.generate("outdoor", 40, 30, seed=5)
+    board = Gameboard("wilds", 40, 30)
+    revision = board.revision
+
+    board.apply_layout(result["codes"], result["obstacles"], mapgen.PALETTE)
+
+    assert board.revision == revision + 1
+    assert board.get_tile(7, 9).tile_type == mapgen.PALETTE[result["codes"][9, 7]][0]
+    assert np.array_equal(board.obstacle_grid(), result["obstacles"])
+    assert board.chunk_revision(0, 0) == board.revision
+
+
+def test_worker_save_matches_board_save(tmp_path):
+    result = mapgen.generate_and_save("cave", 40, 30, 5, None, "caves", str(tmp_path / "generated"))
+    board = Gameboard("caves", 40, 30)
+    board.apply_layout(result["codes"], result["obstacles"], mapgen.PALETTE)
+
+    with open(tmp_path / "generated" / "caves.json") as f:
+        assert json.load(f) == board.to_dict()
@@ -0,0 +1,121 @@
+"""Unit tests for memory debugging helpers."""
+
+import functools
+import threading
+
+import pytest
+
+from features.gameboard import Gameboard
+from features.memory_debug import MemoryInspector, deep_size
+
+
+def test_deep_size_counts_shared_objects_once():
+    shared = ["x" * 1000]
+    once = deep_size({"a": shared})
+    twice = deep_size({"a": shared, "b": shared})
+
+    assert once["objects"] < twice["objects"] <= once["objects"] + 2
+    assert twice["bytes"] < once["bytes"] + 1000
+
+
+def test_deep_size_follows_lru_cache_entries():
+    @functools.lru_cache(maxsize=None)
+    def blob(n):
+        return "x" * n
+
+    empty = deep_size(blob)["bytes"]
+    blob(10000)
+
+    assert deep_size(blob)["bytes"] > empty + 10000
+
+
+def test_deep_size_while_another_thread_mutates():
+    shared = {i: [i] for i in range(1000)}
+    done = threading.Event()
+
+    def churn():
+        i = 1000
+        while not done.is_set():
+            shared[i] = [i]
+            shared.pop(i - 1000, None)
+            i += 1
+
+    worker = threading.Thread(target=churn)
+    worker.start()
+    try:
+        for _ in range(50):
+            assert deep_size(shared)["objects"] > 1000
+    finally:
+        done.set()
+        worker.join()
+
+
+def test_sizes_grouped_by_subsystem():
+    inspector = MemoryInspector()
+    boards = {"board": Gameboard("small", 10, 10)}
+    inspector.track("boards", "gameboard", lambda: boards["board"])
+    inspector.track("queues", "missing", lambda: None)
+
+    small = inspector.sizes()["boards"]["bytes"]
+    boards["board"] = Gameboard("large", 40, 40)
+    report = inspector.sizes()
+
+    assert report["boards"]["bytes"] > small * 10
+    assert report["queues"]["items"]["missing"] == {"bytes": 0, "objects": 0}
+
+
+def test_snapshot_diff_shows_growth():
+    inspector = MemoryInspector()
+    with pytest.raises(RuntimeError):
+        inspector.take_snapshot()
+
+    inspector.start_tracing(5)
+    try:
+        before = inspector.take_snapshot("before")
+        leak = [bytearray(10000) for _ in range(50)]
+        after = inspector.take_snapshot("after")
+
+        top = inspector.diff(before["id"], after["id"], limit=1)
+        assert top[0]["size_diff"] >= 500000
+        assert "test_memory_debug.py" in top[0]["traceback"][-1]
+        with pytest.raises(KeyError):
+            inspector.diff(before["id"], 999)
+        assert len(leak) == 50
+    finally:
+        inspector.stop_tracing()
+    assert inspector.tracing_status() == {"tracing": False, "traced_bytes": 0,
+                                          "peak_bytes": 0, "snapshots": []}
+
+
+def test_debug_routes_need_the_gms_token(handler, monkeypatch):
+    import app
+    from features.game_state import game_state_manager
+
+    monkeypatch.setattr(app, "event_handler", handler)
+    game_state_manager.reset_game()
+    handler.on_player_join({"player_id": "gm", "character_name": "GM", "is_gm": True})
+    token = handler.replies[0][1]["gm_token"]
+    client = app.app.test_client()
+
+    assert client.get("/api/debug/memory", headers={"X-Player-Id": "gm"}).status_code == 403
+    assert client.get("/api/debug/memory", headers={"X-Player-Id": "gm", "X-GM-Token": "guess"}).status_code == 403
+    assert client.get("/api/debug/memory", headers={"X-Player-Id": "gm", "X-GM-Token": token}).status_code == 200
+
+
+def test_importing_app_builds_no_event_handler():
+    import app
+
+    assert app.event_handler is None
+
+
+def test_first_client_builds_the_handler_once(make_handler, monkeypatch):
+    import app
+
+    built = []
+    monkeypatch.setattr(app, "event_handler", None)
+    monkeypatch.setattr(app, "WebSocketEventHandler", lambda sio: built.append(make_handler()) or built[-1])
+
+    app.sio.test_client(app.app)
+    assert app.get_event_handler() is built[0] and len(built) == 1
+    assert built[0].replies[0][0] == "response" and len(built[0].connected_sids) == 1
+    assert app.app.test_client().get("/api/stats").status_code == 200
@@ -0,0 +1,61 @@
+"""Unit tests for Prometheus metrics."""
+
+import socketio
+
+from features.metrics import Counter, Histogram, MetricsRegistry, meter_sends, metrics
+
+
+def test_counter_labels():
+    counter = Counter("rpg_test_total", "Test counter", ("event",))
+    counter.inc("move_character")
+    counter.inc("move_character", amount=4)
+    counter.inc("chat_message")
+
+    lines = counter.render()
+
+    assert "# TYPE rpg_test_total counter" in lines
+    assert 'rpg_test_total{event="move_character"} 5' in lines
+    assert 'rpg_test_total{event="chat_message"} 1' in lines
+
+
+def test_histogram_buckets_are_cumulative():
+    histogram = Histogram("rpg_test_seconds", "Test histogram", (0.1, 1.0), ("event",))
+    for value in (0.05, 0.5, 0.5, 5.0):
+        histogram.observe(value, "echo")
+
+    lines = histogram.render()
+
+    assert 'rpg_test_seconds_bucket{event="echo",le="0.1"} 1' in lines
+    assert 'rpg_test_seconds_bucket{event="echo",le="1.0"} 3' in lines
+    assert 'rpg_test_seconds_bucket{event="echo",le="+Inf"} 4' in lines
+    assert 'rpg_test_seconds_count{event="echo"} 4' in lines
+
+
+def test_registry_render_includes_collectors():
+    registry = MetricsRegistry()
+    registry.add_collector("extra", lambda: ["rpg_extra 1"])
+    registry.add_collector("extra", lambda: ["rpg_extra 2"])
+
+    text = registry.render()
+
+    assert "rpg_process_peak_rss_bytes" in text
+    assert "rpg_extra 2" in text and "rpg_extra 1" not in text
+
+
+def test_sends_are_metered_per_recipient_in_utf8_bytes():
+    server = socketio.Server()
+    server.eio.send = server.eio.send_packet = lambda *args: None
+    meter_sends(server)
+    for eio_sid in ("e1", "e2", "e3"):
+        server.manager.connect(eio_sid, "/")
+    cells = lambda: [counter.cells.get(("metered_test",), [0])[0]
+                     for counter in (metrics.emitted_packets, metrics.emitted_bytes)]
+    packets, size = cells()
+    encoded = server.packet_class(socketio.packet.EVENT, data=["metered_test", {"name": "Éowyn"}]).encode()
+
+    server.emit("metered_test", {"name": "Éowyn"})
+
+    assert cells() == [packets + 3, size + 3 * len(encoded.encode())]
+    sid = server.manager.sid_from_eio_sid("e1", "/")
+    server.emit("metered_test", {"name": "Éowyn"}, to=sid)
+    assert cells() == [packets + 4, size + 4 * len(encoded.encode())]
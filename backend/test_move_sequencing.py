@@ -0,0 +1,67 @@
+"""Unit tests for sequenced move acks."""
+
+from flask import request
+
+from features.game_state import game_state_manager
+
+
+def setup_function():
+    game_state_manager.reset_game()
+    game_state_manager.add_player("p1", "c1", "Aragorn", sid="sid_1")
+
+
+def test_sequenced_move_is_acked_and_excludes_mover(handler):
+    handler.on_move_character({"player_id": "p1", "x": 4, "y": 5, "seq": 7})
+
+    assert handler.replies == [("move_ack", {"seq": 7, "accepted": True, "position": {"x": 4, "y": 5}})]
+    event_name, data, exclude = handler.broadcasts[0]
+    assert event_name == "character_moved" and exclude == "sid_1"
+    assert game_state_manager.get_player("p1").last_move_seq == 7
+
+
+def test_rejected_sequenced_move_returns_authoritative_position(handler):
+    game_state_manager.initialize_gameboard("arena", 10, 10)
+
+    handler.on_move_character({"player_id": "p1", "x": 40, "y": 5, "seq": 8})
+
+    event_name, ack = handler.replies[0]
+    assert event_name == "move_ack"
+    assert ack["accepted"] is False and ack["position"] == {"x": 0, "y": 0}
+    assert handler.broadcasts == []
+
+
+def test_unsequenced_move_keeps_legacy_broadcast(handler):
+    handler.on_move_character({"player_id": "p1", "x": 1, "y": 1})
+
+    assert handler.replies == []
+    assert handler.broadcasts[0][2] is None
+
+
+def test_coalesced_sequenced_move_skips_the_mover(make_handler):
+    handler = make_handler(BROADCAST_TICK_HZ=0.01)
+    game_state_manager.add_player("p2", "c2", "Legolas", sid="sid_2")
+    handler.connected_sids.update({"sid_1", "sid_2"})
+
+    handler.on_move_character({"player_id": "p1", "x": 4, "y": 5, "seq": 1})
+    request.sid = "sid_2"
+    handler.on_move_character({"player_id": "p2", "x": 6, "y": 5})
+    handler.move_coalescer.tick()
+
+    sent = {to: [p["player_id"] for p in data["positions"]]
+            for name, data, to in handler.emits if name == "positions_update"}
+    assert sent == {"sid_1": ["p2"], "sid_2": ["p1", "p2"]}
+
+
+def test_throttled_sequenced_move_is_rejected_with_position(make_handler):
+    handler = make_handler(RATE_LIMIT_ENABLED=True, RATE_LIMITS="move_character=1/1", GAME_RATE_LIMITS="")
+    move = handler.wrap_handler("move_character", handler.on_move_character)
+
+    move({"player_id": "p1", "x": 1, "y": 1, "seq": 1})
+    move({"player_id": "p1", "x": 2, "y": 1, "seq": 2})
+    move({"player_id": "p1", "x": 3, "y": 1})
+
+    (_, first), (_, throttled), (event_name, _) = handler.replies
+    assert first["accepted"] is True
+    assert throttled["seq"] == 2 and throttled["accepted"] is False
+    assert throttled["reason"] == "Rate limited" and throttled["position"] == {"x": 1, "y": 1}
+    assert event_name == "rate_limited"
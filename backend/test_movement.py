@@ -0,0 +1,76 @@
+"""Unit tests for movement range computation and caching."""
+
+from features.gameboard import Gameboard
+from features.movement import ReachabilityCache, cost_grid, decode_mask, encode_mask, reachable
+
+
+def test_terrain_costs_and_obstacles():
+    board = Gameboard("field", 10, 10)
+    board.set_tile(3, 2, "water")
+    for y in range(10):
+        if y != 8:
+            board.set_tile(5, y, "wall", True)
+    costs = cost_grid(board)
+
+    best = reachable(costs, (2, 2), 2)
+
+    assert best[(3, 2)] == 2 and best[(4, 2)] == 2
+    assert (4, 3) in best and (5, 2) not in best
+    assert all(x < 5 for x, _ in reachable(costs, (2, 2), 5))
+    assert (6, 8) in reachable(costs, (2, 2), 7)
+
+
+def test_tokens_block_and_diagonals_cannot_squeeze():
+    board = Gameboard("corner", 5, 5)
+    board.set_tile(1, 0, "wall", True)
+    board.set_tile(0, 1, "wall", True)
+
+    assert set(reachable(cost_grid(board), (0, 0), 3)) == {(0, 0)}
+    assert (2, 2) not in reachable(cost_grid(Gameboard("open", 5, 5)), (2, 1), 1, blocked=[(2, 2)])
+
+
+def test_mask_round_trip():
+    tiles = {(3, 4), (4, 4), (5, 6), (12, 5)}
+    encoded = encode_mask(tiles)
+
+    assert (encoded["x0"], encoded["y0"], encoded["x1"], encoded["y1"]) == (3, 4, 13, 7)
+    assert decode_mask(encoded) == tiles
+
+
+def test_cache_reuses_until_move_turn_or_nearby_edit():
+    board = Gameboard("cached", 64, 64)
+    cache = ReachabilityCache()
+    tokens = {"hero": {"x": 5, "y": 5}, "far": {"x": 60, "y": 60}}
+
+    first = cache.get(board, "hero", tokens["hero"], 30, turn=1, tokens=tokens)
+    tokens["far"] = {"x": 61, "y": 60}
+    board.set_tile(50, 50, "wall", True)
+    assert cache.get(board, "hero", tokens["hero"], 30, turn=1, tokens=tokens) is first
+    assert cache.hits == 1
+
+    board.set_tile(6, 6, "wall", True)
+    edited = cache.get(board, "hero", tokens["hero"], 30, turn=1, tokens=tokens)
+    assert edited is not first and (6, 6) not in decode_mask(edited)
+
+    tokens["far"] = {"x": 7, "y": 5}
+    assert (7, 5) not in decode_mask(cache.get(board, "hero", tokens["hero"], 30, turn=1, tokens=tokens))
+    cache.get(board, "hero", tokens["hero"], 30, turn=2, tokens=tokens)
+    assert cache.misses == 4
+
+
+def test_request_reach_event_uses_player_token(handler):
+    from features.game_state import game_state_manager
+
+    game_state_manager.reset_game()
+    game_state_manager.add_player("p1", "c1", "Aragorn")
+    game_state_manager.add_player("p2", "c2", "Legolas")
+    game_state_manager.update_player_position("p1", 2, 2)
+    game_state_manager.initialize_gameboard("arena", 10, 10, board=Gameboard("arena", 10, 10))
+
+    handler.on_request_reach({"player_id": "p1", "speed": 10})
+    handler.on_request_reach({"player_id": "p1", "token_id": "p2"})
+
+    (event_name, reach), (error_name, _) = handler.replies
+    assert event_name == "reach" and reach["token_id"] == "p1"
+    assert len(decode_mask(reach)) == 24 and (0, 0) not in decode_mask(reach)  # p2 stands there
+    assert error_name == "error"
@@ -0,0 +1,83 @@
+"""Unit tests for the batched NPC simulation."""
+
+import numpy as np
+
+from features.gameboard import Gameboard
+from features.npc_sim import NPCPool, NPCScheduler, step_npcs
+
+
+def no_players():
+    return np.empty((0, 2), dtype=np.int32)
+
+
+def test_pool_grows_and_swap_removes():
+    pool = NPCPool(capacity=2)
+    for i in range(5):
+        pool.add(f"n{i}", f"Goblin {i}", i, 0)
+
+    assert pool.count == 5 and len(pool.x) >= 5
+    assert pool.remove("n1") and not pool.remove("n1")
+    assert pool.ids == ["n0", "n4", "n2", "n3"]
+    assert pool.positions()["n4"] == {"x": 4, "y": 0}
+
+
+def test_patrol_walks_between_waypoints():
+    pool = NPCPool()
+    pool.add("guard", "Guard", 0, 0, behaviour="patrol", patrol_to={"x": 2, "y": 0}, speed=1)
+    obstacles = np.zeros((5, 5), dtype=bool)
+
+    path = []
+    for _ in range(5):
+        step_npcs(pool, 1.0, obstacles, no_players())
+        path.append(int(pool.x[0]))
+
+    assert path == [1, 2, 1, 0, 1]
+
+
+def test_chase_flee_and_blocking():
+    pool = NPCPool()
+    pool.add("wolf", "Wolf", 0, 0, behaviour="chase", speed=1)
+    pool.add("rabbit", "Rabbit", 6, 4, behaviour="flee", speed=1)
+    pool.add("slow", "Snail", 9, 9, behaviour="chase", speed=0.5, sight=20)
+    obstacles = np.zeros((10, 10), dtype=bool)
+    obstacles[1, 1] = True
+    players = np.array([[4, 4]], dtype=np.int32)
+
+    moved = step_npcs(pool, 1.0, obstacles, players)
+
+    assert pool.positions()["wolf"] in ({"x": 1, "y": 0}, {"x": 0, "y": 1})
+    assert pool.positions()["rabbit"] == {"x": 7, "y": 4}
+    assert pool.positions()["slow"] == {"x": 9, "y": 9}
+    assert sorted(pool.ids[i] for i in moved) == ["rabbit", "wolf"]
+
+    for _ in range(10):
+        step_npcs(pool, 1.0, obstacles, players)
+    wolf = pool.positions()["wolf"]
+    assert max(abs(wolf["x"] - 4), abs(wolf["y"] - 4)) == 1
+
+
+def test_two_npcs_never_share_a_tile():
+    pool = NPCPool()
+    pool.add("a", "A", 0, 1, behaviour="chase", speed=1)
+    pool.add("b", "B", 2, 1, behaviour="chase", speed=1)
+    players = np.array([[1, 4]], dtype=np.int32)
+
+    step_npcs(pool, 1.0, np.zeros((5, 5), dtype=bool), players)
+
+    assert pool.positions()["a"] != pool.positions()["b"]
+
+
+def test_scheduler_flushes_one_payload_per_tick():
+    pool = NPCPool()
+    for i in range(300):
+        pool.add(f"n{i}", "Bat", i % 50, i // 50 * 2, behaviour="patrol",
+                 patrol_to={"x": i % 50, "y": i // 50 * 2 + 1}, speed=5)
+    board = Gameboard("cave", 50, 50)
+    flushed = []
+    scheduler = NPCScheduler(None, 5, lambda: pool, lambda: board,
+                             lambda: [{"x": 25, "y": 40}], flushed.append)
+
+    payload = scheduler.tick()
+
+    assert flushed == [payload] and len(payload["npcs"]) == 300
+    assert scheduler.get_stats()["npcs"] == 300
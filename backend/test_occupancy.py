@@ -0,0 +1,99 @@
+"""Unit tests for the occupancy grid and move blocking."""
+
+import pytest
+
+from features.game_state import game_state_manager
+from features.gameboard import Gameboard
+from features.movement import ReachabilityCache, decode_mask
+from features.npc_sim import NPCScheduler
+from features.occupancy import OccupancyGrid
+
+
+def setup_function():
+    game_state_manager.reset_game()
+    game_state_manager.add_player("p1", "c1", "Aragorn", sid="sid_1")
+    game_state_manager.add_player("p2", "c2", "Legolas", sid="sid_2")
+    game_state_manager.add_player("gm", "c0", "GM", is_gm=True)
+    game_state_manager.initialize_gameboard("arena", 10, 10, board=Gameboard("arena", 10, 10))
+
+
+def test_grid_queries_and_shared_spawn():
+    grid = OccupancyGrid(5, 5)
+    grid.place("a", 0, 0)
+    grid.place("b", 0, 0)
+    grid.place("c", 9, 9)
+
+    assert grid.occupants(0, 0) == ["a", "b"] and grid.occupant(0, 0) == "a"
+    assert grid.get_stats()["tokens"] == 2 and "c" not in grid.where
+    assert not grid.move("a", 0, 0) and grid.move("a", 1, 0)
+    assert not grid.move("b", 1, 0) and grid.move("b", 2, 2)
+    assert not grid.is_occupied(0, 0) and grid.counts.sum() == 2
+    assert grid.cells_in((0, 0, 2, 2)) == [(1, 0)]
+    assert grid.check({"a": {"x": 1, "y": 0}, "b": {"x": 2, "y": 2}}) == []
+    assert len(grid.check({"a": {"x": 1, "y": 1}})) == 2
+
+
+def test_move_onto_occupied_tile_is_rejected(handler):
+    handler.on_move_character({"player_id": "p2", "x": 3, "y": 3})
+
+    handler.on_move_character({"player_id": "p1", "x": 3, "y": 3, "seq": 1})
+    handler.on_move_character({"player_id": "gm", "x": 3, "y": 3})
+
+    assert handler.replies == [("move_ack", {"seq": 1, "accepted": False, "reason": "Tile is occupied",
+                                             "position": {"x": 0, "y": 0}})]
+    assert game_state_manager.occupancy.occupants(3, 3) == ["p2"]
+    assert game_state_manager.check_occupancy() == []
+
+
+def test_npcs_and_objects_stay_in_lockstep():
+    game_state_manager.add_npc({"id": "orc", "x": 5, "y": 0, "behaviour": "patrol",
+                                "patrol_to": {"x": 5, "y": 4}, "speed": 1})
+    game_state_manager.add_gameboard_object({"id": "crate", "x": 5, "y": 2})
+    game_state_manager.add_gameboard_object({"id": "rug", "x": 6, "y": 2, "blocking": False})
+    board = game_state_manager.gameboard.board
+    scheduler = NPCScheduler(None, 1, lambda: game_state_manager.npcs, lambda: board,
+                             lambda: [], lambda payload: None, lambda: game_state_manager.occupancy)
+
+    for _ in range(3):
+        scheduler.tick()
+
+    occupancy = game_state_manager.occupancy
+    assert occupancy.occupant(5, 2) == "crate" and not occupancy.is_occupied(6, 2)
+    assert occupancy.where["orc"] != (5, 2)
+    assert game_state_manager.check_occupancy() == []
+    game_state_manager.remove_npc("orc")
+    game_state_manager.remove_player("p2")
+    assert set(occupancy.where) == {"p1", "crate"}
+
+
+def test_reach_uses_grid_blockers():
+    game_state_manager.update_player_position("p1", 2, 2)
+    game_state_manager.add_gameboard_object({"id": "pillar", "x": 3, "y": 2})
+    cache = ReachabilityCache()
+
+    reach = cache.get(game_state_manager.gameboard.board, "p1", {"x": 2, "y": 2}, 5,
+                      occupancy=game_state_manager.occupancy)
+
+    assert (3, 2) not in decode_mask(reach) and (1, 2) in decode_mask(reach)
+
+
+def test_float_move_is_rejected_and_grid_stays_consistent(handler):
+    handler.on_move_character({"player_id": "p1", "x": 2, "y": 2})
+
+    handler.on_move_character({"player_id": "p1", "x": 2.5, "y": 2})
+    handler.on_move_character({"player_id": "p1", "x": "3", "y": 2, "seq": 4})
+
+    assert handler.replies[0] == ("error", {"message": "Invalid movement data"})
+    assert handler.replies[1][1]["accepted"] is False
+    grid = game_state_manager.occupancy
+    assert grid.where["p1"] == (2, 2) and list(grid.cells) == [(0, 0), (2, 2)]
+    assert grid.check({"p1": {"x": 2, "y": 2}, "p2": {"x": 0, "y": 0}}) == []
+
+
+def test_take_leaves_grid_untouched_on_a_bad_cell():
+    grid = OccupancyGrid(5, 5)
+
+    with pytest.raises(IndexError):
+        grid._take("a", (2.5, 1))
+
+    assert grid.cells == {} and grid.where == {} and grid.counts.sum() == 0
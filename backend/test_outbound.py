@@ -0,0 +1,80 @@
+"""Unit tests for per-connection outbound queues."""
+
+import pytest
+
+from features.game_state import game_state_manager
+from features.outbound import OutboundQueueManager
+
+
+@pytest.fixture
+def make_manager(fake_sio):
+    def make(backlogs, sent, disconnected, max_depth=4):
+        return OutboundQueueManager(
+            fake_sio,
+            send=lambda sid, event, data: sent.append((sid, event, data)),
+            backlog=lambda sid: backlogs.get(sid, 0),
+            disconnect=disconnected.append,
+            max_depth=max_depth,
+            transport_window=2
+        )
+    return make
+
+
+def test_fast_consumer_is_sent_immediately(make_manager):
+    sent, disconnected = [], []
+    manager = make_manager({}, sent, disconnected)
+
+    manager.enqueue("fast", "chat_message", {"text": "hi"})
+
+    assert sent == [("fast", "chat_message", {"text": "hi"})]
+    assert manager.get_stats()["total_depth"] == 0
+
+
+def test_slow_consumer_gets_superseded_updates_collapsed(make_manager):
+    sent, disconnected = [], []
+    backlogs = {"slow": 5}
+    manager = make_manager(backlogs, sent, disconnected)
+
+    for x in range(10):
+        manager.enqueue("slow", "character_moved", {"player_id": "p1", "new_position": {"x": x, "y": 0}})
+    manager.enqueue("slow", "game_state_update", {"state": 1})
+    manager.enqueue("slow", "game_state_update", {"state": 2})
+
+    stats = manager.get_stats()["sessions"]["slow"]
+    assert stats["depth"] == 2
+    assert stats["superseded"] == 10
+
+    backlogs["slow"] = 0
+    manager.drain()
+    assert [(e, d.get("new_position", d.get("state"))) for _, e, d in sent] == [
+        ("character_moved", {"x": 9, "y": 0}),
+        ("game_state_update", 2)
+    ]
+
+
+def test_queue_past_watermark_disconnects(make_manager):
+    sent, disconnected = [], []
+    manager = make_manager({"slow": 5}, sent, disconnected, max_depth=3)
+
+    for i in range(4):
+        manager.enqueue("slow", "chat_message", {"text": str(i)})
+
+    assert disconnected == ["slow"]
+    assert manager.get_stats()["slow_disconnects"] == 1
+    assert "slow" not in manager.get_stats()["sessions"]
+
+
+def test_stale_snapshot_for_slow_client_is_superseded(make_handler):
+    handler = make_handler(OUTBOUND_QUEUES_ENABLED=True)
+    handler.outbound.backlog = lambda sid: 100
+    handler.outbound.start = lambda: None
+    game_state_manager.reset_game()
+    game_state_manager.add_player("p1", "c1", "Aragorn", sid="sid_1")
+
+    handler.send_current_game_state("p1")
+    game_state_manager.update_player_position("p1", 3, 4)
+    handler.send_current_game_state("p1")
+
+    queue = handler.outbound.queues["sid_1"]
+    assert queue.superseded == 1 and len(queue.messages) == 1
+    assert queue.messages[0][2]["state"]["players"][0]["position"] == {"x": 3, "y": 4}
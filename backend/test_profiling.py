@@ -0,0 +1,50 @@
+"""Unit tests for runtime handler profiling."""
+
+import os
+import pstats
+
+from features.profiling import HandlerProfiler
+
+
+def test_inactive_wrapper_passes_through(tmp_path, threaded_sio):
+    profiler = HandlerProfiler(threaded_sio, str(tmp_path))
+    handler = profiler.instrument("echo", lambda data: data["x"] * 2)
+
+    assert handler({"x": 2}) == 4
+    assert not profiler.active
+    assert profiler.get_stats()["timings"] == {}
+
+
+def test_sampling_and_slow_log(tmp_path, threaded_sio):
+    profiler = HandlerProfiler(threaded_sio, str(tmp_path))
+    profiler.configure(sample_rate=1.0, slow_ms=0.000001)
+    handler = profiler.instrument("echo", lambda: None)
+
+    for _ in range(3):
+        handler()
+
+    stats = profiler.get_stats()
+    assert stats["timings"]["echo"]["samples"] == 3
+    assert len(stats["slow_calls"]) == 3
+
+    profiler.configure(sample_rate=0, slow_ms=0)
+    profiler.reset()
+    assert not profiler.active
+    assert profiler.get_stats()["slow_calls"] == []
+
+
+def test_capture_writes_pstats(tmp_path, threaded_sio):
+    profiler = HandlerProfiler(threaded_sio, str(tmp_path))
+    handler = profiler.instrument("echo", lambda: sum(range(100)))
+
+    assert profiler.start_capture(0.05)
+    assert not profiler.start_capture(0.05)
+    handler()
+    handler()
+    threaded_sio.threads[0].join()
+
+    capture = profiler.last_capture
+    assert capture["calls"] == 2
+    assert os.path.exists(capture["path"])
+    assert pstats.Stats(capture["path"]).total_calls > 0
+    assert not profiler.active
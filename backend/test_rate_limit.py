@@ -0,0 +1,73 @@
+"""Unit tests for token-bucket rate limiting."""
+
+import time
+
+import pytest
+
+from features.rate_limit import RateLimiter, parse_limits
+
+
+def test_parse_limits():
+    assert parse_limits("move_character=20/40, chat_message=2") == {
+        "move_character": (20.0, 40.0),
+        "chat_message": (2.0, 2.0)
+    }
+    assert parse_limits("") == {}
+
+
+def test_client_burst_then_throttle():
+    limiter = RateLimiter({"chat_message": (1, 3)})
+
+    results = [limiter.check("sid_a", "chat_message") for _ in range(4)]
+
+    assert results[:3] == [None, None, None]
+    assert results[3] is not None and results[3] > 0
+    # Other clients have their own bucket
+    assert limiter.check("sid_b", "chat_message") is None
+    assert limiter.get_stats()["throttled"] == {"chat_message": 1}
+
+
+def test_game_limit_applies_across_clients():
+    limiter = RateLimiter({}, {"move_character": (1, 2)})
+
+    assert limiter.check("sid_a", "move_character") is None
+    assert limiter.check("sid_b", "move_character") is None
+    assert limiter.check("sid_c", "move_character") is not None
+
+
+def test_tokens_refill_over_time():
+    limiter = RateLimiter({"echo": (50, 1)})
+
+    assert limiter.check("sid_a", "echo") is None
+    assert limiter.check("sid_a", "echo") is not None
+    time.sleep(0.05)
+    assert limiter.check("sid_a", "echo") is None
+
+
+def test_unlimited_events_and_removal():
+    limiter = RateLimiter({"echo": (1, 1)})
+
+    assert not limiter.is_limited("player_join")
+    limiter.check("sid_a", "echo")
+    limiter.remove("sid_a")
+    assert limiter.get_stats()["tracked_clients"] == 0
+
+
+def test_parse_limits_rejects_limits_that_never_admit():
+    for spec in ("echo=0/5", "echo=-1/5", "echo=5/0.5", "echo=0.2", "echo", "=1/1"):
+        with pytest.raises(ValueError):
+            parse_limits(spec)
+
+
+def test_buckets_follow_the_player_across_sids():
+    limiter = RateLimiter({"chat_message": (0.001, 2)})
+    limiter.check("sid_a", "chat_message")
+    limiter.bind("sid_a", "p1")
+    assert limiter.check("sid_a", "chat_message") is None
+
+    limiter.remove("sid_a")
+    limiter.bind("sid_b", "p1")
+    assert limiter.check("sid_b", "chat_message") is not None
+
+    limiter.forget("p1")
+    assert limiter.check("sid_b", "chat_message") is None
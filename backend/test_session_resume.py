@@ -0,0 +1,131 @@
+"""Unit tests for session resume tokens and the event journal."""
+
+import time
+
+from flask import request
+
+from features.game_state import game_state_manager
+from features.gameboard import Gameboard
+from features.session_resume import EventJournal, ResumeManager
+
+
+def test_journal_returns_only_missed_events():
+    journal = EventJournal(maxlen=10)
+    journal.record("chat_message", {"text": "before"})
+    mark = journal.last_id
+    journal.record("character_moved", {"player_id": "p2"})
+    journal.record("chat_message", {"text": "after"})
+
+    missed = journal.since(mark)
+
+    assert [e["event"] for e in missed] == ["character_moved", "chat_message"]
+    assert journal.since(journal.last_id) == []
+
+
+def test_journal_reports_gap_after_eviction():
+    journal = EventJournal(maxlen=2)
+    for i in range(5):
+        journal.record("chat_message", {"text": str(i)})
+
+    assert journal.since(1) is None
+    assert len(journal.since(3)) == 2
+
+
+def test_tokens_are_per_player_and_revocable():
+    resume = ResumeManager(grace_seconds=30)
+    first = resume.issue("p1")
+    second = resume.issue("p1")
+
+    assert resume.lookup(first) is None
+    assert resume.lookup(second) == "p1"
+    assert resume.lookup(None) is None
+
+    resume.revoke("p1")
+    assert resume.lookup(second) is None
+
+
+def test_resume_restores_spectator_override(make_handler):
+    handler = make_handler(SESSION_GRACE_SECONDS=30, AOI_ENABLED=True)
+    game_state_manager.reset_game()
+    handler.on_player_join({"player_id": "watcher", "character_name": "Watcher", "is_spectator": True})
+    token = handler.replies[0][1]["resume_token"]
+    handler.on_disconnect()
+
+    request.sid = "sid_2"
+    handler.on_resume_session({"resume_token": token})
+
+    assert handler.replies[-1][0] == "session_resumed"
+    assert handler.interest.overrides == {"sid_2"}
+
+
+def test_resume_before_drop_is_noticed_replays_from_client_and_retires_old_sid(make_handler):
+    handler = make_handler(SESSION_GRACE_SECONDS=30)
+    game_state_manager.reset_game()
+    handler.on_player_join({"player_id": "p1", "character_name": "Aragorn"})
+    token = handler.replies[0][1]["resume_token"]
+    handler.broadcast_event("chat_message", {"text": "seen"})
+    seen = handler.broadcasts[-1][1]["event_id"]
+    handler.broadcast_event("chat_message", {"text": "missed"})
+
+    request.sid = "sid_2"
+    handler.on_resume_session({"resume_token": token, "last_event_id": seen})
+    request.sid = "sid_1"
+    handler.on_disconnect()
+
+    resumed = handler.replies[-1][1]
+    assert [e["data"]["text"] for e in resumed["missed_events"]] == ["missed"]
+    assert game_state_manager.get_player("p1").sid == "sid_2"
+    assert not any(name == "player_left" for name, _, _ in handler.broadcasts)
+
+
+def test_resume_without_last_event_id_before_drop_gets_snapshot(make_handler):
+    handler = make_handler(SESSION_GRACE_SECONDS=30)
+    game_state_manager.reset_game()
+    handler.on_player_join({"player_id": "p1", "character_name": "Aragorn"})
+    token = handler.replies[0][1]["resume_token"]
+
+    request.sid = "sid_2"
+    handler.on_resume_session({"resume_token": token})
+
+    resumed = handler.replies[-1][1]
+    assert resumed["missed_events"] is None and "players" in resumed["state"]
+
+
+def test_replay_is_filtered_like_the_original_broadcast(make_handler):
+    handler = make_handler(SESSION_GRACE_SECONDS=30, AOI_ENABLED=True, AOI_CELL_SIZE=4, AOI_RADIUS_CELLS=1)
+    game_state_manager.reset_game()
+    handler.on_player_join({"player_id": "p1", "character_name": "Aragorn"})
+    token = handler.replies[0][1]["resume_token"]
+    mark = handler.replies[0][1]["last_event_id"]
+    handler.on_move_character({"player_id": "p1", "x": 1, "y": 1, "seq": 1})
+    handler.on_disconnect()
+
+    handler.broadcast_event("character_moved", {"id": "near"}, origins=[{"x": 2, "y": 2}])
+    handler.broadcast_event("character_moved", {"id": "far"}, origins=[{"x": 40, "y": 40}])
+    handler.broadcast_positions({"tick": 1, "positions": [
+        {"player_id": "p2", "position": {"x": 3, "y": 0}},
+        {"player_id": "p3", "position": {"x": 30, "y": 0}}
+    ]})
+    request.sid = "sid_2"
+    handler.on_resume_session({"resume_token": token, "last_event_id": mark})
+
+    missed = handler.replies[-1][1]["missed_events"]
+    assert [e["data"].get("id") for e in missed] == ["near", None]
+    assert [p["player_id"] for p in missed[1]["data"]["positions"]] == ["p2"]
+
+
+def test_resume_restarts_map_stream(make_handler):
+    handler = make_handler(SESSION_GRACE_SECONDS=30, MAP_STREAM_ENABLED=True)
+    game_state_manager.reset_game()
+    handler.on_player_join({"player_id": "p1", "character_name": "Aragorn"})
+    token = handler.replies[0][1]["resume_token"]
+    handler.activate_map(Gameboard("arena", 10, 10))
+    handler.on_disconnect()
+
+    request.sid = "sid_2"
+    handler.on_resume_session({"resume_token": token})
+
+    deadline = time.time() + 2
+    while ("map_stream_complete", "sid_2") not in [(e, to) for e, _, to in handler.emits] and time.time() < deadline:
+        time.sleep(0.01)
+    assert ("map_chunk", "sid_2") in [(e, to) for e, _, to in handler.emits]
@@ -0,0 +1,52 @@
+"""Unit tests for fingerprinted static assets."""
+
+from flask import Flask, request
+
+from features.static_assets import StaticAssets
+
+
+def make_app(tmp_path):
+    static_dir = tmp_path / "static"
+    (static_dir / "js").mkdir(parents=True)
+    (static_dir / "js" / "main.js").write_text("console.log('hello');\n" * 200)
+    app = Flask(__name__, static_folder=str(static_dir))
+    assets = StaticAssets(str(static_dir))
+
+    @app.route("/assets/<path:filename>")
+    def fingerprinted_asset(filename):
+        return assets.response(filename, request) or ("", 404)
+
+    return app, assets
+
+
+def test_url_is_content_hashed(tmp_path):
+    app, assets = make_app(tmp_path)
+    with app.test_request_context():
+        url = assets.url("js/main.js")
+        assert url.startswith("/assets/js/main.") and url.endswith(".js")
+        assert assets.url("missing.js") == "/static/missing.js"
+
+
+def test_serves_gzip_with_immutable_caching(tmp_path):
+    app, assets = make_app(tmp_path)
+    with app.test_request_context():
+        url = assets.url("js/main.js")
+    client = app.test_client()
+
+    response = client.get(url, headers={"Accept-Encoding": "gzip"})
+    assert response.status_code == 200
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert "immutable" in response.headers["Cache-Control"]
+
+    revalidated = client.get(url, headers={"Accept-Encoding": "gzip",
+                                           "If-None-Match": response.headers["ETag"]})
+    assert revalidated.status_code == 304
+
+    plain = client.get(url)
+    assert "Content-Encoding" not in plain.headers
+    assert plain.data.startswith(b"console.log")
+
+
+def test_unknown_fingerprint_is_not_found(tmp_path):
+    app, _ = make_app(tmp_path)
+    assert app.test_client().get("/assets/js/main.000000000000.js").status_code == 404
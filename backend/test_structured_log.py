@@ -0,0 +1,60 @@
+"""Unit tests for queued structured logging."""
+
+import json
+import logging
+
+import pytest
+
+from features.structured_log import (
+    EventLogger, JsonLineFormatter, _Sampler, parse_levels, parse_rates
+)
+
+
+class CaptureHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+
+def test_parse_specs():
+    assert parse_levels("move_character=debug, echo=WARNING") == {
+        "move_character": logging.DEBUG, "echo": logging.WARNING
+    }
+    assert parse_rates("move_character=5") == {"move_character": 5.0}
+
+
+def test_parse_levels_rejects_unknown_names():
+    with pytest.raises(ValueError, match="VERBOSE"):
+        parse_levels("echo=VERBOSE")
+
+
+def test_sampler_reports_suppressed_count():
+    sampler = _Sampler(limit=2)
+
+    assert sampler.admit(100.0) == 0
+    assert sampler.admit(100.1) == 0
+    assert sampler.admit(100.2) is None
+    assert sampler.admit(100.3) is None
+    assert sampler.admit(101.5) == 2
+
+
+def test_event_logger_levels_sampling_and_json_output():
+    logger = EventLogger("test_capture")
+    logger.levels = {"echo": logging.DEBUG}
+    logger.samplers = {"move_character": _Sampler(limit=1)}
+    capture = CaptureHandler()
+    logger.logger.addHandler(capture)
+    logger.logger.setLevel(logging.INFO)
+
+    logger.event("echo", "filtered by level")
+    logger.event("move_character", "kept", player_id="p1")
+    logger.event("move_character", "sampled out", player_id="p1")
+
+    assert [r.getMessage() for r in capture.records] == ["kept"]
+    line = json.loads(JsonLineFormatter().format(capture.records[0]))
+    assert line["event"] == "move_character"
+    assert line["player_id"] == "p1"
+    assert line["level"] == "INFO"
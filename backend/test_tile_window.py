@@ -0,0 +1,52 @@
+"""Unit tests for tile window encoding."""
+
+from features.gameboard import Gameboard, CHUNK_SIZE
+from features.tile_window import (
+    clamp_window, chunks_in_window, encode_window, decode_rows, window_etag
+)
+
+
+def make_board():
+    board = Gameboard("test", width=40, height=30)
+    for x in range(5, 20):
+        board.set_tile(x, 3, "wall", True)
+    board.set_tile(7, 7, "water")
+    return board
+
+
+def test_clamp_window():
+    board = make_board()
+    assert clamp_window(board, -5, -5, 100, 100) == (0, 0, 40, 30)
+    assert clamp_window(board, 50, 0, 60, 10) is None
+
+
+def test_chunks_in_window():
+    assert chunks_in_window((0, 0, CHUNK_SIZE, CHUNK_SIZE)) == [(0, 0)]
+    assert chunks_in_window((CHUNK_SIZE - 1, 0, CHUNK_SIZE + 1, 1)) == [(0, 0), (1, 0)]
+
+
+def test_encode_round_trip():
+    board = make_board()
+    window = clamp_window(board, 2, 2, 25, 10)
+
+    encoded = encode_window(board, window)
+    tiles = decode_rows(encoded)
+
+    assert len(tiles) == 23 * 8
+    assert tiles[(5, 3)] == ("wall", True)
+    assert tiles[(7, 7)] == ("water", False)
+    assert tiles[(2, 2)] == ("empty", False)
+    # Uniform rows collapse to a single run
+    assert encoded["rows"][0] == [encoded["palette"].index(["empty", False]), 23]
+
+
+def test_etag_only_changes_for_edits_inside_window():
+    board = make_board()
+    window = (0, 0, 16, 16)
+    etag = window_etag(board, window)
+
+    board.set_tile(35, 25, "grass")
+    assert window_etag(board, window) == etag
+
+    board.set_tile(1, 1, "grass")
+    assert window_etag(board, window) != etag
@@ -0,0 +1,40 @@
+"""Unit tests for the negotiated msgpack wire codec."""
+
+import json
+
+import pytest
+
+from features import wire_codec
+
+pytestmark = pytest.mark.skipif(not wire_codec.available(), reason="msgpack not installed")
+
+
+def test_negotiation_defaults_to_json():
+    assert wire_codec.negotiate(None) == wire_codec.JSON
+    assert wire_codec.negotiate({"codec": "cbor"}) == wire_codec.JSON
+    assert wire_codec.negotiate({"codec": "msgpack"}) == wire_codec.MSGPACK
+
+
+def test_character_moved_roundtrip_is_smaller_than_json():
+    data = {
+        "player_id": "player_1",
+        "character_name": "Aragorn",
+        "old_position": {"x": 10, "y": 8},
+        "new_position": {"x": 11, "y": 8},
+        "timestamp": 1700000000.123
+    }
+    encoded = wire_codec.encode("character_moved", data)
+
+    assert len(encoded) < len(json.dumps(data))
+    assert wire_codec.decode("character_moved", encoded) == data
+
+
+def test_positions_update_roundtrip():
+    data = {
+        "positions": [{"player_id": "p1", "character_name": "A", "position": {"x": 1, "y": 2}}],
+        "tick": 7,
+        "timestamp": 1700000000.5
+    }
+    assert wire_codec.decode("positions_update", wire_codec.encode("positions_update", data)) == data
+    journaled = {**data, "event_id": 42}
+    assert wire_codec.decode("positions_update", wire_codec.encode("positions_update", journaled)) == journaled
@@ -34,6 +34,7 @@ function initializeSocket() {
     
     socket.on('player_joined', onPlayerJoined);
     socket.on('character_moved', onCharacterMoved);
+    socket.on('positions_update', onPositionsUpdate);
     socket.on('chat_message', onChatMessage);
     socket.on('game_state_update', onGameStateUpdate);
     socket.on('map_loaded', onMapLoaded);
@@ -121,6 +122,13 @@ function onCharacterMoved(data) {
     }
 }
 
+function onPositionsUpdate(data) {
+    // One batch per server tick - only final positions, no notifications
+    data.positions.forEach(entry => {
+        addOrUpdatePlayer(entry.character_name, entry.position);
+    });
+}
+
 function onChatMessage(data) {
     console.log('[APP] Chat message:', data);
     
@@ -15,6 +15,23 @@ class RPGSocketClient {
         this.connected = false;
         this.gameState = null;
         
+        // Client-side prediction: last sent move sequence, unacked moves and
+        // the last position the server confirmed
+        this.moveSeq = 0;
+        this.pendingMoves = {};
+        this.confirmedPosition = null;
+        
+        // Token for silently resuming this session after a dropped connection,
+        // and the id of the newest journaled broadcast we have seen
+        this.resumeToken = null;
+        this.lastEventId = 0;
+        
+        // Streamed map tiles keyed "x,y" -> {type, obstacle}, and the
+        // revision of each chunk ("cx,cy") we last loaded in full
+        this.mapTiles = {};
+        this.chunkRevisions = {};
+        this.lightLevels = {};
+        
         // Event listeners (callbacks)
         this.listeners = {};
     }
@@ -39,18 +56,30 @@ class RPGSocketClient {
      * Register all Socket.IO event listeners
      */
     registerSocketListeners() {
+        // Remember how far we got, so a resume replays only what we missed
+        this.socket.onAny((eventName, data) => {
+            if (data && data.event_id > this.lastEventId) {
+                this.lastEventId = data.event_id;
+            }
+        });
+        
         // Connection events
         this.socket.on('connect', () => this.onConnect());
         this.socket.on('disconnect', () => this.onDisconnect());
         this.socket.on('response', (data) => this.onResponse(data));
         this.socket.on('error', (data) => this.onError(data));
+        this.socket.on('rate_limited', (data) => this.onRateLimited(data));
         
         // Player events
         this.socket.on('player_joined', (data) => this.onPlayerJoined(data));
         this.socket.on('player_left', (data) => this.onPlayerLeft(data));
+        this.socket.on('session_resumed', (data) => this.onSessionResumed(data));
+        this.socket.on('resume_failed', (data) => this.onResumeFailed(data));
         
         // Movement events
         this.socket.on('character_moved', (data) => this.onCharacterMoved(data));
+        this.socket.on('positions_update', (data) => this.onPositionsUpdate(data));
+        this.socket.on('move_ack', (data) => this.onMoveAck(data));
         
         // Chat events
         this.socket.on('chat_message', (data) => this.onChatMessage(data));
@@ -59,9 +88,32 @@ class RPGSocketClient {
         this.socket.on('combat_initiated', (data) => this.onCombatInitiated(data));
         this.socket.on('combat_ended', (data) => this.onCombatEnded(data));
         this.socket.on('turn_advanced', (data) => this.onTurnAdvanced(data));
+        this.socket.on('dice_rolled', (data) => this.emit('dice_rolled', data));
+        this.socket.on('dice_log', (data) => this.emit('dice_log', data));
+        this.socket.on('aoe_preview', (data) => this.emit('aoe_preview', data));
+        this.socket.on('aoe_template', (data) => this.emit('aoe_template', data));
+        this.socket.on('reach', (data) => this.onReach(data));
+        
+        // NPC events
+        this.socket.on('npc_spawned', (data) => this.emit('npc_spawned', data));
+        this.socket.on('npc_removed', (data) => this.emit('npc_removed', data));
+        this.socket.on('npcs_update', (data) => this.emit('npcs_update', data));
         
         // Gameboard events
         this.socket.on('map_loaded', (data) => this.onMapLoaded(data));
+        this.socket.on('map_chunk', (data) => this.onMapChunk(data));
+        this.socket.on('map_stream_complete', (data) => this.emit('map_stream_complete', data));
+        this.socket.on('map_generation_started', (data) => this.emit('map_generation_started', data));
+        this.socket.on('map_generated', (data) => this.emit('map_generated', data));
+        this.socket.on('map_delta', (data) => this.onMapDelta(data));
+        this.socket.on('viewport_set', (data) => this.onViewportSet(data));
+        
+        // Lighting events
+        this.socket.on('light_placed', (data) => this.emit('light_placed', data));
+        this.socket.on('light_removed', (data) => this.emit('light_removed', data));
+        this.socket.on('lighting_changed', (data) => this.emit('lighting_changed', data));
+        this.socket.on('light_delta', (data) => this.onLightDelta(data));
+        this.socket.on('fog_update', (data) => this.onFogUpdate(data));
         
         // State sync events
         this.socket.on('game_state_update', (data) => this.onGameStateUpdate(data));
@@ -95,6 +147,15 @@ class RPGSocketClient {
     onConnect() {
         console.log('[SOCKET] Connected to server');
         this.connected = true;
+        
+        // Reconnect after a drop: rebind to our existing session instead of re-joining
+        if (this.resumeToken) {
+            this.socket.emit('resume_session', {
+                resume_token: this.resumeToken,
+                last_event_id: this.lastEventId
+            });
+            return;
+        }
         this.emit('connected');
     }
     
@@ -114,6 +175,11 @@ class RPGSocketClient {
         this.emit('error', data);
     }
     
+    onRateLimited(data) {
+        console.warn(`[SOCKET] ${data.event} rate limited, retry in ${data.retry_after}s`);
+        this.emit('rate_limited', data);
+    }
+    
     // ========== Player Events ==========
     
     /**
@@ -140,9 +206,39 @@ class RPGSocketClient {
     
     onPlayerJoined(data) {
         console.log('[GAME] Player joined:', data);
+        if (data.resume_token && data.player_id === this.playerId) {
+            this.resumeToken = data.resume_token;
+            this.lastEventId = data.last_event_id;
+        }
         this.emit('player_joined', data);
     }
     
+    onSessionResumed(data) {
+        console.log(`[GAME] Session resumed, ${data.missed_events ? data.missed_events.length : 'all'} missed events`);
+        
+        if (data.missed_events) {
+            // Replay what we missed through the normal listeners
+            data.missed_events.forEach(entry => this.emit(entry.event, entry.data));
+        } else {
+            this.gameState = data.state;
+            this.emit('game_state_update', { state: data.state, timestamp: data.timestamp });
+        }
+        this.lastEventId = data.last_event_id;
+        this.emit('session_resumed', data);
+    }
+    
+    onResumeFailed(data) {
+        console.warn('[GAME] Resume failed:', data.message);
+        this.resumeToken = null;
+        
+        // Session expired server-side; fall back to a fresh join
+        if (this.characterName) {
+            this.joinGame(this.characterName, this.characterId, this.isGM);
+        } else {
+            this.emit('connected');
+        }
+    }
+    
     onPlayerLeft(data) {
         console.log('[GAME] Player left:', data);
         this.emit('player_left', data);
@@ -161,11 +257,50 @@ class RPGSocketClient {
         
         console.log(`[MOVE] Moving to (${x}, ${y})`);
         
+        const seq = ++this.moveSeq;
+        this.pendingMoves[seq] = { x: x, y: y };
+        
         this.socket.emit('move_character', {
             player_id: this.playerId,
             x: x,
-            y: y
+            y: y,
+            seq: seq
         });
+        
+        // Draw our own token immediately; the server ack confirms or corrects it
+        this.emit('character_moved', {
+            player_id: this.playerId,
+            character_name: this.characterName,
+            new_position: { x: x, y: y },
+            predicted: true
+        });
+    }
+    
+    /**
+     * Reconcile a predicted move with the server's authoritative result
+     */
+    onMoveAck(data) {
+        delete this.pendingMoves[data.seq];
+        if (data.accepted) {
+            this.confirmedPosition = data.position;
+        } else {
+            console.warn(`[MOVE] Move ${data.seq} rejected: ${data.reason}`);
+            if (data.position) {
+                this.confirmedPosition = data.position;
+            }
+            
+            // Undo the prediction unless a later move is still in flight (its ack will settle it)
+            const newerPending = Object.keys(this.pendingMoves).some(seq => Number(seq) > data.seq);
+            if (!newerPending && this.confirmedPosition) {
+                this.emit('character_moved', {
+                    player_id: this.playerId,
+                    character_name: this.characterName,
+                    new_position: this.confirmedPosition,
+                    corrected: true
+                });
+            }
+        }
+        this.emit('move_ack', data);
     }
     
     onCharacterMoved(data) {
@@ -173,6 +308,13 @@ class RPGSocketClient {
         this.emit('character_moved', data);
     }
     
+    /**
+     * Batched final positions from the server broadcast tick
+     */
+    onPositionsUpdate(data) {
+        this.emit('positions_update', data);
+    }
+    
     // ========== Chat Events ==========
     
     /**
@@ -200,6 +342,34 @@ class RPGSocketClient {
     
     // ========== Combat Events ==========
     
+    /**
+     * Preview an area-of-effect template (size in feet, direction in degrees)
+     */
+    previewAoe(shape, size, origin, direction = 0, share = false) {
+        this.socket.emit('preview_aoe', {
+            player_id: this.playerId,
+            shape, size, origin, direction, share
+        });
+    }
+    
+    /**
+     * Roll dice, e.g. rollDice('8d6 fire', {targets: ['goblin_1', 'goblin_2']})
+     */
+    rollDice(expression, options = {}) {
+        this.socket.emit('roll_dice', {
+            player_id: this.playerId,
+            expression: expression,
+            ...options
+        });
+    }
+    
+    /**
+     * Fetch the dice seed and roll log (GM only); answered with 'dice_log'
+     */
+    requestDiceLog() {
+        this.socket.emit('request_dice_log', { player_id: this.playerId });
+    }
+    
     /**
      * Request combat start (GM only)
      */
@@ -283,13 +453,183 @@ class RPGSocketClient {
         });
     }
     
+    /**
+     * Generate a dungeon, cave or outdoor map (GM only); same seed, same map
+     */
+    generateMap(mapName, kind, width, height, seed = null, params = {}, load = true) {
+        if (!this.isGM) {
+            console.warn('[MAP] Only GM can generate maps');
+            return;
+        }
+        
+        this.socket.emit('generate_map', {
+            player_id: this.playerId,
+            map_name: mapName,
+            kind, width, height, seed, params, load
+        });
+    }
+    
+    /**
+     * Edit tiles of the loaded map (GM only): [{x, y, type, obstacle}, ...]
+     */
+    modifyMap(tiles) {
+        this.socket.emit('modify_map', { player_id: this.playerId, tiles });
+    }
+    
+    onMapDelta(data) {
+        data.tiles.forEach(t => {
+            this.mapTiles[`${t.x},${t.y}`] = { type: t.type, obstacle: t.obstacle };
+        });
+        this.emit('map_delta', data);
+    }
+    
+    /**
+     * Place a light (GM only); pass tokenId to have a token carry it
+     */
+    placeLight(lightId, x, y, bright = 20, dim = null, tokenId = null) {
+        this.socket.emit('place_light', {
+            player_id: this.playerId,
+            light_id: lightId,
+            x, y, bright,
+            dim: dim === null ? bright * 2 : dim,
+            token_id: tokenId
+        });
+    }
+    
+    removeLight(lightId) {
+        this.socket.emit('remove_light', { player_id: this.playerId, light_id: lightId });
+    }
+    
+    /**
+     * Ambient light ('dark', 'dim', 'bright') and fog of war (GM only)
+     */
+    setLighting(ambient, fogOfWar) {
+        this.socket.emit('set_lighting', {
+            player_id: this.playerId,
+            ambient: ambient,
+            fog_of_war: fogOfWar
+        });
+    }
+    
+    /**
+     * Apply per-tile light levels (0 dark, 1 dim, 2 bright) from light sources
+     */
+    onLightDelta(data) {
+        data.tiles.forEach(([x, y, level]) => {
+            if (level) {
+                this.lightLevels[`${x},${y}`] = level;
+            } else {
+                delete this.lightLevels[`${x},${y}`];
+            }
+        });
+        this.emit('light_delta', data);
+    }
+    
     onMapLoaded(data) {
         console.log('[MAP] Map loaded:', data);
+        this.mapTiles = {};
+        this.chunkRevisions = {};
+        this.lightLevels = {};
         this.emit('map_loaded', data);
     }
     
+    /**
+     * Expand one streamed chunk (palette + run-length rows) into mapTiles
+     */
+    onMapChunk(data) {
+        data.rows.forEach((row, dy) => {
+            let x = data.x0;
+            for (let i = 0; i < row.length; i += 2) {
+                if (row[i] < 0) {
+                    // Hidden by fog of war: keep what we saw before
+                    x += row[i + 1];
+                    continue;
+                }
+                const [type, obstacle] = data.palette[row[i]];
+                for (let n = 0; n < row[i + 1]; n++, x++) {
+                    this.mapTiles[`${x},${data.y0 + dy}`] = { type, obstacle };
+                }
+            }
+        });
+        (data.chunks || []).forEach(c => {
+            this.chunkRevisions[`${c.cx},${c.cy}`] = c.rev;
+        });
+        this.emit('map_chunk', data);
+    }
+    
+    /**
+     * Under fog of war: the tokens and terrain now in sight
+     */
+    onFogUpdate(data) {
+        if (data.terrain) {
+            this.onMapChunk(data.terrain);
+        }
+        this.emit('fog_update', data);
+    }
+    
+    /**
+     * Ask for the tiles a token can reach (speed in feet)
+     */
+    requestReach(speed, tokenId = null) {
+        this.socket.emit('request_reach', {
+            player_id: this.playerId,
+            token_id: tokenId,
+            speed: speed
+        });
+    }
+    
+    /**
+     * Expand a reach bitmask (row-major, MSB first) into "x,y" keys
+     */
+    onReach(data) {
+        const bits = atob(data.mask);
+        const width = data.x1 - data.x0;
+        const tiles = new Set();
+        for (let i = 0; i < width * (data.y1 - data.y0); i++) {
+            if (bits.charCodeAt(i >> 3) & (0x80 >> (i & 7))) {
+                tiles.add(`${data.x0 + (i % width)},${data.y0 + Math.floor(i / width)}`);
+            }
+        }
+        this.emit('reach', { ...data, tiles });
+    }
+    
     // ========== State Sync Events ==========
     
+    /**
+     * Only receive positional updates inside this rectangle (half-open);
+     * call with no arguments to clear
+     */
+    setViewport(x0, y0, x1, y1) {
+        const bounds = x0 === undefined ? {} : { x0, y0, x1, y1 };
+        this.socket.emit('set_viewport', bounds);
+    }
+    
+    /**
+     * Resync what the new viewport shows: updates outside the old one were
+     * never sent, so apply the tokens and NPCs now in view and refetch the
+     * window if any loaded chunk in it has changed since
+     */
+    onViewportSet(data) {
+        if (data.tokens) {
+            this.emit('positions_update', { positions: data.tokens });
+        }
+        if (data.npcs) {
+            this.emit('npcs_update', { npcs: data.npcs });
+        }
+        const stale = (data.chunks || []).some(c => {
+            const rev = this.chunkRevisions[`${c.cx},${c.cy}`];
+            return rev !== undefined && rev < c.rev;
+        });
+        if (stale && data.viewport && data.map_name) {
+            const { x0, y0, x1, y1 } = data.viewport;
+            fetch(`/api/maps/${encodeURIComponent(data.map_name)}/tiles?x0=${x0}&y0=${y0}&x1=${x1}&y1=${y1}`)
+                .then(response => response.ok ? response.json() : null)
+                .then(tiles => tiles && this.onMapChunk(tiles))
+                .catch(error => console.error('[MAP] Viewport resync failed:', error));
+        }
+        this.emit('viewport_set', data);
+    }
+    
     /**
      * Request current game state
      */